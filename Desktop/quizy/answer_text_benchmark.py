@@ -0,0 +1,112 @@
+"""
+Pomiar wyodrębniania tekstu odpowiedzi (quizbank/parser.py, extract_answer_text).
+
+Porównuje dwie metody na wszystkich opcjach odpowiedzi z zapisanych stron kursów:
+- dawną: serializacja div.d-flex, ponowne parsowanie fragmentu przez BeautifulSoup
+  i usunięcie span.answernumber (decompose) przed get_text(),
+- obecną: get_text_without() - przejście po tekstach żywego drzewa z pominięciem
+  span.answernumber, bez ponownego parsowania i bez modyfikowania drzewa.
+Najpierw sprawdza, że obie metody dają identyczne teksty, potem podaje medianę
+czasu na jedną opcję z kilku powtórzeń.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import time
+
+from quizbank.parser import (
+    clean_answer_text,
+    collect_html_files,
+    extract_answer_text,
+    make_question_soup,
+)
+
+COURSE_DIRECTORIES = ("modelowanie_procesow_biznesowych", "wdrazanie_uslugi")
+
+
+def extract_answer_text_reparse(option_container):
+    """
+    Dawna wersja extract_answer_text: klon div.d-flex przez ponowne
+    parsowanie jego HTML.
+    """
+    from bs4 import BeautifulSoup
+
+    answer_label_div = option_container.find("div", class_="d-flex")
+    if not answer_label_div:
+        return ""
+    cloned_answer_label_div = BeautifulSoup(str(answer_label_div), "html.parser")
+    answernumber_span = cloned_answer_label_div.find("span", class_="answernumber")
+    if answernumber_span:
+        answernumber_span.decompose()
+    option_text = cloned_answer_label_div.get_text(separator=" ", strip=True)
+    return clean_answer_text(option_text)
+
+
+def load_option_containers(course_dirs):
+    """
+    Zwraca kontenery opcji (div r0 / r1 w div.answer) ze wszystkich stron kursów.
+    """
+    option_containers = []
+    for course_dir in course_dirs:
+        for html_file_path in collect_html_files(course_dir):
+            with open(html_file_path, "r", encoding="utf-8") as f:
+                soup = make_question_soup(f.read(), "html.parser")
+            for answer_div in soup.find_all("div", class_="answer"):
+                option_containers.extend(
+                    answer_div.find_all(["div"], class_=re.compile(r"r[01]"))
+                )
+    return option_containers
+
+
+def time_per_option(extract, option_containers, repeat):
+    """
+    Mediana (z repeat powtórzeń) czasu wyodrębnienia tekstu jednej opcji w sekundach.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for option_container in option_containers:
+            extract(option_container)
+        times.append((time.perf_counter() - start) / len(option_containers))
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    # --- Konfiguracja ---
+    repeat_count = 5
+    # --- Konfiguracja End ---
+
+    arg_parser = argparse.ArgumentParser(
+        description="Porównuje dawne (ponowne parsowanie) i obecne wyodrębnianie "
+        "tekstu odpowiedzi."
+    )
+    arg_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=repeat_count,
+        help="Liczba powtórzeń pomiaru (wynik to mediana).",
+    )
+    args = arg_parser.parse_args()
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    option_containers = load_option_containers(
+        [os.path.join(script_dir, course_dir) for course_dir in COURSE_DIRECTORIES]
+    )
+    mismatches = sum(
+        extract_answer_text_reparse(option_container)
+        != extract_answer_text(option_container)
+        for option_container in option_containers
+    )
+    print(f"Opcje odpowiedzi: {len(option_containers)}, różne wyniki: {mismatches}")
+
+    reparse_time = time_per_option(
+        extract_answer_text_reparse, option_containers, args.repeat
+    )
+    traversal_time = time_per_option(
+        extract_answer_text, option_containers, args.repeat
+    )
+    print(f"{'ponowne parsowanie (dawniej)':<35} {reparse_time * 1e6:8.1f} us/opcję")
+    print(f"{'get_text_without (obecnie)':<35} {traversal_time * 1e6:8.1f} us/opcję")
+    print(f"przyspieszenie: {reparse_time / traversal_time:.1f}x")
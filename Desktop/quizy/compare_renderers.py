@@ -0,0 +1,177 @@
+"""
+Porównanie rendererów PDF: platypus (SimpleDocTemplate + Paragraph) i canvas
+(quizbank/canvas_renderer.py) dla wszystkich skryptów generujących PDF.
+
+Dla każdej strony porównywane są wiersze tekstu: treść, położenie, czcionka,
+rozmiar i kolor. Różnice mogą wystąpić tylko w tekstach ze znakami
+specjalnymi HTML (&, <): Paragraph interpretuje je jako znaczniki (np. "R&D."
+zamienia na "R&D.;"), a canvas rysuje tekst dosłownie.
+"""
+
+import argparse
+import json
+import time
+from functools import partial
+from io import BytesIO
+
+from pypdf import PdfReader
+
+from quizbank.page_layout import DEFAULT_PAGE_LAYOUT, PAGE_LAYOUTS
+from quizbank.renderer import render_questions_canvas, render_questions_pdf
+
+# Opcje renderowania (render_questions_pdf / render_questions_canvas)
+# używane przez każdy skrypt
+RENDER_OPTIONS_BY_WRITER = {
+    "pdf_from_json": {"title": "Pytania i Odpowiedzi"},
+    "merger": {},
+    "script": {"numbered": False, "style_set": "quiz"},
+}
+
+# Tolerancja położenia tekstu (w punktach) przy porównaniu stron
+POSITION_TOLERANCE = 0.5
+
+
+def page_text_layout(pdf_bytes):
+    """
+    Zwraca dla każdej strony listę napisów z położeniem, czcionką (bez prefiksu
+    podzbioru, np. AAAAAA+), rozmiarem i kolorem wypełnienia.
+    """
+    pages = []
+    for page in PdfReader(BytesIO(pdf_bytes)).pages:
+        items = []
+        fill_color = [None]
+
+        def visit_operand(operator, operands, cm, tm):
+            if operator == b"rg":
+                fill_color[0] = tuple(round(float(value), 3) for value in operands)
+
+        def visit_text(text, cm, tm, font_dict, font_size):
+            if not text.strip():
+                return
+            font_name = str(font_dict.get("/BaseFont", "")) if font_dict else ""
+            items.append(
+                {
+                    "text": text.strip(),
+                    "x": cm[4] + tm[4],
+                    "y": cm[5] + tm[5],
+                    "font": font_name.split("+")[-1],
+                    "size": font_size,
+                    "color": fill_color[0],
+                }
+            )
+
+        page.extract_text(visitor_operand_before=visit_operand, visitor_text=visit_text)
+        pages.append(items)
+    return pages
+
+
+def _same_item(first, second):
+    return (
+        first["text"] == second["text"]
+        and first["font"] == second["font"]
+        and first["size"] == second["size"]
+        and first["color"] == second["color"]
+        and abs(first["x"] - second["x"]) <= POSITION_TOLERANCE
+        and abs(first["y"] - second["y"]) <= POSITION_TOLERANCE
+    )
+
+
+def compare_layouts(reference_pages, candidate_pages):
+    """
+    Porównuje strony dwóch PDF-ów (page_text_layout). Zwraca listę opisów
+    różnic - pusta lista oznacza zgodność wizualną (te same wiersze tekstu
+    w tych samych miejscach, tą samą czcionką, rozmiarem i kolorem).
+    """
+    differences = []
+    if len(reference_pages) != len(candidate_pages):
+        differences.append(
+            f"liczba stron: platypus {len(reference_pages)}, canvas {len(candidate_pages)}"
+        )
+    for page_number, (reference, candidate) in enumerate(
+        zip(reference_pages, candidate_pages), start=1
+    ):
+        if len(reference) != len(candidate) or not all(
+            _same_item(first, second) for first, second in zip(reference, candidate)
+        ):
+            missing = [item["text"] for item in reference if item not in candidate]
+            extra = [item["text"] for item in candidate if item not in reference]
+            differences.append(
+                f"strona {page_number}: platypus {missing[:2]}, canvas {extra[:2]}"
+            )
+    return differences
+
+
+def best_time(function, *args, repeat=3):
+    """
+    Zwraca najkrótszy czas (w sekundach) z repeat wywołań function(*args).
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    # --- Konfiguracja ---
+    input_json_file = "modelowanie_procesow_biznesowych/all_quiz_questions.json"
+    # --- Konfiguracja End ---
+
+    arg_parser = argparse.ArgumentParser(
+        description="Porównuje renderer canvas z platypus: zgodność stron i czas."
+    )
+    arg_parser.add_argument(
+        "--input",
+        default=input_json_file,
+        help="Plik JSON z pytaniami (wynik script_to_json.py).",
+    )
+    arg_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Ile razy powielić listę pytań (większy test wydajności).",
+    )
+    arg_parser.add_argument(
+        "--layout",
+        choices=PAGE_LAYOUTS,
+        default=DEFAULT_PAGE_LAYOUT,
+        help="Układ stron porównywanych PDF-ów.",
+    )
+    args = arg_parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        questions = json.load(f) * args.repeat
+    # Pytania odczytywane przez merger.py z PDF-ów mają flagę has_identified_correct_answer
+    merger_questions = [
+        dict(question, has_identified_correct_answer=bool(question["correct_answers"]))
+        for question in questions
+    ]
+    print(f"Pytań: {len(questions)}")
+
+    all_parity_ok = True
+    for writer_name, options in RENDER_OPTIONS_BY_WRITER.items():
+        render_platypus, render_canvas = (
+            partial(render, layout=args.layout, **options)
+            for render in (render_questions_pdf, render_questions_canvas)
+        )
+        writer_questions = merger_questions if writer_name == "merger" else questions
+        platypus_pdf, _ = render_platypus(writer_questions)
+        canvas_pdf, _ = render_canvas(writer_questions)
+        differences = compare_layouts(
+            page_text_layout(platypus_pdf), page_text_layout(canvas_pdf)
+        )
+        platypus_time = best_time(render_platypus, writer_questions)
+        canvas_time = best_time(render_canvas, writer_questions)
+        print(
+            f"{writer_name}: platypus {platypus_time:.3f} s, canvas {canvas_time:.3f} s "
+            f"({platypus_time / canvas_time:.1f}x), "
+            f"zgodność stron: {'TAK' if not differences else 'NIE'}"
+        )
+        for difference in differences[:5]:
+            print(f"  {difference}")
+        all_parity_ok = all_parity_ok and not differences
+
+    if not all_parity_ok:
+        exit(1)
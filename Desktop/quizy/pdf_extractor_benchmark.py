@@ -0,0 +1,73 @@
+"""
+Pomiar ekstrakcji pytań z PDF-ów (quizbank/pdf_text.py) metodami pypdf i pdfminer.
+
+Dla każdego katalogu result_pdf kursu mierzy czas ekstrakcji tekstu
+i parsowania pytań (extract_questions_from_pdfs, jeden proces) każdą metodą
+i sprawdza, że obie dają identyczne pytania. Wynikiem jest mediana
+z kilku powtórzeń.
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from quizbank.pdf_text import PDF_TEXT_BACKENDS, extract_questions_from_pdfs
+
+COURSE_DIRECTORIES = ("wdrazanie_uslugi", "modelowanie_procesow_biznesowych")
+RESULT_PDF_DIRECTORY = "result_pdf"
+
+
+def extract_with_backend(pdf_paths, backend, repeat):
+    """
+    Zwraca (mediana czasu w sekundach, pytania) dla repeat uruchomień
+    extract_questions_from_pdfs metodą backend.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        questions_by_path = extract_questions_from_pdfs(pdf_paths, backend=backend)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), questions_by_path
+
+
+if __name__ == "__main__":
+    # --- Konfiguracja ---
+    repeat_count = 3
+    # --- Konfiguracja End ---
+
+    arg_parser = argparse.ArgumentParser(
+        description="Porównuje czas ekstrakcji pytań z PDF-ów przez pypdf i pdfminer."
+    )
+    arg_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=repeat_count,
+        help="Liczba powtórzeń pomiaru (wynik to mediana).",
+    )
+    args = arg_parser.parse_args()
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    for course_dir in COURSE_DIRECTORIES:
+        pdf_dir = os.path.join(script_dir, course_dir, RESULT_PDF_DIRECTORY)
+        if not os.path.isdir(pdf_dir):
+            print(f"Pominięto {course_dir}: brak katalogu {RESULT_PDF_DIRECTORY}.")
+            continue
+        pdf_paths = [
+            os.path.join(pdf_dir, filename)
+            for filename in sorted(os.listdir(pdf_dir))
+            if filename.lower().endswith(".pdf")
+        ]
+        results = {
+            backend: extract_with_backend(pdf_paths, backend, args.repeat)
+            for backend in PDF_TEXT_BACKENDS
+        }
+        question_sets = [questions for _, questions in results.values()]
+        question_count = sum(len(questions) for questions in question_sets[0].values())
+        same = all(questions == question_sets[0] for questions in question_sets)
+        print(
+            f"{course_dir} ({len(pdf_paths)} PDF, {question_count} pytań, "
+            f"wyniki {'identyczne' if same else 'RÓŻNE'}):"
+        )
+        for backend, (seconds, _) in results.items():
+            print(f"  {backend:<10} {seconds:8.3f} s")
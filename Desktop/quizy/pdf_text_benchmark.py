@@ -0,0 +1,165 @@
+"""
+Pomiar parsowania tekstu PDF (quizbank/pdf_text.py, parse_questions_from_text).
+
+Porównuje obecną maszynę stanów po liniach z dawnym regexem DOTALL z merger.py
+na syntetycznym tekście w formacie PDF-ów ze script.py (nagłówki "Pytanie:",
+"Dostępne odpowiedzi:", "Poprawna odpowiedź:" i znaczniki "--- PAGE N ---",
+także wewnątrz listy odpowiedzi) w rozmiarach 1x / 10x / 100x. Wynik obu
+parserów jest sprawdzany - na tym tekście musi być identyczny - a czas jest
+podawany także w przeliczeniu na MB tekstu, co pokazuje skalowanie liniowe.
+"""
+
+import argparse
+import random
+import re
+import statistics
+import time
+
+from quizbank.pdf_text import parse_questions_from_text
+
+SIZE_FACTORS = (1, 10, 100)
+NO_CORRECT_ANSWER_TEXT = "(nie udało się zidentyfikować lub brak)"
+WORDS = (
+    "proces modelowanie notacja BPMN zdarzenie bramka zadanie zasób klient "
+    "faktura księgowanie rozliczenie wdrożenie usługa zarządzanie zmianą "
+    "organizacja rola właściciel pomiar wskaźnik jakość koszt ryzyko"
+).split()
+
+
+def parse_questions_from_text_regex(full_text):
+    """
+    Dawna wersja parse_questions_from_text (merger.py przed maszyną stanów):
+    regex DOTALL z leniwymi grupami na całym tekście.
+    """
+    questions = []
+    question_pattern = re.compile(
+        r"Pytanie:\s*(.*?)\s*Dostępne odpowiedzi:\s*(.*?)\s*Poprawna odpowiedź:\s*(.*?)(?=\s*Pytanie:|\s*--- PAGE \d+ ---|\Z)",
+        re.DOTALL,
+    )
+    answer_option_pattern = re.compile(
+        r"-\s*(.*?)(?=\s*-|\s*Poprawna odpowiedź:|\Z)", re.DOTALL
+    )
+    for match in question_pattern.finditer(full_text):
+        question_text_raw = re.sub(r"--- PAGE \d+ ---", "", match.group(1)).strip()
+        all_answers_raw = re.sub(r"--- PAGE \d+ ---", "", match.group(2)).strip()
+        correct_answer_raw = re.sub(r"--- PAGE \d+ ---", "", match.group(3)).strip()
+
+        all_answers = []
+        for ans_match in answer_option_pattern.finditer(all_answers_raw):
+            ans_text = ans_match.group(1).strip()
+            if ans_text:
+                all_answers.append(ans_text)
+
+        correct_answers = []
+        has_identified_correct_answer = False
+        if NO_CORRECT_ANSWER_TEXT not in correct_answer_raw:
+            has_identified_correct_answer = True
+            for corr_ans_match in answer_option_pattern.finditer(correct_answer_raw):
+                ans_text = corr_ans_match.group(1).strip()
+                if ans_text:
+                    correct_answers.append(ans_text)
+            if (
+                not correct_answers
+                and correct_answer_raw
+                and not correct_answer_raw.startswith("(")
+            ):
+                correct_answers.append(correct_answer_raw)
+
+        questions.append(
+            {
+                "question_text": question_text_raw.strip(),
+                "all_answers": all_answers,
+                "correct_answers": correct_answers,
+                "has_identified_correct_answer": has_identified_correct_answer,
+            }
+        )
+    return questions
+
+
+def _sentence(rng, word_count):
+    return " ".join(rng.choice(WORDS) for _ in range(word_count))
+
+
+def synthetic_pdf_text(question_count, seed=0):
+    """
+    Tekst w formacie wyciąganym z PDF-ów script.py: pytania (czasem w dwóch
+    liniach), odpowiedzi (czasem zawinięte na kolejną linię) i znaczniki
+    stron między pytaniami, wewnątrz listy odpowiedzi i na końcu sekcji
+    poprawnych odpowiedzi. Odpowiedzi nie zawierają myślników - dawny regex
+    dzielił na nich odpowiedzi, więc tylko wtedy oba parsery dają ten sam wynik.
+    """
+    rng = random.Random(seed)
+    page = 1
+    lines = [f"--- PAGE {page} ---"]
+    for number in range(1, question_count + 1):
+        lines.append(f"Pytanie: {number}. {_sentence(rng, rng.randint(5, 15))}?")
+        if rng.random() < 0.3:
+            lines.append(_sentence(rng, rng.randint(3, 8)))
+        lines.append("Dostępne odpowiedzi:")
+        answers = [_sentence(rng, rng.randint(2, 10)) for _ in range(rng.randint(2, 5))]
+        for position, answer in enumerate(answers):
+            if position and rng.random() < 0.2:
+                page += 1
+                lines.append(f"--- PAGE {page} ---")
+            lines.append(f"- {answer}")
+            if rng.random() < 0.2:
+                lines.append(_sentence(rng, rng.randint(2, 5)))
+        lines.append("Poprawna odpowiedź:")
+        if rng.random() < 0.15:
+            lines.append(NO_CORRECT_ANSWER_TEXT)
+        else:
+            lines.append(f"- {rng.choice(answers)}")
+        if rng.random() < 0.5:
+            page += 1
+            lines.append(f"--- PAGE {page} ---")
+    return "\n".join(lines) + "\n"
+
+
+def median_time(parse, text, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(text)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+if __name__ == "__main__":
+    # --- Konfiguracja ---
+    base_question_count = 200
+    repeat_count = 3
+    # --- Konfiguracja End ---
+
+    arg_parser = argparse.ArgumentParser(
+        description="Porównuje parsowanie tekstu PDF maszyną stanów i dawnym regexem."
+    )
+    arg_parser.add_argument(
+        "--questions",
+        type=int,
+        default=base_question_count,
+        help="Liczba pytań w tekście o rozmiarze 1x.",
+    )
+    arg_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=repeat_count,
+        help="Liczba powtórzeń pomiaru (wynik to mediana).",
+    )
+    args = arg_parser.parse_args()
+
+    print(
+        f"{'rozmiar':>8} {'pytania':>8} {'MB':>7} {'regex s':>9} {'linie s':>9} "
+        f"{'regex s/MB':>11} {'linie s/MB':>11}"
+    )
+    for factor in SIZE_FACTORS:
+        text = synthetic_pdf_text(args.questions * factor)
+        megabytes = len(text.encode("utf-8")) / 1e6
+        if parse_questions_from_text(text) != parse_questions_from_text_regex(text):
+            raise SystemExit(f"Różne wyniki parserów dla rozmiaru {factor}x.")
+        regex_time = median_time(parse_questions_from_text_regex, text, args.repeat)
+        lines_time = median_time(parse_questions_from_text, text, args.repeat)
+        print(
+            f"{factor:>7}x {args.questions * factor:>8} {megabytes:>7.2f} "
+            f"{regex_time:>9.3f} {lines_time:>9.3f} "
+            f"{regex_time / megabytes:>11.3f} {lines_time / megabytes:>11.3f}"
+        )
@@ -0,0 +1,72 @@
+"""
+Wspólny silnik bazy pytań z quizów Moodle.
+
+Skrypty w katalogu głównym (script_to_json.py, script.py, pdf_from_json.py,
+merger.py) są tylko punktami wejścia - konfiguracja i opcje wiersza poleceń -
+a całą pracę wykonują moduły pakietu:
+- parser.py - parsowanie przeglądów quizów (HTML),
+- pdf_text.py - odczyt pytań z wygenerowanych wcześniej PDF-ów,
+- normalizer.py - normalizacja tekstu i deduplikacja pytań,
+- bank.py - baza pytań SQLite z indeksem pełnotekstowym,
+- lookup.py - wyszukiwanie pytań po fragmencie (indeks trigramowy, serwer HTTP),
+- archives.py, assets.py - odczyt stron z archiwów i magazyn zasobów stron,
+- renderer.py - czcionki, style i renderowanie PDF (platypus / canvas),
+- pipeline.py - etapy HTML -> JSON -> deduplikacja -> PDF.
+
+Import pakietu nie ładuje reportlab, pypdf, pdfminer ani bs4 - są one
+importowane dopiero w funkcjach, które ich używają.
+"""
+
+from .assets import archive_course_assets, resolve_asset
+from .bank import open_bank, open_bank_readonly, query_questions, search_questions
+from .lookup import load_question_index, serve_lookup
+from .normalizer import (
+    clean_text_for_deduplication,
+    collapse_near_duplicates,
+    deduplicate_questions,
+    has_correct_answer,
+)
+from .parser import iter_moodle_quiz_review, parse_moodle_quiz_review
+from .pipeline import (
+    build_merged_pdfs_from_bank,
+    build_merged_pdfs_from_json,
+    build_merged_pdfs_from_pdfs,
+    build_question_bank,
+    build_quiz_pdf,
+    iter_questions_from_file,
+)
+from .renderer import (
+    build_pdf_styles,
+    generate_pdf,
+    register_fonts,
+    render_questions_canvas,
+    render_questions_pdf,
+)
+
+__all__ = [
+    "archive_course_assets",
+    "build_merged_pdfs_from_bank",
+    "build_merged_pdfs_from_json",
+    "build_merged_pdfs_from_pdfs",
+    "build_pdf_styles",
+    "build_question_bank",
+    "build_quiz_pdf",
+    "clean_text_for_deduplication",
+    "collapse_near_duplicates",
+    "deduplicate_questions",
+    "generate_pdf",
+    "has_correct_answer",
+    "iter_moodle_quiz_review",
+    "iter_questions_from_file",
+    "load_question_index",
+    "open_bank",
+    "open_bank_readonly",
+    "parse_moodle_quiz_review",
+    "query_questions",
+    "register_fonts",
+    "render_questions_canvas",
+    "render_questions_pdf",
+    "resolve_asset",
+    "search_questions",
+    "serve_lookup",
+]
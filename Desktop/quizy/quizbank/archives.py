@@ -0,0 +1,296 @@
+"""
+Odczyt przeglądów quizów (HTML) bezpośrednio z archiwów zip / tar / tar.gz
+/ tar.zst, bez rozpakowywania.
+
+Strony zapisane z Moodle mają obok siebie katalogi *_files z zasobami
+(obrazy, skrypty, style), wielokrotnie większe od samych plików HTML.
+Zip czytamy przez centralny katalog i otwieramy tylko elementy HTML; tar
+(także skompresowany) czytamy jednym przebiegiem strumienia i zachowujemy
+w pamięci tylko elementy HTML - zasoby nie są nigdy zapisywane na dysk.
+
+Plik HTML z archiwum ma ścieżkę "<archiwum>::<element>", np.
+"wdrazanie_uslugi.zip::quiz_1/review.html". open_html_source,
+html_source_stat i html_source_sha256 obsługują takie ścieżki tak samo jak
+zwykłe pliki. Archiwa .tar.zst wymagają opcjonalnego pakietu zstandard.
+"""
+
+import calendar
+import contextlib
+import functools
+import hashlib
+import io
+import os
+import tarfile
+import zipfile
+
+from .storage import file_sha256
+
+ARCHIVE_MEMBER_SEPARATOR = "::"
+ZIP_SUFFIXES = (".zip",)
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+ZSTD_TAR_SUFFIXES = (".tar.zst", ".tzst")
+ARCHIVE_SUFFIXES = ZIP_SUFFIXES + TAR_SUFFIXES + ZSTD_TAR_SUFFIXES
+
+
+def is_archive(path):
+    return path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def split_archive_member(path):
+    """
+    Dla ścieżki "<archiwum>::<element>" zwraca (archiwum, element),
+    dla zwykłego pliku None.
+    """
+    archive_path, separator, member_name = path.partition(ARCHIVE_MEMBER_SEPARATOR)
+    if not separator:
+        return None
+    return archive_path, member_name
+
+
+def is_quiz_directory(directory_name):
+    """
+    Czy podkatalog kursu zawiera przeglądy quizów: nazwa zaczyna się od
+    "quiz" (quiz_1, Quiz 2, ...), ale nie jest katalogiem zasobów strony
+    "<strona>_files" (np. "Quiz 1_ Przegląd_files").
+    """
+    return directory_name.lower().startswith("quiz") and not directory_name.endswith(
+        "_files"
+    )
+
+
+def is_html_file_name(file_name):
+    return file_name.lower().endswith(".html")
+
+
+def is_review_member(member_name, course_root=""):
+    """
+    Czy element archiwum jest przeglądem quizu - te same reguły co
+    collect_html_files dla katalogu kursu course_root w archiwum ("" to
+    korzeń archiwum, patrz _course_root): plik .html bezpośrednio w katalogu
+    kursu albo w jego podkatalogu quiz (is_quiz_directory).
+    """
+    parts = _normalized_member_name(member_name).split("/")
+    if course_root:
+        if parts[0] != course_root:
+            return False
+        parts = parts[1:]
+    if not parts or not is_html_file_name(parts[-1]):
+        return False
+    return len(parts) == 1 or (len(parts) == 2 and is_quiz_directory(parts[0]))
+
+
+def _normalized_member_name(member_name):
+    return "/".join(part for part in member_name.split("/") if part not in ("", "."))
+
+
+def _course_root(file_names):
+    """
+    Katalog kursu w archiwum (file_names to znormalizowane nazwy plików):
+    jedyny katalog najwyższego poziomu, gdy wszystkie pliki leżą w nim
+    (spakowany katalog kursu, np. "tar czf kurs.tar.gz kurs"), a w przeciwnym
+    razie korzeń archiwum ("").
+    """
+    top_level_directories = set()
+    for file_name in file_names:
+        directory, separator, _ = file_name.partition("/")
+        if not separator:
+            return ""
+        top_level_directories.add(directory)
+    if len(top_level_directories) == 1:
+        return top_level_directories.pop()
+    return ""
+
+
+def _is_possible_review_member(member_name):
+    # Przegląd przy dowolnym katalogu kursu - przed poznaniem wszystkich nazw
+    parts = _normalized_member_name(member_name).split("/")
+    return is_review_member(member_name) or (
+        len(parts) > 1 and is_review_member(member_name, parts[0])
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _read_zip_members(archive_path, stat_key):
+    # Tylko centralny katalog - zawartość elementów czyta read_html_source
+    with zipfile.ZipFile(archive_path) as archive:
+        infos = [
+            (_normalized_member_name(_zip_member_name(info)), info)
+            for info in archive.infolist()
+            if not info.is_dir()
+        ]
+    course_root = _course_root(member_name for member_name, _ in infos)
+    members = {}
+    for member_name, info in infos:
+        if not is_review_member(member_name, course_root):
+            continue
+        mtime = calendar.timegm(info.date_time + (0, 0, 0)) * 10**9
+        members[member_name] = (info.file_size, mtime, None, info.filename)
+    return members
+
+
+def _zip_member_name(info):
+    # Narzędzie zip w Linuksie zapisuje nazwy w UTF-8 bez flagi UTF-8,
+    # a zipfile dekoduje je wtedy jako cp437 ("Przegl─àd" zamiast "Przegląd")
+    if info.flag_bits & 0x800:
+        return info.filename
+    try:
+        return info.filename.encode("cp437").decode("utf-8")
+    except UnicodeError:
+        return info.filename
+
+
+def _open_tar(archive_path, stack):
+    if not archive_path.lower().endswith(ZSTD_TAR_SUFFIXES):
+        # Tryb z dostępem swobodnym: w nieskompresowanym tar zasoby są
+        # przeskakiwane (seek) bez czytania
+        return stack.enter_context(tarfile.open(archive_path, "r:*"))
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError(
+            f"Odczyt archiwum {archive_path} wymaga pakietu zstandard "
+            "(pip install zstandard)."
+        ) from None
+    raw_file = stack.enter_context(open(archive_path, "rb"))
+    stream = stack.enter_context(zstandard.ZstdDecompressor().stream_reader(raw_file))
+    return stack.enter_context(tarfile.open(fileobj=stream, mode="r|"))
+
+
+@functools.lru_cache(maxsize=8)
+def _read_tar_members(archive_path, stat_key):
+    # Jeden przebieg strumienia; w pamięci zostają tylko elementy HTML, które
+    # mogą być przeglądami - katalog kursu jest znany dopiero po przebiegu
+    file_names = []
+    members = {}
+    with contextlib.ExitStack() as stack:
+        archive = _open_tar(archive_path, stack)
+        for member in archive:
+            if not member.isfile():
+                continue
+            member_name = _normalized_member_name(member.name)
+            file_names.append(member_name)
+            if not _is_possible_review_member(member_name):
+                continue
+            data = archive.extractfile(member).read()
+            members[member_name] = (
+                member.size,
+                int(member.mtime) * 10**9,
+                data,
+                member.name,
+            )
+    course_root = _course_root(file_names)
+    return {
+        member_name: member
+        for member_name, member in members.items()
+        if is_review_member(member_name, course_root)
+    }
+
+
+def _archive_members(archive_path):
+    """
+    {element: (rozmiar, mtime_ns, bajty_lub_None, nazwa_w_archiwum)}
+    przeglądów quizów z archiwum (bajty tylko dla tar - zip jest czytany
+    na żądanie). Wynik jest zapamiętywany w procesie do zmiany archiwum.
+    """
+    stat = os.stat(archive_path)
+    stat_key = (stat.st_size, stat.st_mtime_ns)
+    if archive_path.lower().endswith(ZIP_SUFFIXES):
+        return _read_zip_members(archive_path, stat_key)
+    return _read_tar_members(archive_path, stat_key)
+
+
+def _archive_member(path):
+    archive_path, member_name = split_archive_member(path)
+    member = _archive_members(archive_path).get(member_name)
+    if member is None:
+        raise FileNotFoundError(
+            f"Brak elementu {member_name} w archiwum {archive_path}"
+        )
+    return archive_path, member_name, member
+
+
+def archive_html_files(archive_path):
+    """
+    Ścieżki "<archiwum>::<element>" przeglądów quizów z archiwum,
+    posortowane.
+    """
+    return [
+        f"{archive_path}{ARCHIVE_MEMBER_SEPARATOR}{member_name}"
+        # Kolejność jak w collect_html_files: katalog po katalogu
+        for member_name in sorted(
+            _archive_members(archive_path), key=lambda name: name.split("/")
+        )
+    ]
+
+
+def read_html_source(path):
+    """
+    Zwraca bajty pliku HTML - zwykłego lub elementu archiwum.
+    """
+    if split_archive_member(path) is None:
+        with open(path, "rb") as f:
+            return f.read()
+    archive_path, _, (_, _, data, archived_name) = _archive_member(path)
+    if data is not None:
+        return data
+    with zipfile.ZipFile(archive_path) as archive:
+        return archive.read(archived_name)
+
+
+def cached_member_bytes(path):
+    """
+    Bajty elementu archiwum tar, które ten proces już trzyma w pamięci
+    (_read_tar_members), albo None - dla zwykłych plików i elementów zip,
+    które każdy proces tanio czyta sam. Proces główny przekazuje te bajty
+    procesom puli, bo pamięć podręczna lru_cache jest osobna w każdym
+    procesie i każdy z nich rozpakowywałby całe archiwum od nowa.
+    """
+    member = split_archive_member(path)
+    if member is None or member[0].lower().endswith(ZIP_SUFFIXES):
+        return None
+    _, _, (_, _, data, _) = _archive_member(path)
+    return data
+
+
+def open_html_source(path, data=None):
+    """
+    Otwiera plik HTML (zwykły lub element archiwum) do czytania jako tekst
+    UTF-8; odpowiednik open(path, "r", encoding="utf-8"). data to bajty
+    pliku przeczytane wcześniej (cached_member_bytes) - wtedy path służy
+    tylko do komunikatów.
+    """
+    if data is not None:
+        return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8")
+    if split_archive_member(path) is None:
+        return open(path, "r", encoding="utf-8")
+    return io.TextIOWrapper(io.BytesIO(read_html_source(path)), encoding="utf-8")
+
+
+def html_source_stat(path):
+    """
+    (rozmiar, mtime_ns) pliku HTML lub elementu archiwum - bez czytania
+    zawartości.
+    """
+    if split_archive_member(path) is None:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+    _, _, (size, mtime, _, _) = _archive_member(path)
+    return size, mtime
+
+
+def html_source_sha256(path):
+    if split_archive_member(path) is None:
+        return file_sha256(path)
+    return hashlib.sha256(read_html_source(path)).hexdigest()
+
+
+def html_source_files(html_files):
+    """
+    Pliki na dysku, z których pochodzą html_files (archiwum zamiast
+    każdego z jego elementów), bez powtórzeń i w kolejności wystąpienia.
+    """
+    source_files = {}
+    for path in html_files:
+        member = split_archive_member(path)
+        source_files.setdefault(path if member is None else member[0], None)
+    return list(source_files)
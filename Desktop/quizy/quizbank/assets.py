@@ -0,0 +1,283 @@
+"""
+Magazyn zasobów stron adresowany zawartością (quizbank assets).
+
+Każda zapisana próba ma własny katalog "<strona>_files" z tymi samymi
+skryptami, stylami i czcionkami Moodle (javascript(1).php, styles.php, ...),
+więc kurs zawiera setki kopii kilkudziesięciu plików. archive_course_assets
+liczy skrót SHA-256 każdego zasobu jeden raz, zapisuje zawartość w magazynie
+jako <magazyn>/<sha[:2]>/<sha> i zastępuje każdą kopię twardym dowiązaniem
+do obiektu z magazynu - strony otwierają się w przeglądarce jak wcześniej,
+a każda zawartość zajmuje miejsce na dysku tylko raz.
+
+Indeks (ASSET_INDEX_FILE w katalogu kursu) zapamiętuje dla każdego drzewa
+zasobów skróty plików i czasy modyfikacji jego katalogów. Ponowne
+uruchomienie porównuje tylko czasy modyfikacji katalogów (os.stat) - drzewa
+bez nowych ani usuniętych plików są pomijane bez listowania ich zawartości.
+Zmiana zawartości pliku w miejscu nie zmienia czasu katalogu, więc nie jest
+wtedy wykrywana - dlatego obiekty magazynu są tylko do odczytu. Na tym samym
+systemie plików to te same i-węzły co pliki w katalogach *_files, więc
+tylko do odczytu stają się też zasoby zapisanych stron (przeglądarka tylko
+je czyta). rescan=True sprawdza rozmiar i czas modyfikacji każdego pliku
+i liczy skrót na nowo dla plików, które się zmieniły.
+
+resolve_asset zamienia odwołanie ze strony (np. src obrazka w pytaniu)
+na ścieżkę obiektu w magazynie, więc obrazki pytań pozostają dostępne
+(np. do osadzenia w PDF) niezależnie od katalogów *_files.
+"""
+
+import json
+import os
+import shutil
+from urllib.parse import unquote, urlsplit
+
+from .archives import split_archive_member
+from .parser import collect_html_files
+from .storage import file_sha256, write_json_atomically
+
+ASSET_INDEX_VERSION = 1
+ASSET_INDEX_FILE = "asset_index.json"
+ASSET_STORE_DIRECTORY = "asset_store"
+ASSET_TREE_SUFFIX = "_files"
+ASSET_OBJECT_MODE = 0o444
+
+
+def find_asset_trees(course_dir):
+    """
+    Katalogi "<strona>_files" stron z przeglądami kursu (collect_html_files),
+    bez przeglądania ich zawartości.
+    """
+    asset_trees = []
+    for html_path in collect_html_files(course_dir):
+        if split_archive_member(html_path) is not None:
+            continue
+        tree_path = os.path.splitext(html_path)[0] + ASSET_TREE_SUFFIX
+        if os.path.isdir(tree_path):
+            asset_trees.append(tree_path)
+    return asset_trees
+
+
+def load_asset_index(index_path):
+    """
+    Wczytuje indeks zasobów: {"store": ścieżka, "trees": {drzewo: wpis}}.
+    Indeks z inną wersją lub uszkodzony jest ignorowany.
+    """
+    if not os.path.exists(index_path):
+        return None
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except Exception as e:
+        print(f"Nie udało się wczytać indeksu zasobów {index_path}: {e}")
+        return None
+    if index.get("version") != ASSET_INDEX_VERSION:
+        return None
+    return {"store": index["store"], "trees": index["trees"]}
+
+
+def save_asset_index(index_path, index):
+    write_json_atomically(index_path, {"version": ASSET_INDEX_VERSION, **index})
+
+
+def asset_object_path(store_dir, sha256):
+    return os.path.join(store_dir, sha256[:2], sha256)
+
+
+def _directory_mtimes(tree_path, directories):
+    """
+    Aktualne czasy modyfikacji katalogów drzewa (ścieżki względne) albo None,
+    gdy któryś z nich zniknął.
+    """
+    mtimes = {}
+    for relative_dir in directories:
+        try:
+            mtimes[relative_dir] = os.stat(
+                os.path.join(tree_path, relative_dir)
+            ).st_mtime_ns
+        except FileNotFoundError:
+            return None
+    return mtimes
+
+
+def _store_asset(file_path, store_dir, sha256):
+    """
+    Zapewnia obiekt sha256 w magazynie i zastępuje file_path twardym
+    dowiązaniem do niego. Zwraca "new" (plik stał się obiektem magazynu),
+    "linked" (kopia zastąpiona dowiązaniem), "present" (już dowiązany),
+    "copied" (magazyn na innym systemie plików - obiekt jest nową kopią,
+    a plik zostaje osobno) lub "not_linked" (obiekt już jest, ale pliku nie
+    da się do niego dowiązać - nic nie zostało odzyskane).
+    Obiekt jest tylko do odczytu (ASSET_OBJECT_MODE) - zapis do jednej
+    kopii zmieniłby zawartość wszystkich stron, które ją współdzielą,
+    i rozminąłby się ze skrótem w nazwie obiektu. Uwaga: przy "new"
+    obiektem staje się sam plik strony, a przy "linked" plik strony jest
+    dowiązaniem, więc tylko do odczytu stają się także pliki w *_files.
+    """
+    object_path = asset_object_path(store_dir, sha256)
+    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+    try:
+        os.link(file_path, object_path)
+    except FileExistsError:
+        pass
+    except OSError:
+        # Magazyn na innym systemie plików - obiekt jest kopią, a plik zostaje
+        if os.path.exists(object_path):
+            return "not_linked"
+        shutil.copy2(file_path, object_path)
+        os.chmod(object_path, ASSET_OBJECT_MODE)
+        return "copied"
+    else:
+        os.chmod(object_path, ASSET_OBJECT_MODE)
+        return "new"
+
+    # Obiekty zapisane przed wprowadzeniem blokady też stają się tylko do odczytu
+    os.chmod(object_path, ASSET_OBJECT_MODE)
+    if os.path.samefile(file_path, object_path):
+        return "present"
+    tmp_path = file_path + ".quizbank-tmp"
+    try:
+        os.link(object_path, tmp_path)
+    except OSError:
+        return "not_linked"
+    os.replace(tmp_path, file_path)
+    return "linked"
+
+
+def _archive_tree(tree_path, store_dir, known_tree):
+    """
+    Zapisuje pliki jednego drzewa zasobów w magazynie i zwraca
+    (wpis indeksu, liczniki).
+    """
+    known_files = (known_tree or {}).get("files", {})
+    counts = {
+        "files": 0,
+        "new": 0,
+        "linked": 0,
+        "present": 0,
+        "copied": 0,
+        "not_linked": 0,
+        "bytes_saved": 0,
+    }
+    files = {}
+    directories = []
+    for dir_path, dir_names, file_names in os.walk(tree_path):
+        dir_names.sort()
+        directories.append(os.path.relpath(dir_path, tree_path))
+        for file_name in sorted(file_names):
+            file_path = os.path.join(dir_path, file_name)
+            relative_path = os.path.relpath(file_path, tree_path)
+            stat = os.stat(file_path)
+            known = known_files.get(relative_path)
+            if (
+                known
+                and known["size"] == stat.st_size
+                and known["mtime"] == stat.st_mtime_ns
+            ):
+                sha256 = known["sha256"]
+            else:
+                sha256 = file_sha256(file_path)
+            result = _store_asset(file_path, store_dir, sha256)
+            counts["files"] += 1
+            counts[result] += 1
+            if result == "linked":
+                counts["bytes_saved"] += stat.st_size
+            # Dowiązanie przejmuje czas modyfikacji obiektu
+            stat = os.stat(file_path)
+            files[relative_path] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "sha256": sha256,
+            }
+    # Czasy katalogów po zastąpieniu plików dowiązaniami (os.replace je zmienia)
+    tree_entry = {
+        "directories": _directory_mtimes(tree_path, directories),
+        "files": files,
+    }
+    return tree_entry, counts
+
+
+def archive_course_assets(course_dir, store_dir=None, rescan=False):
+    """
+    Zapisuje zasoby wszystkich stron kursu w magazynie adresowanym
+    zawartością (domyślnie ASSET_STORE_DIRECTORY w katalogu kursu; wspólny
+    magazyn kilku kursów musi leżeć na tym samym systemie plików, aby
+    działały twarde dowiązania) i aktualizuje indeks ASSET_INDEX_FILE.
+    Drzewa, których katalogi się nie zmieniły, są pomijane (chyba że rescan).
+    Zwraca słownik liczników.
+    """
+    course_dir = os.path.normpath(course_dir)
+    if store_dir is None:
+        store_dir = os.path.join(course_dir, ASSET_STORE_DIRECTORY)
+    index_path = os.path.join(course_dir, ASSET_INDEX_FILE)
+    index = load_asset_index(index_path)
+    store_key = os.path.relpath(store_dir, course_dir)
+    if index is None or index["store"] != store_key or not os.path.isdir(store_dir):
+        index = {"store": store_key, "trees": {}}
+    os.makedirs(store_dir, exist_ok=True)
+
+    totals = {
+        "trees": 0,
+        "skipped_trees": 0,
+        "files": 0,
+        "new": 0,
+        "linked": 0,
+        "present": 0,
+        "copied": 0,
+        "not_linked": 0,
+        "bytes_saved": 0,
+    }
+    trees = {}
+    for tree_path in find_asset_trees(course_dir):
+        tree_key = os.path.relpath(tree_path, course_dir)
+        known_tree = index["trees"].get(tree_key)
+        totals["trees"] += 1
+        if (
+            not rescan
+            and known_tree
+            and _directory_mtimes(tree_path, known_tree["directories"])
+            == known_tree["directories"]
+        ):
+            trees[tree_key] = known_tree
+            totals["skipped_trees"] += 1
+            continue
+        trees[tree_key], counts = _archive_tree(tree_path, store_dir, known_tree)
+        for name, value in counts.items():
+            totals[name] += value
+        # Zapis po każdym drzewie - przerwanie nie traci wykonanej pracy
+        save_asset_index(
+            index_path, {"store": store_key, "trees": {**index["trees"], **trees}}
+        )
+
+    save_asset_index(index_path, {"store": store_key, "trees": trees})
+    return totals
+
+
+def resolve_asset(course_dir, html_file_path, reference, index=None):
+    """
+    Zamienia odwołanie ze strony html_file_path (atrybut src/href, np.
+    "./Quiz 1_ ..._files/obrazek.png") na ścieżkę obiektu w magazynie kursu.
+    Gdy zasobu nie ma w indeksie, zwraca ścieżkę pliku, jeśli istnieje,
+    a w przeciwnym razie None. index to wynik load_asset_index (domyślnie
+    wczytywany z katalogu kursu).
+    """
+    course_dir = os.path.normpath(course_dir)
+    if index is None:
+        index = load_asset_index(os.path.join(course_dir, ASSET_INDEX_FILE))
+    url = urlsplit(reference)
+    if url.scheme or url.netloc:
+        return None
+    asset_path = os.path.normpath(
+        os.path.join(os.path.dirname(html_file_path), unquote(url.path))
+    )
+    relative_path = os.path.relpath(asset_path, course_dir)
+
+    if index is not None:
+        for tree_key, tree in index["trees"].items():
+            if not relative_path.startswith(tree_key + os.sep):
+                continue
+            entry = tree["files"].get(os.path.relpath(relative_path, tree_key))
+            if entry is not None:
+                store_dir = os.path.join(course_dir, index["store"])
+                object_path = asset_object_path(store_dir, entry["sha256"])
+                if os.path.exists(object_path):
+                    return object_path
+    return asset_path if os.path.isfile(asset_path) else None
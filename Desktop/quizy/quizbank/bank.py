@@ -0,0 +1,398 @@
+"""
+Baza pytań w SQLite - zastępuje płaski plik all_quiz_questions.json.
+
+Tabele:
+- attempts - źródłowe próby (pliki HTML przeglądów) ze skrótem zawartości,
+- questions - unikalne pytania; kluczem jest dedup_key, czyli
+  clean_text_for_deduplication(treść pytania),
+- answers - odpowiedzi pytania (option_position to pozycja na liście
+  wszystkich odpowiedzi; NULL dla poprawnej odpowiedzi spoza tej listy,
+  odczytanej np. z komunikatu "Poprawna odpowiedź to: ..."),
+- correct_answers - powiązania pytanie -> poprawna odpowiedź (w kolejności),
+- question_attempts - w których próbach wystąpiło pytanie,
+- question_search - indeks pełnotekstowy FTS5 treści pytań i odpowiedzi.
+
+Nowe próby są dopisywane upsertem: wygrywa pierwsza wersja pytania, chyba że
+późniejsza ma poprawną odpowiedź, a zapisana nie - ta sama reguła co
+w deduplicate_questions. Prawie-duplikaty (near_duplicates.py) są oznaczane
+kolumną duplicate_of, więc odczyt to tylko uporządkowane zapytania SQL, bez
+ponownej deduplikacji i sortowania w Pythonie.
+"""
+
+import os
+import sqlite3
+from urllib.request import pathname2url
+
+from .near_duplicates import DEFAULT_THRESHOLD, find_near_duplicate_clusters
+from .normalizer import clean_text_for_deduplication, has_correct_answer
+
+# Wersja schematu; baza z inną wersją jest budowana od nowa
+BANK_SCHEMA_VERSION = 1
+BANK_FILE = "quiz_bank.sqlite"
+
+BANK_SCHEMA = """
+CREATE TABLE attempts (
+    id INTEGER PRIMARY KEY,
+    source_path TEXT NOT NULL UNIQUE,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE questions (
+    id INTEGER PRIMARY KEY,
+    dedup_key TEXT NOT NULL UNIQUE,
+    question_text TEXT NOT NULL,
+    has_correct_answer INTEGER NOT NULL,
+    duplicate_of INTEGER REFERENCES questions(id) ON DELETE SET NULL
+);
+CREATE INDEX questions_in_order
+    ON questions(has_correct_answer, dedup_key) WHERE duplicate_of IS NULL;
+CREATE TABLE answers (
+    id INTEGER PRIMARY KEY,
+    question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+    answer_text TEXT NOT NULL,
+    option_position INTEGER,
+    UNIQUE (question_id, answer_text)
+);
+CREATE TABLE correct_answers (
+    question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    answer_id INTEGER NOT NULL REFERENCES answers(id) ON DELETE CASCADE,
+    PRIMARY KEY (question_id, position)
+) WITHOUT ROWID;
+CREATE TABLE question_attempts (
+    question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+    attempt_id INTEGER NOT NULL REFERENCES attempts(id) ON DELETE CASCADE,
+    PRIMARY KEY (question_id, attempt_id)
+) WITHOUT ROWID;
+CREATE TABLE bank_info (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE question_search USING fts5(
+    question_text, answers, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_BANK_TABLES = (
+    "question_search",
+    "question_attempts",
+    "correct_answers",
+    "answers",
+    "questions",
+    "attempts",
+    "bank_info",
+)
+
+
+def open_bank(bank_path):
+    """
+    Otwiera (lub tworzy) bazę pytań do zapisu - tylko przy budowaniu banku.
+    Bank z inną wersją schematu jest czyszczony i tworzony od nowa; inna baza
+    SQLite (bez wersji schematu, ale z tabelami) nie jest ruszana - ValueError.
+    """
+    conn = sqlite3.connect(bank_path)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if user_version != BANK_SCHEMA_VERSION:
+            if (
+                user_version == 0
+                and conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone()
+            ):
+                raise ValueError(
+                    f"Plik {bank_path} to baza SQLite, ale nie bank pytań - "
+                    "nie zostanie nadpisany."
+                )
+            with conn:
+                for table in _BANK_TABLES:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                conn.executescript(BANK_SCHEMA)
+                conn.execute(f"PRAGMA user_version = {BANK_SCHEMA_VERSION}")
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+
+def open_bank_readonly(bank_path):
+    """
+    Otwiera istniejący bank pytań tylko do odczytu (search, lookup,
+    pdf_from_json.py). Plik, który nie jest bankiem w bieżącej wersji
+    schematu (także plik, który nie jest bazą SQLite), daje ValueError -
+    odczyt niczego nie zmienia.
+    """
+    uri = "file:" + pathname2url(os.path.abspath(bank_path)) + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        user_version = conn.execute("PRAGMA user_version").fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        conn.close()
+        raise ValueError(f"Plik {bank_path} nie jest bazą SQLite: {e}") from None
+    if user_version != BANK_SCHEMA_VERSION:
+        conn.close()
+        raise ValueError(
+            f"Plik {bank_path} nie jest bankiem pytań w bieżącej wersji - "
+            "uruchom ponownie script_to_json.py."
+        )
+    return conn
+
+
+def _replace_answers(conn, question_id, q_data):
+    conn.execute("DELETE FROM answers WHERE question_id = ?", (question_id,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO answers (question_id, answer_text, option_position) "
+        "VALUES (?, ?, ?)",
+        [
+            (question_id, answer_text, position)
+            for position, answer_text in enumerate(q_data.get("all_answers", []))
+        ],
+    )
+    for position, answer_text in enumerate(q_data.get("correct_answers", [])):
+        conn.execute(
+            "INSERT OR IGNORE INTO answers (question_id, answer_text) VALUES (?, ?)",
+            (question_id, answer_text),
+        )
+        conn.execute(
+            "INSERT INTO correct_answers (question_id, position, answer_id) "
+            "SELECT ?, ?, id FROM answers WHERE question_id = ? AND answer_text = ?",
+            (question_id, position, question_id, answer_text),
+        )
+    conn.execute("DELETE FROM question_search WHERE rowid = ?", (question_id,))
+    conn.execute(
+        "INSERT INTO question_search (rowid, question_text, answers) VALUES (?, ?, ?)",
+        (
+            question_id,
+            q_data["question_text"],
+            "\n".join(q_data.get("all_answers", [])),
+        ),
+    )
+
+
+def upsert_question(conn, q_data, attempt_id=None):
+    """
+    Dopisuje pytanie do bazy. Istniejące pytanie o tym samym dedup_key jest
+    zastępowane tylko wtedy, gdy nowa wersja ma poprawną odpowiedź, a zapisana
+    nie. Zwraca id pytania albo None dla pytania z pustą treścią.
+    """
+    dedup_key = clean_text_for_deduplication(q_data.get("question_text", ""))
+    if not dedup_key:
+        return None
+    row = conn.execute(
+        "INSERT INTO questions (dedup_key, question_text, has_correct_answer) "
+        "VALUES (?, ?, ?) "
+        "ON CONFLICT (dedup_key) DO UPDATE SET "
+        "question_text = excluded.question_text, "
+        "has_correct_answer = excluded.has_correct_answer "
+        "WHERE excluded.has_correct_answer AND NOT questions.has_correct_answer "
+        "RETURNING id",
+        (dedup_key, q_data["question_text"], int(has_correct_answer(q_data))),
+    ).fetchone()
+    if row is not None:
+        # Pytanie nowe albo zastąpione lepszą wersją
+        question_id = row[0]
+        _replace_answers(conn, question_id, q_data)
+    else:
+        question_id = conn.execute(
+            "SELECT id FROM questions WHERE dedup_key = ?", (dedup_key,)
+        ).fetchone()[0]
+    if attempt_id is not None:
+        conn.execute(
+            "INSERT OR IGNORE INTO question_attempts (question_id, attempt_id) "
+            "VALUES (?, ?)",
+            (question_id, attempt_id),
+        )
+    return question_id
+
+
+def _clear_bank(conn):
+    for table in _BANK_TABLES:
+        conn.execute(f"DELETE FROM {table}")
+
+
+def sync_attempts(conn, attempts, failed_paths=()):
+    """
+    Uzgadnia bazę z listą prób [(ścieżka, sha256, pytania)] w kolejności
+    przetwarzania. Jeśli zapisane próby zniknęły lub zmieniła się ich
+    zawartość, baza jest budowana od nowa (wynik upsertów zależy od
+    kolejności); w przeciwnym razie dopisywane są tylko nowe próby.
+    failed_paths to pliki, których w tym uruchomieniu nie udało się
+    przeczytać - ich zapisane próby zostają, a gdy bank trzeba by budować
+    od nowa (co usunęłoby ich pytania), bank nie jest zmieniany.
+    Zwraca liczbę dopisanych prób.
+    """
+    stored = dict(conn.execute("SELECT source_path, sha256 FROM attempts"))
+    current = {source_path: sha256 for source_path, sha256, _ in attempts}
+    failed_paths = set(failed_paths)
+    with conn:
+        if any(
+            current.get(path) != sha256
+            for path, sha256 in stored.items()
+            if path not in failed_paths
+        ):
+            if failed_paths & stored.keys():
+                print(
+                    "Zmieniły się lub zniknęły wcześniej zapisane próby, ale "
+                    f"{len(failed_paths & stored.keys())} zapisanych plików nie "
+                    "udało się przeczytać - bank bez zmian (budowanie od nowa "
+                    "usunęłoby ich pytania)."
+                )
+                return 0
+            print("Zmieniły się lub zniknęły wcześniej zapisane próby - bank od nowa.")
+            _clear_bank(conn)
+            stored = {}
+        added = 0
+        for source_path, sha256, questions in attempts:
+            if source_path in stored:
+                continue
+            attempt_id = conn.execute(
+                "INSERT INTO attempts (source_path, sha256) VALUES (?, ?)",
+                (source_path, sha256),
+            ).lastrowid
+            for q_data in questions:
+                upsert_question(conn, q_data, attempt_id)
+            added += 1
+        if added:
+            conn.execute("DELETE FROM bank_info WHERE key = 'near_duplicate_threshold'")
+    return added
+
+
+def _stored_near_duplicate_threshold(conn):
+    row = conn.execute(
+        "SELECT value FROM bank_info WHERE key = 'near_duplicate_threshold'"
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _near_duplicate_groups(conn, threshold):
+    """
+    Grupy prawie-duplikatów wg progu threshold jako lista
+    (zachowany_wiersz, wiersze_grupy); wiersz to (id, dedup_key,
+    has_correct_answer, question_text). Pytania są brane w kolejności
+    dopisania, a z każdej grupy zostaje pierwszy wariant z zidentyfikowaną
+    odpowiedzią (lub po prostu pierwszy) - jak w collapse_near_duplicates.
+    """
+    rows = conn.execute(
+        "SELECT id, dedup_key, has_correct_answer, question_text "
+        "FROM questions ORDER BY id"
+    ).fetchall()
+    groups = []
+    for cluster in find_near_duplicate_clusters([row[1] for row in rows], threshold):
+        cluster_rows = [rows[index] for index in cluster]
+        kept = next((row for row in cluster_rows if row[2]), cluster_rows[0])
+        groups.append((kept, cluster_rows))
+    return groups
+
+
+def refresh_near_duplicates(conn, threshold=DEFAULT_THRESHOLD):
+    """
+    Oznacza prawie-duplikaty (duplicate_of) wg _near_duplicate_groups.
+    threshold=None wyłącza łączenie. Wynik jest zapamiętywany razem z progiem,
+    więc ponowne wywołanie z tym samym progiem nic nie liczy.
+    """
+    if _stored_near_duplicate_threshold(conn) == repr(threshold):
+        return
+
+    with conn:
+        conn.execute("UPDATE questions SET duplicate_of = NULL")
+        if threshold is not None:
+            groups = _near_duplicate_groups(conn, threshold)
+            for kept, cluster_rows in groups:
+                print(f"Połączono {len(cluster_rows)} podobne warianty pytania:")
+                print(f"  zachowano: {kept[3]}")
+                for row in cluster_rows:
+                    if row is not kept:
+                        print(f"  pominięto: {row[3]}")
+                        conn.execute(
+                            "UPDATE questions SET duplicate_of = ? WHERE id = ?",
+                            (kept[0], row[0]),
+                        )
+            if groups:
+                print(
+                    f"Połączono {len(groups)} grup prawie-duplikatów (próg {threshold})."
+                )
+        conn.execute(
+            "INSERT OR REPLACE INTO bank_info (key, value) "
+            "VALUES ('near_duplicate_threshold', ?)",
+            (repr(threshold),),
+        )
+
+
+def query_questions(conn, identified, threshold=DEFAULT_THRESHOLD):
+    """
+    Zwraca unikalne pytania (bez prawie-duplikatów) z zidentyfikowaną
+    odpowiedzią (identified=True) albo bez niej, posortowane po dedup_key,
+    jako słowniki w formacie parsera. Tylko odczyt: gdy bank oznaczono
+    (refresh_near_duplicates przy budowaniu) tym samym progiem, wystarcza
+    kolumna duplicate_of; przy innym progu (także None) grupy
+    prawie-duplikatów są liczone od nowa w pamięci, bez zapisu do banku.
+    """
+    if _stored_near_duplicate_threshold(conn) == repr(threshold):
+        duplicate_ids = None
+        duplicate_filter = "q.duplicate_of IS NULL"
+    else:
+        duplicate_ids = set()
+        duplicate_filter = "1"
+        if threshold is not None:
+            for kept, cluster_rows in _near_duplicate_groups(conn, threshold):
+                duplicate_ids.update(row[0] for row in cluster_rows if row is not kept)
+    questions = {}
+    for question_id, question_text in conn.execute(
+        "SELECT q.id, q.question_text FROM questions q "
+        f"WHERE {duplicate_filter} AND q.has_correct_answer = ? "
+        "ORDER BY q.dedup_key",
+        (int(identified),),
+    ):
+        if duplicate_ids is None or question_id not in duplicate_ids:
+            questions[question_id] = {
+                "question_text": question_text,
+                "all_answers": [],
+                "correct_answers": [],
+            }
+    for question_id, answer_text in conn.execute(
+        "SELECT a.question_id, a.answer_text FROM answers a "
+        "JOIN questions q ON q.id = a.question_id "
+        f"WHERE {duplicate_filter} AND q.has_correct_answer = ? "
+        "AND a.option_position IS NOT NULL "
+        "ORDER BY a.question_id, a.option_position",
+        (int(identified),),
+    ):
+        if question_id in questions:
+            questions[question_id]["all_answers"].append(answer_text)
+    for question_id, answer_text in conn.execute(
+        "SELECT c.question_id, a.answer_text FROM correct_answers c "
+        "JOIN answers a ON a.id = c.answer_id "
+        "JOIN questions q ON q.id = c.question_id "
+        f"WHERE {duplicate_filter} AND q.has_correct_answer = ? "
+        "ORDER BY c.question_id, c.position",
+        (int(identified),),
+    ):
+        if question_id in questions:
+            questions[question_id]["correct_answers"].append(answer_text)
+    return list(questions.values())
+
+
+def search_questions(conn, query, limit=20):
+    """
+    Wyszukuje pytania w indeksie FTS5 (składnia zapytań FTS5, np. "proces*").
+    Zwraca listę (treść_pytania, poprawne_odpowiedzi) od najlepiej pasujących.
+    """
+    rows = conn.execute(
+        "SELECT rowid FROM question_search WHERE question_search MATCH ? "
+        "ORDER BY rank LIMIT ?",
+        (query, limit),
+    ).fetchall()
+    results = []
+    for (question_id,) in rows:
+        question_text = conn.execute(
+            "SELECT question_text FROM questions WHERE id = ?", (question_id,)
+        ).fetchone()[0]
+        correct_answers = [
+            answer_text
+            for (answer_text,) in conn.execute(
+                "SELECT a.answer_text FROM correct_answers c "
+                "JOIN answers a ON a.id = c.answer_id "
+                "WHERE c.question_id = ? ORDER BY c.position",
+                (question_id,),
+            )
+        ]
+        results.append((question_text, correct_answers))
+    return results
@@ -0,0 +1,486 @@
+"""
+Przyrostowe budowanie kursu (quizbank build): HTML -> JSON / bank SQLite ->
+deduplikacja -> PDF, także w trybie obserwowania katalogu (quizbank watch).
+
+Etapy są celami (target) w grafie zależności, jak reguły w make: każdy cel
+ma pliki wejściowe, parametry i pliki wyjściowe. Podpis celu to skrót
+zawartości wejść (SHA-256) i parametrów; cel jest budowany ponownie tylko
+wtedy, gdy jego podpis się zmienił albo któryś z plików wyjściowych zniknął
+lub został zmieniony. Skróty plików są zapamiętywane razem z rozmiarem i czasem
+modyfikacji, więc przy braku zmian wystarcza os.stat - bez czytania plików.
+Ponieważ podpis zależy od zawartości, a nie od czasu modyfikacji, etap,
+który po przebudowaniu dał identyczny wynik, nie uruchamia kolejnych etapów.
+
+watch_course co chwilę sprawdza rozmiary i czasy modyfikacji plików HTML
+kursu i po ustaniu zmian (debounce - zapis strony z przeglądem to kilka
+plików) uruchamia build_course: parsowany jest tylko nowy plik (manifest),
+jego pytania trafiają do banku, a PDF-y są renderowane ponownie tylko wtedy,
+gdy zmieniła się ich lista pytań.
+
+Stan budowania jest zapisywany w pliku BUILD_STATE_FILE w katalogu kursu
+(można go usunąć - wtedy wszystkie cele zostaną zbudowane od nowa). Ścieżki
+w stanie są względne wobec tego katalogu, więc nie zależą od tego, jak
+katalog kursu podano w wierszu poleceń.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from .archives import html_source_files
+from .bank import BANK_FILE
+from .canvas_renderer import DEFAULT_PDF_RENDERER
+from .near_duplicates import DEFAULT_THRESHOLD
+from .page_layout import MERGED_PAGE_LAYOUT
+from .parallel_render import RENDER_CHUNK_SIZE
+from .parser import HTML_PARSER_BACKEND, PARSER_VERSION, collect_html_files
+from .storage import file_sha256, write_json_atomically
+
+# Wersja formatu stanu budowania; zmiana reguł celów wymaga jej podbicia
+BUILD_STATE_VERSION = 2
+BUILD_STATE_FILE = "quizbank_build_state.json"
+
+# Pliki wyjściowe w katalogu kursu
+QUESTIONS_JSON_FILE = "all_quiz_questions.json"
+IDENTIFIED_JSON_FILE = "unique_questions_identified.json"
+UNIDENTIFIED_JSON_FILE = "unique_questions_unidentified.json"
+IDENTIFIED_PDF_FILE = "Merged_Quiz_Pytania_Z_Odpowiedziami.pdf"
+UNIDENTIFIED_PDF_FILE = "Merged_Quiz_Pytania_Bez_Odpowiedziami.pdf"
+# Katalog fragmentów PDF pojedynczych pytań (fragment_cache=True)
+FRAGMENT_CACHE_DIRECTORY = "pdf_fragment_cache"
+
+# Tryb obserwowania: odstęp między sprawdzeniami katalogu i czas bez zmian
+# w plikach HTML, po którym uruchamiane jest budowanie (sekundy)
+WATCH_INTERVAL = 1.0
+WATCH_DEBOUNCE = 2.0
+
+
+def load_build_state(state_path):
+    """
+    Wczytuje stan budowania: {"targets": {nazwa: wpis}, "files": {ścieżka: odcisk}}.
+    Stan z inną wersją lub uszkodzony jest ignorowany.
+    """
+    empty_state = {"targets": {}, "files": {}}
+    if not os.path.exists(state_path):
+        return empty_state
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except Exception as e:
+        print(f"Nie udało się wczytać stanu budowania {state_path}: {e}")
+        return empty_state
+    if state.get("version") != BUILD_STATE_VERSION:
+        return empty_state
+    return {"targets": state["targets"], "files": state["files"]}
+
+
+def save_build_state(state_path, state):
+    write_json_atomically(state_path, {"version": BUILD_STATE_VERSION, **state})
+
+
+def file_fingerprint(file_path, known_fingerprints, key=None):
+    """
+    Zwraca odcisk pliku {"size", "mtime", "sha256"}. Skrót jest liczony
+    tylko wtedy, gdy rozmiar lub czas modyfikacji różni się od odcisku
+    zapamiętanego w known_fingerprints pod kluczem key (domyślnie ścieżka
+    pliku); słownik jest aktualizowany.
+    """
+    key = file_path if key is None else key
+    stat = os.stat(file_path)
+    known = known_fingerprints.get(key)
+    if known and known["size"] == stat.st_size and known["mtime"] == stat.st_mtime_ns:
+        return known
+    fingerprint = {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "sha256": file_sha256(file_path),
+    }
+    known_fingerprints[key] = fingerprint
+    return fingerprint
+
+
+def _output_unchanged(file_path, fingerprint):
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return False
+    return (
+        stat.st_size == fingerprint["size"] and stat.st_mtime_ns == fingerprint["mtime"]
+    )
+
+
+def target_signature(target, known_fingerprints, base_dir):
+    """
+    Podpis celu: skrót parametrów oraz nazw (względem base_dir) i zawartości
+    plików wejściowych.
+    """
+    inputs = []
+    for input_path in target["inputs"]:
+        key = os.path.relpath(input_path, base_dir)
+        fingerprint = file_fingerprint(input_path, known_fingerprints, key)
+        inputs.append([key, fingerprint["sha256"]])
+    description = json.dumps(
+        [BUILD_STATE_VERSION, target["params"], inputs],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+def run_targets(targets, state_path, force=False, label=None):
+    """
+    Buduje cele w podanej kolejności (każdy cel może zależeć tylko od
+    wyjść wcześniejszych celów). target to słownik z kluczami:
+    name, inputs (ścieżki), params (dane JSON wpływające na wynik),
+    outputs (ścieżki) i action (funkcja bez argumentów zwracająca True,
+    jeśli cel zbudowano). Wyjście, którego po akcji nie ma, jest traktowane
+    jako celowo pominięte (np. PDF bez pytań). force=True buduje wszystkie cele.
+    label (np. katalog kursu) poprzedza nazwy celów w komunikatach.
+    Zwraca True, jeśli wszystkie cele są aktualne lub zostały zbudowane.
+    """
+    state = load_build_state(state_path)
+    known_fingerprints = state["files"]
+    base_dir = os.path.dirname(state_path)
+    all_ok = True
+
+    for target in targets:
+        name = target["name"]
+        tag = f"{label}/{name}" if label else name
+        missing_inputs = [path for path in target["inputs"] if not os.path.exists(path)]
+        if missing_inputs:
+            print(f"[{tag}] brak plików wejściowych: {', '.join(missing_inputs)}")
+            state["targets"].pop(name, None)
+            all_ok = False
+            continue
+
+        signature = target_signature(target, known_fingerprints, base_dir)
+        record = state["targets"].get(name)
+        if (
+            not force
+            and record
+            and record["signature"] == signature
+            and all(
+                _output_unchanged(os.path.join(base_dir, key), fingerprint)
+                for key, fingerprint in record["outputs"].items()
+            )
+        ):
+            print(f"[{tag}] aktualny")
+            continue
+
+        print(f"[{tag}] budowanie...")
+        state["targets"].pop(name, None)
+        try:
+            built = target["action"]()
+        except Exception as e:
+            print(f"[{tag}] {e}")
+            built = False
+        if not built:
+            print(f"[{tag}] błąd budowania")
+            all_ok = False
+        else:
+            state["targets"][name] = {
+                "signature": signature,
+                "outputs": {
+                    os.path.relpath(path, base_dir): file_fingerprint(
+                        path, known_fingerprints, os.path.relpath(path, base_dir)
+                    )
+                    for path in target["outputs"]
+                    if os.path.exists(path)
+                },
+            }
+        # Zapis po każdym celu - przerwane budowanie nie traci wykonanej pracy
+        save_build_state(state_path, state)
+
+    # Zapominamy odciski plików, które nie są już wejściem ani wyjściem żadnego celu
+    used_keys = {
+        os.path.relpath(path, base_dir)
+        for target in targets
+        for path in target["inputs"] + target["outputs"]
+    }
+    for key in set(known_fingerprints) - used_keys:
+        del known_fingerprints[key]
+    save_build_state(state_path, state)
+    return all_ok
+
+
+def _build_questions_json(course_dir, json_path, jobs, backend, executor):
+    from .pipeline import build_question_bank
+
+    base, _ = os.path.splitext(json_path)
+    build_question_bank(
+        course_dir,
+        json_path,
+        base + ".jsonl",
+        base + "_manifest.json",
+        jobs=jobs,
+        backend=backend,
+        executor=executor,
+    )
+    return os.path.exists(json_path)
+
+
+def _build_bank(course_dir, json_path, bank_path, backend, threshold):
+    from .pipeline import build_question_bank
+
+    base, _ = os.path.splitext(json_path)
+    # Pliki HTML są już w manifeście po etapie json - tu nic nie jest parsowane
+    build_question_bank(
+        course_dir,
+        json_path,
+        base + ".jsonl",
+        base + "_manifest.json",
+        backend=backend,
+        output_format="sqlite",
+        output_bank_file=bank_path,
+        near_duplicate_threshold=threshold,
+    )
+    return os.path.exists(bank_path)
+
+
+def _build_deduplicated_json(json_path, identified_path, unidentified_path, threshold):
+    from .pipeline import load_deduplicated_questions
+
+    deduplicated = load_deduplicated_questions(json_path, threshold)
+    if deduplicated is None:
+        return False
+    for output_path, questions in zip(
+        (identified_path, unidentified_path), deduplicated
+    ):
+        write_json_atomically(output_path, questions)
+    return True
+
+
+def _build_merged_pdf(questions_path, pdf_path, title, options):
+    from .renderer import generate_pdf
+
+    with open(questions_path, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+    if not questions:
+        print(f"Brak pytań do wygenerowania '{pdf_path}'.")
+        # Nieaktualny PDF z poprzedniego budowania nie może zostać
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+        return True
+    return generate_pdf(pdf_path, questions, title, **options)
+
+
+def course_targets(
+    course_dir,
+    jobs=1,
+    backend=HTML_PARSER_BACKEND,
+    near_duplicate_threshold=DEFAULT_THRESHOLD,
+    renderer=DEFAULT_PDF_RENDERER,
+    layout=MERGED_PAGE_LAYOUT,
+    chunk_size=RENDER_CHUNK_SIZE,
+    fragment_cache=False,
+    executor=None,
+):
+    """
+    Zwraca cele budowania kursu (run_targets): pliki HTML -> JSON i bank
+    SQLite (BANK_FILE, dla lookup / serve) -> deduplikacja (osobne pliki
+    JSON pytań z odpowiedziami i bez nich) -> dwa zbiorcze PDF-y.
+    Wszystkie wyjścia trafiają do course_dir.
+    fragment_cache=True renderuje PDF-y z cache fragmentów pytań
+    w course_dir/FRAGMENT_CACHE_DIRECTORY.
+    executor to opcjonalna pula procesów wspólna dla wielu kursów.
+    """
+    from .pipeline import IDENTIFIED_PDF_TITLE, UNIDENTIFIED_PDF_TITLE
+    from .renderer import FONT_BOLD_FILE, FONT_FILE
+
+    json_path = os.path.join(course_dir, QUESTIONS_JSON_FILE)
+    bank_path = os.path.join(course_dir, BANK_FILE)
+    identified_path = os.path.join(course_dir, IDENTIFIED_JSON_FILE)
+    unidentified_path = os.path.join(course_dir, UNIDENTIFIED_JSON_FILE)
+    font_files = [path for path in (FONT_FILE, FONT_BOLD_FILE) if os.path.exists(path)]
+    render_options = {
+        "jobs": jobs,
+        "chunk_size": chunk_size,
+        "fragment_cache_dir": (
+            os.path.join(course_dir, FRAGMENT_CACHE_DIRECTORY)
+            if fragment_cache
+            else None
+        ),
+        "renderer": renderer,
+        "layout": layout,
+        "executor": executor,
+    }
+
+    targets = [
+        {
+            "name": "json",
+            "inputs": html_source_files(collect_html_files(course_dir)),
+            # Wszystkie backendy parsera dają ten sam wynik - liczy się wersja
+            "params": {"parser_version": PARSER_VERSION},
+            "outputs": [json_path],
+            "action": lambda: _build_questions_json(
+                course_dir, json_path, jobs, backend, executor
+            ),
+        },
+        {
+            "name": "bank",
+            "inputs": html_source_files(collect_html_files(course_dir)),
+            "params": {
+                "parser_version": PARSER_VERSION,
+                "near_duplicate_threshold": near_duplicate_threshold,
+            },
+            "outputs": [bank_path],
+            "action": lambda: _build_bank(
+                course_dir, json_path, bank_path, backend, near_duplicate_threshold
+            ),
+        },
+        {
+            "name": "dedup",
+            "inputs": [json_path],
+            "params": {"near_duplicate_threshold": near_duplicate_threshold},
+            "outputs": [identified_path, unidentified_path],
+            "action": lambda: _build_deduplicated_json(
+                json_path, identified_path, unidentified_path, near_duplicate_threshold
+            ),
+        },
+    ]
+    for name, questions_path, pdf_file, title in (
+        ("pdf-identified", identified_path, IDENTIFIED_PDF_FILE, IDENTIFIED_PDF_TITLE),
+        (
+            "pdf-unidentified",
+            unidentified_path,
+            UNIDENTIFIED_PDF_FILE,
+            UNIDENTIFIED_PDF_TITLE,
+        ),
+    ):
+        pdf_path = os.path.join(course_dir, pdf_file)
+        targets.append(
+            {
+                "name": name,
+                "inputs": [questions_path] + font_files,
+                "params": {"title": title, "renderer": renderer, "layout": layout},
+                "outputs": [pdf_path],
+                "action": lambda q=questions_path, p=pdf_path, t=title: _build_merged_pdf(
+                    q, p, t, render_options
+                ),
+            }
+        )
+    return targets
+
+
+def build_course(course_dir, force=False, **options):
+    """
+    Buduje kurs przyrostowo (course_targets + run_targets).
+    Zwraca True, jeśli wszystkie cele są aktualne lub zostały zbudowane.
+    """
+    if not os.path.isdir(course_dir):
+        print(f"Błąd: Katalog '{course_dir}' nie istnieje.")
+        return False
+    course_dir = os.path.normpath(course_dir)
+    return run_targets(
+        course_targets(course_dir, **options),
+        os.path.join(course_dir, BUILD_STATE_FILE),
+        force,
+        label=course_dir,
+    )
+
+
+def find_course_dirs(root_directory):
+    """
+    Zwraca posortowane podkatalogi root_directory, które zawierają pliki
+    HTML przeglądów quizów (collect_html_files) - każdy jest osobnym kursem.
+    """
+    course_dirs = []
+    for item_name in sorted(os.listdir(root_directory)):
+        item_path = os.path.join(root_directory, item_name)
+        if os.path.isdir(item_path) and collect_html_files(item_path):
+            course_dirs.append(item_path)
+    return course_dirs
+
+
+def load_course_list(config_path):
+    """
+    Wczytuje listę katalogów kursów z pliku JSON: lista ścieżek albo obiekt
+    {"courses": [...]}. Ścieżki względne są liczone od katalogu pliku.
+    """
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    courses = config["courses"] if isinstance(config, dict) else config
+    config_dir = os.path.dirname(config_path)
+    return [os.path.join(config_dir, course_dir) for course_dir in courses]
+
+
+def build_courses(course_dirs, jobs=1, force=False, **options):
+    """
+    Buduje wiele kursów w jednym uruchomieniu (tryb wsadowy). Przy jobs > 1
+    kursy są budowane jednocześnie w wątkach, a całe parsowanie HTML
+    i renderowanie PDF wszystkich kursów trafia do jednej wspólnej puli
+    jobs procesów - bez osobnego startu interpretera i puli dla każdego kursu.
+    Zwraca słownik {katalog_kursu: True/False} (build_course).
+    """
+    if jobs <= 1 or len(course_dirs) <= 1:
+        return {
+            course_dir: build_course(course_dir, force, jobs=jobs, **options)
+            for course_dir in course_dirs
+        }
+
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    from .renderer import register_fonts
+
+    # Czcionki rejestrujemy raz, zanim wątki kursów zaczną renderować
+    register_fonts()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # Procesy robocze startują przy pierwszym zadaniu - uruchamiamy je
+        # z wątku głównego, zanim powstaną wątki kursów
+        executor.submit(os.getpid).result()
+        with ThreadPoolExecutor(max_workers=jobs) as course_threads:
+            results = course_threads.map(
+                lambda course_dir: build_course(
+                    course_dir, force, jobs=jobs, executor=executor, **options
+                ),
+                course_dirs,
+            )
+            return dict(zip(course_dirs, results))
+
+
+def _html_snapshot(course_dir):
+    snapshot = {}
+    for source_path in html_source_files(collect_html_files(course_dir)):
+        try:
+            stat = os.stat(source_path)
+        except FileNotFoundError:
+            continue
+        snapshot[source_path] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def watch_course(
+    course_dir, interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE, force=False, **options
+):
+    """
+    Buduje kurs (build_course; force dotyczy tylko tego pierwszego
+    budowania), a potem co interval sekund sprawdza pliki
+    HTML kursu; gdy pojawią się nowe lub zmienione i przez debounce sekund
+    nic się już nie zmienia, buduje go ponownie. Działa do przerwania (Ctrl+C).
+    """
+    if not build_course(course_dir, force, **options) and not os.path.isdir(course_dir):
+        return False
+    snapshot = _html_snapshot(course_dir)
+    changed_at = None
+    print(f"Obserwuję {course_dir} (Ctrl+C kończy)...")
+    try:
+        while True:
+            time.sleep(interval)
+            current = _html_snapshot(course_dir)
+            if current != snapshot:
+                # Każda kolejna zmiana odsuwa budowanie o debounce sekund
+                snapshot = current
+                changed_at = time.monotonic()
+                continue
+            if changed_at is not None and time.monotonic() - changed_at >= debounce:
+                changed_at = None
+                start = time.perf_counter()
+                build_course(course_dir, **options)
+                print(
+                    f"Zaktualizowano {course_dir} w {time.perf_counter() - start:.1f} s. "
+                    "Obserwuję dalej..."
+                )
+    except KeyboardInterrupt:
+        pass
+    return True
@@ -0,0 +1,284 @@
+"""
+Szybki renderer PDF rysujący bezpośrednio na reportlab.pdfgen.canvas.
+
+Układ naszych PDF-ów jest stały (nagłówek, treść pytania, lista odpowiedzi,
+odstępy, każde pytanie na nowej stronie), więc nie potrzebujemy platypus:
+parsowania znaczników w Paragraph ani ogólnego układania elementów w ramkach.
+CanvasPageWriter łamie wiersze zachłannie po słowach na podstawie szerokości
+słów z pdfmetrics.stringWidth (zapamiętywanych) i rysuje je drawString.
+
+Geometria strony i znaczenie atrybutów stylów (fontName, fontSize, leading,
+leftIndent, spaceBefore/spaceAfter, textColor, alignment) odpowiadają
+SimpleDocTemplate + Paragraph, więc oba renderery używają tych samych
+obiektów ParagraphStyle. Tekst jest rysowany dosłownie - bez interpretacji
+znaczników HTML - a pogrubienie wybiera wariant czcionki jak <b> w Paragraph.
+Bloki begin_block()/end_block() odpowiadają KeepTogether (układ "compact",
+page_layout.py). Porównanie z wynikiem platypus: compare_renderers.py.
+"""
+
+from io import BytesIO
+
+# Dostępne renderery PDF (opcja --renderer w skryptach)
+PDF_RENDERERS = ("platypus", "canvas")
+DEFAULT_PDF_RENDERER = "platypus"
+
+# Marginesy strony i wewnętrzny margines ramki jak w SimpleDocTemplate
+PAGE_MARGIN = 72
+FRAME_PADDING = 6
+# Tolerancja porównań szerokości (jak _FUZZ w platypus)
+_FUZZ = 1e-6
+
+
+def bold_font_name(font_name):
+    """
+    Zwraca nazwę pogrubionego wariantu czcionki - tak jak <b> w Paragraph.
+    Jeśli rodzina czcionki nie ma wariantu pogrubionego, zwraca font_name.
+    """
+    from reportlab.lib.fonts import ps2tt, tt2ps
+
+    try:
+        family = ps2tt(font_name)[0]
+        return tt2ps(family, 1, 0)
+    except ValueError:
+        return font_name
+
+
+class CanvasPageWriter:
+    """
+    Rysuje akapity, odstępy i podziały stron kolejno od góry strony,
+    przenosząc wiersze, które się nie mieszczą, na następną stronę.
+    Domyślny rozmiar strony to A4.
+    """
+
+    def __init__(self, pagesize=None, margin=PAGE_MARGIN):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        from reportlab.pdfgen import canvas
+
+        pagesize = pagesize or A4
+        self._buffer = BytesIO()
+        self._canvas = canvas.Canvas(self._buffer, pagesize=pagesize)
+        self._string_width = stringWidth
+        page_width, page_height = pagesize
+        self._left = margin + FRAME_PADDING
+        self._width = page_width - 2 * (margin + FRAME_PADDING)
+        self._top = page_height - margin - FRAME_PADDING
+        self._bottom = margin + FRAME_PADDING
+        self._y = self._top
+        self._at_top = True
+        self._page_has_content = False
+        self._word_widths = {}
+        # Elementy bieżącego bloku (begin_block) - rysowane dopiero w end_block
+        self._block = None
+
+    def _text_width(self, text, font_name, font_size):
+        key = (text, font_name, font_size)
+        width = self._word_widths.get(key)
+        if width is None:
+            width = self._string_width(text, font_name, font_size)
+            self._word_widths[key] = width
+        return width
+
+    def wrap_words(
+        self,
+        words,
+        font_size,
+        max_width,
+        count_trailing_space=False,
+        space_shrinkage=0,
+    ):
+        """
+        Dzieli słowa (pary (słowo, czcionka)) na wiersze nie szersze niż
+        max_width, zachłannie. Słowa dłuższe niż wiersz są dzielone między
+        znakami. Tak jak Paragraph:
+        - count_trailing_space wymaga, aby zmieściła się też spacja po słowie
+          (jeśli nie jest ostatnie) - łamanie przy wordWrap="CJK",
+        - space_shrinkage pozwala wierszowi przekroczyć max_width o taką
+          część szerokości spacji na każdą spację w wierszu (spaceShrinkage).
+        Zwraca listę (słowa wiersza, szerokość wiersza).
+        """
+        lines = []
+        current_words = []
+        current_width = 0
+        last_index = len(words) - 1
+        for index, (word, font_name) in enumerate(words):
+            word_width = self._text_width(word, font_name, font_size)
+            if current_words:
+                space_width = self._text_width(" ", font_name, font_size)
+                needed_width = current_width + space_width + word_width
+                if count_trailing_space and index < last_index:
+                    needed_width += space_width
+                limit_width = max_width + (
+                    space_shrinkage * space_width * len(current_words)
+                )
+                if needed_width <= limit_width + _FUZZ:
+                    current_words.append((word, font_name))
+                    current_width += space_width + word_width
+                    continue
+                lines.append((current_words, current_width))
+                current_words, current_width = [], 0
+
+            # Słowo dłuższe niż wiersz - dzielimy je między znakami
+            while word_width > max_width + _FUZZ and len(word) > 1:
+                part_width = 0
+                split_at = 0
+                for char in word:
+                    char_width = self._text_width(char, font_name, font_size)
+                    if split_at and part_width + char_width > max_width + _FUZZ:
+                        break
+                    part_width += char_width
+                    split_at += 1
+                lines.append(([(word[:split_at], font_name)], part_width))
+                word = word[split_at:]
+                word_width = self._text_width(word, font_name, font_size)
+            current_words, current_width = [(word, font_name)], word_width
+
+        if current_words:
+            lines.append((current_words, current_width))
+        return lines
+
+    def page_break(self):
+        """
+        Kończy bieżącą stronę (jeśli coś już na niej narysowano).
+        """
+        if self._page_has_content:
+            self._canvas.showPage()
+        self._y = self._top
+        self._at_top = True
+        self._page_has_content = False
+
+    def begin_block(self):
+        """
+        Zaczyna blok trzymany razem (jak KeepTogether): kolejne akapity
+        i odstępy są tylko zapamiętywane, a rysuje je end_block().
+        """
+        self._block = []
+
+    def end_block(self):
+        """
+        Rysuje zapamiętany blok. Jeśli nie mieści się w reszcie strony,
+        zaczyna go na nowej stronie - chyba że strona jest pusta (blok
+        wyższy niż strona jest wtedy dzielony jak zwykła treść).
+        """
+        block, self._block = self._block, None
+        height = 0
+        for index, (kind, value, style) in enumerate(block):
+            if kind == "spacer":
+                height += value
+                continue
+            if index > 0:
+                height += style.spaceBefore
+            height += len(value) * style.leading + style.spaceAfter
+        if block and block[-1][0] == "paragraph":
+            # Jak w platypus: odstęp po ostatnim elemencie nie wlicza się do wysokości
+            height -= block[-1][2].spaceAfter
+        if not self._at_top and height > self._y - self._bottom + _FUZZ:
+            self.page_break()
+        for kind, value, style in block:
+            if kind == "spacer":
+                self.spacer(value)
+            else:
+                self._draw_paragraph(value, style)
+
+    def spacer(self, height):
+        """
+        Dodaje pionowy odstęp; odstęp, który nie mieści się na stronie,
+        przenosi dalszą treść na następną stronę.
+        """
+        if self._block is not None:
+            self._block.append(("spacer", height, None))
+            return
+        if height > self._y - self._bottom + _FUZZ:
+            self.page_break()
+            return
+        self._y -= height
+        self._at_top = False
+
+    def paragraph(self, text, style, bold=False, bold_prefix=None):
+        """
+        Rysuje akapit tekstu w danym stylu (ParagraphStyle). bold pogrubia
+        cały akapit, a bold_prefix to pogrubiony tekst przed text
+        (jak "<b>prefiks</b> tekst" w Paragraph). Białe znaki są zwijane
+        do pojedynczych spacji. Wewnątrz bloku akapit jest rysowany w end_block().
+        """
+        regular_font = style.fontName
+        bold_font = bold_font_name(regular_font)
+        words = []
+        if bold_prefix:
+            words.extend((word, bold_font) for word in bold_prefix.split())
+        text_font = bold_font if bold else regular_font
+        words.extend((word, text_font) for word in text.split())
+
+        font_size = style.fontSize
+        max_width = self._width - style.leftIndent - style.rightIndent
+        if style.wordWrap == "CJK":
+            lines = self.wrap_words(words, font_size, max_width, True)
+        else:
+            lines = self.wrap_words(
+                words, font_size, max_width, False, style.spaceShrinkage
+            )
+        if not lines:
+            return
+        if self._block is not None:
+            self._block.append(("paragraph", lines, style))
+            return
+        self._draw_paragraph(lines, style)
+
+    def _draw_paragraph(self, lines, style):
+        """
+        Rysuje złamane wiersze akapitu, przenosząc na następną stronę te,
+        które się nie mieszczą.
+        """
+        from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+
+        font_size = style.fontSize
+        leading = style.leading
+        left = self._left + style.leftIndent
+        max_width = self._width - style.leftIndent - style.rightIndent
+        if not self._at_top:
+            self._y -= style.spaceBefore
+        self._canvas.setFillColor(style.textColor)
+        for line_words, line_width in lines:
+            if self._y - leading < self._bottom - _FUZZ:
+                self.page_break()
+                self._canvas.setFillColor(style.textColor)
+            # Linia bazowa wiersza leży fontSize poniżej jego górnej krawędzi
+            baseline = self._y - font_size
+            if style.alignment == TA_CENTER:
+                x = left + (max_width - line_width) / 2
+            elif style.alignment == TA_RIGHT:
+                x = left + max_width - line_width
+            else:
+                x = left
+            self._draw_line(x, baseline, line_words, font_size)
+            self._y -= leading
+            self._page_has_content = True
+        self._y = max(self._y - style.spaceAfter, self._bottom)
+        self._at_top = False
+
+    def _draw_line(self, x, baseline, line_words, font_size):
+        """
+        Rysuje wiersz, łącząc kolejne słowa w tej samej czcionce w jeden napis.
+        """
+        runs = []
+        for word, font_name in line_words:
+            if runs and runs[-1][1] == font_name:
+                runs[-1][0].append(word)
+            else:
+                runs.append(([word], font_name))
+        for run_index, (run_words, font_name) in enumerate(runs):
+            run_text = " ".join(run_words)
+            if run_index < len(runs) - 1:
+                run_text += " "
+            self._canvas.setFont(font_name, font_size)
+            self._canvas.drawString(x, baseline, run_text)
+            x += self._text_width(run_text, font_name, font_size)
+
+    def getvalue(self):
+        """
+        Zamyka dokument i zwraca bajty PDF.
+        """
+        if self._page_has_content:
+            self._canvas.showPage()
+        self._canvas.save()
+        return self._buffer.getvalue()
@@ -0,0 +1,415 @@
+"""
+Wiersz poleceń pakietu: python -m quizbank <polecenie> ...
+
+Polecenia:
+- build <katalog_kursu> - przyrostowe budowanie HTML -> JSON -> deduplikacja
+  -> PDF (build.py); przebudowywane są tylko etapy, których wejścia się zmieniły.
+- watch <katalog_kursu> - build, a potem ponowne budowanie po każdym
+  zapisaniu nowych stron z przeglądem (watch_course).
+- batch <katalog|plik.json> - to samo dla wielu kursów naraz, ze wspólną pulą
+  procesów (build_courses).
+- search <bank.sqlite> <zapytanie> - wyszukiwanie pełnotekstowe w banku
+  pytań (bank.py, FTS5).
+- lookup <bank.sqlite> <fragment> - pytania najbardziej podobne do wklejonego
+  fragmentu wraz z poprawnymi odpowiedziami (lookup.py, indeks trigramowy);
+  z --server pyta działający serwer zamiast budować indeks.
+- serve <bank.sqlite> - lokalny serwer HTTP z indeksem lookup w pamięci.
+- assets <katalog_kursu> - zasoby stron (katalogi *_files) do magazynu
+  adresowanego zawartością, z twardymi dowiązaniami zamiast kopii (assets.py).
+"""
+
+import argparse
+import os
+
+from .build import (
+    WATCH_DEBOUNCE,
+    WATCH_INTERVAL,
+    build_course,
+    build_courses,
+    find_course_dirs,
+    load_course_list,
+    watch_course,
+)
+from .canvas_renderer import DEFAULT_PDF_RENDERER, PDF_RENDERERS
+from .lookup import DEFAULT_LOOKUP_HOST, DEFAULT_LOOKUP_LIMIT, DEFAULT_LOOKUP_PORT
+from .near_duplicates import DEFAULT_THRESHOLD
+from .page_layout import MERGED_PAGE_LAYOUT, PAGE_LAYOUTS
+from .parallel_render import RENDER_CHUNK_SIZE
+from .parser import HTML_PARSER_BACKEND, HTML_PARSER_BACKENDS, STREAMING_BACKEND
+
+
+def _add_build_arguments(parser, default_jobs=1):
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=default_jobs,
+        help="Liczba procesów do równoległego parsowania i renderowania PDF "
+        f"(0 = liczba rdzeni CPU; domyślnie {default_jobs}).",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=HTML_PARSER_BACKENDS + (STREAMING_BACKEND,),
+        default=HTML_PARSER_BACKEND,
+        help="Backend parsera HTML (auto = lxml, jeśli jest zainstalowany; "
+        "stream = parser strumieniowy bez budowania DOM).",
+    )
+    parser.add_argument(
+        "--render-chunk-size",
+        type=int,
+        default=RENDER_CHUNK_SIZE,
+        help="Liczba pytań w jednym fragmencie przy równoległym renderowaniu PDF.",
+    )
+    parser.add_argument(
+        "--fragment-cache",
+        action="store_true",
+        help="Używaj zapisanych fragmentów pojedynczych pytań (gotowe łamanie "
+        "wierszy) i układaj od nowa tylko nowe lub zmienione pytania.",
+    )
+    parser.add_argument(
+        "--renderer",
+        choices=PDF_RENDERERS,
+        default=DEFAULT_PDF_RENDERER,
+        help="Sposób renderowania PDF: platypus (domyślnie) lub canvas "
+        "(szybsze rysowanie bezpośrednio na canvas).",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=PAGE_LAYOUTS,
+        default=MERGED_PAGE_LAYOUT,
+        help="Układ stron: compact (domyślnie, wiele pytań na stronie) "
+        "lub page (każde pytanie na nowej stronie).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Zbuduj wszystkie etapy od nowa, nawet jeśli są aktualne.",
+    )
+
+
+def _jobs(args):
+    return args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+
+def _build_options(args):
+    return {
+        "backend": args.parser,
+        "near_duplicate_threshold": DEFAULT_THRESHOLD,
+        "renderer": args.renderer,
+        "layout": args.layout,
+        "chunk_size": args.render_chunk_size,
+        "fragment_cache": args.fragment_cache,
+    }
+
+
+def _run_build(args):
+    ok = build_course(
+        args.course_dir,
+        force=args.force,
+        jobs=_jobs(args),
+        **_build_options(args),
+    )
+    return 0 if ok else 1
+
+
+def _run_watch(args):
+    ok = watch_course(
+        args.course_dir,
+        interval=args.interval,
+        debounce=args.debounce,
+        force=args.force,
+        jobs=_jobs(args),
+        **_build_options(args),
+    )
+    return 0 if ok else 1
+
+
+def _run_batch(args):
+    if os.path.isfile(args.courses):
+        course_dirs = load_course_list(args.courses)
+    elif os.path.isdir(args.courses):
+        course_dirs = find_course_dirs(args.courses)
+    else:
+        print(f"Błąd: '{args.courses}' nie jest katalogiem ani plikiem.")
+        return 1
+    if not course_dirs:
+        print(f"Nie znaleziono kursów z plikami HTML w '{args.courses}'.")
+        return 1
+
+    jobs = _jobs(args)
+    print(f"Kursy do zbudowania: {len(course_dirs)} (procesy: {jobs}).")
+    results = build_courses(course_dirs, jobs, args.force, **_build_options(args))
+
+    print("\nPodsumowanie:")
+    for course_dir, ok in results.items():
+        print(f"  {course_dir}: {'OK' if ok else 'BŁĄD'}")
+    return 0 if all(results.values()) else 1
+
+
+def _run_search(args):
+    import sqlite3
+
+    from .bank import open_bank_readonly, search_questions
+
+    if not os.path.exists(args.bank):
+        print(f"Błąd: Plik '{args.bank}' nie istnieje.")
+        return 1
+    try:
+        conn = open_bank_readonly(args.bank)
+    except ValueError as e:
+        print(f"Błąd: {e}")
+        return 1
+    try:
+        results = search_questions(conn, args.query, args.limit)
+    except sqlite3.OperationalError as e:
+        print(f"Niepoprawne zapytanie '{args.query}': {e}")
+        return 1
+    except sqlite3.DatabaseError as e:
+        print(f"Błąd odczytu banku {args.bank}: {e}")
+        return 1
+    finally:
+        conn.close()
+    if not results:
+        print("Brak pasujących pytań.")
+    for question_text, correct_answers in results:
+        print(f"Pytanie: {question_text}")
+        print(f"  Poprawna odpowiedź: {'; '.join(correct_answers) or '(brak)'}")
+    return 0
+
+
+def _print_lookup_results(results):
+    if not results:
+        print("Brak pasujących pytań.")
+    for result in results:
+        print(f"[{result['score']:.2f}] Pytanie: {result['question_text']}")
+        print(
+            "  Poprawna odpowiedź: "
+            f"{'; '.join(result['correct_answers']) or '(brak)'}"
+        )
+
+
+def _run_lookup(args):
+    import time
+
+    from .lookup import load_question_index, lookup_response
+
+    if args.server:
+        import json
+        from urllib.parse import urlencode
+        from urllib.request import urlopen
+
+        url = (
+            f"{args.server.rstrip('/')}/lookup?"
+            f"{urlencode({'q': args.fragment, 'limit': args.limit})}"
+        )
+        try:
+            with urlopen(url) as response:
+                data = json.load(response)
+        except OSError as e:
+            print(f"Błąd połączenia z serwerem {args.server}: {e}")
+            return 1
+        _print_lookup_results(data["results"])
+        print(f"Wyszukiwanie: {data['took_ms']} ms (serwer).")
+        return 0
+
+    if not os.path.exists(args.bank):
+        print(f"Błąd: Plik '{args.bank}' nie istnieje.")
+        return 1
+    start = time.perf_counter()
+    try:
+        index = load_question_index(args.bank)
+    except ValueError as e:
+        print(f"Błąd: {e}")
+        return 1
+    load_ms = (time.perf_counter() - start) * 1000
+    data = lookup_response(index, args.fragment, args.limit)
+    _print_lookup_results(data["results"])
+    print(
+        f"Indeks: {len(index)} pytań (wczytany w {load_ms:.1f} ms), "
+        f"wyszukiwanie: {data['took_ms']} ms."
+    )
+    return 0
+
+
+def _run_serve(args):
+    from .lookup import serve_lookup
+
+    if not os.path.exists(args.bank):
+        print(f"Błąd: Plik '{args.bank}' nie istnieje.")
+        return 1
+    serve_lookup(args.bank, args.host, args.port)
+    return 0
+
+
+def _run_assets(args):
+    from .assets import archive_course_assets
+
+    if not os.path.isdir(args.course_dir):
+        print(f"Błąd: Katalog '{args.course_dir}' nie istnieje.")
+        return 1
+    totals = archive_course_assets(args.course_dir, args.store, args.rescan)
+    print(
+        f"Drzewa zasobów: {totals['trees']} (bez zmian, pominięte: "
+        f"{totals['skipped_trees']}); sprawdzone pliki: {totals['files']}."
+    )
+    print(
+        f"Nowe obiekty w magazynie: {totals['new']}, kopie zastąpione "
+        f"dowiązaniami: {totals['linked']} "
+        f"(zwolniono {totals['bytes_saved'] / (1 << 20):.1f} MB), "
+        f"już dowiązane: {totals['present']}."
+    )
+    if totals["copied"] or totals["not_linked"]:
+        print(
+            "Nie udało się dowiązać (magazyn na innym dysku?): "
+            f"{totals['copied'] + totals['not_linked']} plików, w tym "
+            f"skopiowanych do magazynu: {totals['copied']} - te pliki nadal "
+            "zajmują miejsce osobno."
+        )
+    return 0
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m quizbank",
+        description="Baza pytań z quizów Moodle: budowanie JSON i PDF z przeglądów HTML.",
+    )
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser(
+        "build",
+        help="Zbuduj przyrostowo JSON i zbiorcze PDF-y kursu.",
+        description="Buduje HTML -> JSON -> deduplikacja -> PDF dla katalogu "
+        "kursu; przebudowuje tylko etapy, których wejścia się zmieniły.",
+    )
+    build_parser.add_argument(
+        "course_dir", help="Katalog kursu z podkatalogami quiz_X (pliki HTML)."
+    )
+    _add_build_arguments(build_parser)
+    build_parser.set_defaults(handler=_run_build)
+
+    watch_parser = commands.add_parser(
+        "watch",
+        help="Obserwuj katalog kursu i przebudowuj go po zapisaniu nowych stron.",
+        description="Buduje kurs jak build, a potem sprawdza co --interval "
+        "sekund pliki HTML w katalogu kursu. Po zapisaniu nowego przeglądu "
+        "(i --debounce sekundach bez dalszych zmian) parsuje tylko nowe pliki, "
+        "dopisuje je do banku pytań i renderuje ponownie tylko te PDF-y, "
+        "których lista pytań się zmieniła.",
+    )
+    watch_parser.add_argument(
+        "course_dir", help="Katalog kursu z podkatalogami quiz_X (pliki HTML)."
+    )
+    _add_build_arguments(watch_parser)
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=WATCH_INTERVAL,
+        help="Co ile sekund sprawdzać pliki HTML.",
+    )
+    watch_parser.add_argument(
+        "--debounce",
+        type=float,
+        default=WATCH_DEBOUNCE,
+        help="Ile sekund bez zmian odczekać przed budowaniem "
+        "(zapis strony to kilka plików).",
+    )
+    watch_parser.set_defaults(handler=_run_watch)
+
+    batch_parser = commands.add_parser(
+        "batch",
+        help="Zbuduj przyrostowo wiele kursów w jednym uruchomieniu.",
+        description="Buduje wszystkie kursy (podkatalogi z plikami HTML) "
+        "z podanego katalogu albo kursy wymienione w pliku JSON (lista "
+        'katalogów lub {"courses": [...]}, ścieżki względem pliku). '
+        "Parsowanie i renderowanie wszystkich kursów dzielą jedną pulę procesów, "
+        "a wyniki trafiają do katalogu każdego kursu.",
+    )
+    batch_parser.add_argument(
+        "courses", help="Katalog z kursami albo plik JSON z listą katalogów kursów."
+    )
+    _add_build_arguments(batch_parser, default_jobs=0)
+    batch_parser.set_defaults(handler=_run_batch)
+
+    search_parser = commands.add_parser(
+        "search",
+        help="Wyszukaj pytania w banku SQLite (indeks pełnotekstowy).",
+        description="Wyszukuje pytania po treści pytań i odpowiedzi "
+        '(składnia FTS5, np. proces* lub "zarządzanie zmianą").',
+    )
+    search_parser.add_argument("bank", help="Plik banku pytań (quiz_bank.sqlite).")
+    search_parser.add_argument("query", help="Zapytanie pełnotekstowe.")
+    search_parser.add_argument(
+        "--limit", type=int, default=10, help="Maksymalna liczba wyników."
+    )
+    search_parser.set_defaults(handler=_run_search)
+
+    lookup_parser = commands.add_parser(
+        "lookup",
+        help="Znajdź pytanie po fragmencie treści i pokaż poprawne odpowiedzi.",
+        description="Zwraca pytania najbardziej podobne do fragmentu (indeks "
+        "trigramowy, odporny na literówki i brak interpunkcji) z poprawnymi "
+        "odpowiedziami.",
+    )
+    lookup_parser.add_argument(
+        "bank", help="Plik banku pytań (quiz_bank.sqlite; pomijany z --server)."
+    )
+    lookup_parser.add_argument("fragment", help="Fragment treści pytania.")
+    lookup_parser.add_argument(
+        "--limit",
+        type=int,
+        default=DEFAULT_LOOKUP_LIMIT,
+        help="Maksymalna liczba wyników.",
+    )
+    lookup_parser.add_argument(
+        "--server",
+        help="Adres działającego serwera (np. http://127.0.0.1:8765) - "
+        "odpowiedź z gotowego indeksu w pamięci serwera.",
+    )
+    lookup_parser.set_defaults(handler=_run_lookup)
+
+    serve_parser = commands.add_parser(
+        "serve",
+        help="Uruchom lokalny serwer HTTP do wyszukiwania pytań.",
+        description="Trzyma indeks trigramowy banku w pamięci i odpowiada na "
+        "GET /lookup?q=<fragment>&limit=<n> (JSON). Zmiana pliku banku jest "
+        "wykrywana przy kolejnym zapytaniu i indeks jest wczytywany ponownie.",
+    )
+    serve_parser.add_argument("bank", help="Plik banku pytań (quiz_bank.sqlite).")
+    serve_parser.add_argument(
+        "--host", default=DEFAULT_LOOKUP_HOST, help="Adres nasłuchiwania."
+    )
+    serve_parser.add_argument(
+        "--port", type=int, default=DEFAULT_LOOKUP_PORT, help="Port nasłuchiwania."
+    )
+    serve_parser.set_defaults(handler=_run_serve)
+
+    assets_parser = commands.add_parser(
+        "assets",
+        help="Przenieś zasoby stron (*_files) do magazynu adresowanego zawartością.",
+        description="Liczy skrót SHA-256 każdego pliku z katalogów *_files stron "
+        "kursu, zapisuje każdą zawartość raz w magazynie i zastępuje kopie "
+        "twardymi dowiązaniami. Indeks asset_index.json pozwala pominąć przy "
+        "kolejnym uruchomieniu drzewa, w których nic się nie zmieniło. "
+        "Obiekty magazynu są tylko do odczytu, a ponieważ pliki w *_files są "
+        "ich twardymi dowiązaniami, tylko do odczytu stają się też pliki stron.",
+    )
+    assets_parser.add_argument(
+        "course_dir", help="Katalog kursu z podkatalogami quiz_X (pliki HTML)."
+    )
+    assets_parser.add_argument(
+        "--store",
+        help="Katalog magazynu (domyślnie asset_store w katalogu kursu; "
+        "musi leżeć na tym samym dysku co kurs).",
+    )
+    assets_parser.add_argument(
+        "--rescan",
+        action="store_true",
+        help="Ignoruj czasy katalogów w indeksie i sprawdź rozmiar i czas "
+        "modyfikacji każdego pliku. Bez tej opcji zmiana pliku w miejscu (bez "
+        "dodania ani usunięcia plików) nie jest wykrywana; pliki w magazynie "
+        "i ich dowiązania są tylko do odczytu.",
+    )
+    assets_parser.set_defaults(handler=_run_assets)
+
+    args = arg_parser.parse_args(argv)
+    return args.handler(args)
@@ -0,0 +1,139 @@
+"""
+Leniwa rejestracja czcionek TTF dla ReportLab z cache metryk na dysku.
+
+Skrypty rejestrują czcionki dopiero przed pierwszym renderowaniem PDF (nie przy
+imporcie), więc np. --help nie płaci za wczytanie czcionek. Parsowanie pliku
+TTF (tabele, szerokości znaków, mapowanie znak -> glif) jest zapisywane (pickle)
+w katalogu font_metrics_cache/ obok pliku czcionki; przy kolejnych
+uruchomieniach czcionka jest odtwarzana z cache, a z pliku TTF czytane są tylko
+surowe bajty potrzebne przy osadzaniu podzbioru czcionki w PDF.
+
+Cache jest ważny dla danego rozmiaru i czasu modyfikacji pliku TTF oraz wersji
+ReportLab; w razie jakiegokolwiek problemu czcionka jest parsowana normalnie.
+Katalog można w każdej chwili usunąć. Pliki są wczytywane przez pickle, więc
+nie należy umieszczać w nim plików z niezaufanych źródeł.
+"""
+
+import os
+import pickle
+
+# Wersja formatu cache metryk; zmiana zapisywanych danych wymaga jej podbicia
+FONT_METRICS_CACHE_VERSION = 1
+FONT_METRICS_CACHE_DIR = "font_metrics_cache"
+
+# Atrybuty, których nie da się (lub nie warto) zapisać: stan zależny od dokumentu,
+# funkcja skalująca (lambda) i surowe bajty pliku (czytane z TTF przy wczytaniu)
+_SKIPPED_FONT_ATTRIBUTES = ("face", "state")
+_SKIPPED_FACE_ATTRIBUTES = ("_pdfScale", "_ttf_data")
+
+
+def _metrics_cache_path(font_file):
+    font_dir, font_filename = os.path.split(os.path.abspath(font_file))
+    return os.path.join(font_dir, FONT_METRICS_CACHE_DIR, font_filename + ".pickle")
+
+
+def _font_file_signature(font_file):
+    from reportlab import Version
+
+    stat = os.stat(font_file)
+    return [FONT_METRICS_CACHE_VERSION, Version, stat.st_size, stat.st_mtime_ns]
+
+
+def _pdf_scale(units_per_em):
+    """
+    Funkcja skalująca jednostki czcionki do 1/1000 em - jak w TTFontFile.
+    """
+    if units_per_em == 1000:
+        return lambda x: x
+    multiplier = 1000 / units_per_em
+    return lambda x: x * multiplier
+
+
+def _load_cached_ttfont(font_name, font_file, signature):
+    """
+    Odtwarza TTFont z cache metryk albo zwraca None (brak lub nieaktualny cache).
+    """
+    from weakref import WeakKeyDictionary
+
+    from reportlab.pdfbase.ttfonts import TTFont, TTFontFace
+
+    try:
+        with open(_metrics_cache_path(font_file), "rb") as f:
+            cached = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Nie udało się wczytać metryk czcionki {font_file} z cache: {e}")
+        return None
+    if cached.get("signature") != signature:
+        return None
+
+    face = TTFontFace.__new__(TTFontFace)
+    face.__dict__.update(cached["face"])
+    with open(font_file, "rb") as f:
+        face._ttf_data = f.read()
+    face._pdfScale = _pdf_scale(face.unitsPerEm)
+
+    font = TTFont.__new__(TTFont)
+    font.__dict__.update(cached["font"])
+    font.fontName = font_name
+    font.face = face
+    font.state = WeakKeyDictionary()
+    return font
+
+
+def _store_ttfont_metrics(font, font_file, signature):
+    """
+    Zapisuje metryki sparsowanej czcionki atomowo (plik tymczasowy + os.replace).
+    Błąd zapisu (np. katalog tylko do odczytu) nie przerywa renderowania.
+    """
+    cached = {
+        "signature": signature,
+        "font": {
+            key: value
+            for key, value in vars(font).items()
+            if key not in _SKIPPED_FONT_ATTRIBUTES
+        },
+        "face": {
+            key: value
+            for key, value in vars(font.face).items()
+            if key not in _SKIPPED_FACE_ATTRIBUTES
+        },
+    }
+    cache_path = _metrics_cache_path(font_file)
+    tmp_path = cache_path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"Nie udało się zapisać metryk czcionki {font_file} w cache: {e}")
+
+
+def load_ttfont(font_name, font_file):
+    """
+    Zwraca TTFont dla pliku font_file - z cache metryk, jeśli jest aktualny,
+    w przeciwnym razie parsuje plik i zapisuje metryki w cache.
+    Brak pliku czcionki zgłasza wyjątek, jak TTFont.
+    """
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    signature = _font_file_signature(font_file)
+    font = _load_cached_ttfont(font_name, font_file, signature)
+    if font is None:
+        font = TTFont(font_name, font_file)
+        _store_ttfont_metrics(font, font_file, signature)
+    return font
+
+
+def register_ttf_font(font_name, font_file):
+    """
+    Rejestruje czcionkę TTF w ReportLab (load_ttfont). Czcionka już
+    zarejestrowana w tym procesie nie jest wczytywana ponownie.
+    """
+    from reportlab.pdfbase import pdfmetrics
+
+    if font_name in pdfmetrics.getRegisteredFontNames():
+        return
+    pdfmetrics.registerFont(load_ttfont(font_name, font_file))
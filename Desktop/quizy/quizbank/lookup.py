@@ -0,0 +1,258 @@
+"""
+Szybkie wyszukiwanie pytania po fragmencie treści (quizbank lookup / serve).
+
+Treść każdego pytania z banku (bank.py) jest normalizowana przez
+clean_text_for_deduplication i dzielona na trigramy znakowe, z których
+budujemy indeks odwrócony {trigram: [numery pytań]}. Zapytanie też jest
+normalizowane i dzielone na trigramy; wynik pytania to odsetek trigramów
+zapytania, które w nim występują (fragment nie musi być całym pytaniem,
+a literówki obniżają wynik tylko o kilka trigramów). Pytania zawierające
+cały znormalizowany fragment są na początku listy.
+
+Częste trigramy (np. "nie", " pr") mają listy obejmujące prawie cały bank,
+więc kandydatów wybieramy tylko po najrzadszych trigramach zapytania,
+a dokładny wynik liczymy dla kilkudziesięciu najlepszych kandydatów.
+
+serve_lookup trzyma indeks w pamięci procesu i odpowiada przez HTTP
+(tylko localhost); gdy plik banku się zmieni, indeks jest wczytywany
+ponownie przy najbliższym zapytaniu.
+"""
+
+import heapq
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+from .bank import open_bank_readonly
+from .near_duplicates import text_shingles
+from .normalizer import clean_text_for_deduplication
+
+TRIGRAM_SIZE = 3
+DEFAULT_LOOKUP_LIMIT = 5
+# Minimalny odsetek trigramów zapytania, które muszą wystąpić w pytaniu
+MIN_LOOKUP_SCORE = 0.3
+# Liczba najrzadszych trigramów zapytania użytych do wyboru kandydatów
+# i minimalna liczba kandydatów ocenianych dokładnie
+LOOKUP_PROBE_TRIGRAMS = 12
+LOOKUP_MIN_CANDIDATES = 50
+DEFAULT_LOOKUP_HOST = "127.0.0.1"
+DEFAULT_LOOKUP_PORT = 8765
+
+
+def text_trigrams(normalized_text):
+    """
+    Trigramy znormalizowanego tekstu; spacje na brzegach sprawiają, że
+    początki i końce słów mają własne trigramy.
+    """
+    return text_shingles(f" {normalized_text} ", TRIGRAM_SIZE)
+
+
+class QuestionIndex:
+    """
+    Indeks trigramowy pytań. entries to słowniki z kluczami question_text,
+    all_answers i correct_answers (format parsera).
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.keys = [
+            clean_text_for_deduplication(entry["question_text"]) for entry in entries
+        ]
+        postings = defaultdict(list)
+        for number, key in enumerate(self.keys):
+            for trigram in text_trigrams(key):
+                postings[trigram].append(number)
+        self.postings = dict(postings)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, fragment, limit=DEFAULT_LOOKUP_LIMIT):
+        """
+        Zwraca do limit najlepiej pasujących pytań jako słowniki wpisów
+        uzupełnione o score (0-1, odsetek trigramów zapytania w pytaniu).
+        """
+        normalized = clean_text_for_deduplication(fragment)
+        if not normalized:
+            return []
+        trigrams = text_trigrams(normalized)
+        probe_postings = sorted(
+            (
+                self.postings[trigram]
+                for trigram in trigrams
+                if trigram in self.postings
+            ),
+            key=len,
+        )[:LOOKUP_PROBE_TRIGRAMS]
+        hits = Counter()
+        for postings in probe_postings:
+            hits.update(postings)
+        candidates = heapq.nlargest(
+            max(limit * 10, LOOKUP_MIN_CANDIDATES), hits, key=hits.__getitem__
+        )
+
+        min_hits = math.ceil(len(trigrams) * MIN_LOOKUP_SCORE)
+        scored = []
+        for number in candidates:
+            count = len(trigrams & text_trigrams(self.keys[number]))
+            if count >= min_hits:
+                scored.append((number, count))
+        # Klucz sortowania: najpierw pytania zawierające cały fragment,
+        # potem wyższy wynik, a przy remisie krótsze pytanie
+        ranked = heapq.nsmallest(
+            limit,
+            (
+                (
+                    normalized not in self.keys[number],
+                    -count,
+                    len(self.keys[number]),
+                    number,
+                )
+                for number, count in scored
+            ),
+        )
+        return [
+            {**self.entries[number], "score": round(-negative_count / len(trigrams), 3)}
+            for _, negative_count, _, number in ranked
+        ]
+
+
+def load_question_index(bank_path):
+    """
+    Buduje QuestionIndex z banku SQLite (tylko odczyt). Pomija prawie-duplikaty
+    oznaczone w banku (duplicate_of).
+    """
+    conn = open_bank_readonly(bank_path)
+    try:
+        entries = {}
+        for question_id, question_text in conn.execute(
+            "SELECT id, question_text FROM questions "
+            "WHERE duplicate_of IS NULL ORDER BY id"
+        ):
+            entries[question_id] = {
+                "question_text": question_text,
+                "all_answers": [],
+                "correct_answers": [],
+            }
+        for question_id, answer_text in conn.execute(
+            "SELECT question_id, answer_text FROM answers "
+            "WHERE option_position IS NOT NULL ORDER BY question_id, option_position"
+        ):
+            if question_id in entries:
+                entries[question_id]["all_answers"].append(answer_text)
+        for question_id, answer_text in conn.execute(
+            "SELECT c.question_id, a.answer_text FROM correct_answers c "
+            "JOIN answers a ON a.id = c.answer_id ORDER BY c.question_id, c.position"
+        ):
+            if question_id in entries:
+                entries[question_id]["correct_answers"].append(answer_text)
+    finally:
+        conn.close()
+    return QuestionIndex(list(entries.values()))
+
+
+class ReloadingQuestionIndex:
+    """
+    QuestionIndex banku, który wczytuje się ponownie, gdy zmieni się
+    rozmiar lub czas modyfikacji pliku banku (sprawdzane przy każdym
+    zapytaniu - to jedno os.stat). Bezpieczny dla wielu wątków.
+    """
+
+    def __init__(self, bank_path):
+        self.bank_path = bank_path
+        self._lock = threading.Lock()
+        self._stat_key = None
+        self._index = None
+        self.current()
+
+    def current(self):
+        stat = os.stat(self.bank_path)
+        stat_key = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if stat_key != self._stat_key:
+                start = time.perf_counter()
+                try:
+                    self._index = load_question_index(self.bank_path)
+                except Exception as e:
+                    # Bank w trakcie zapisu - zostajemy przy poprzednim indeksie
+                    # i próbujemy ponownie przy następnym zapytaniu
+                    if self._index is None:
+                        raise
+                    print(f"Nie udało się wczytać ponownie {self.bank_path}: {e}")
+                    return self._index
+                self._stat_key = stat_key
+                print(
+                    f"Wczytano indeks {self.bank_path}: {len(self._index)} pytań "
+                    f"({(time.perf_counter() - start) * 1000:.1f} ms)."
+                )
+            return self._index
+
+
+def lookup_response(index, fragment, limit=DEFAULT_LOOKUP_LIMIT):
+    """
+    Wyszukuje fragment i zwraca odpowiedź w formacie serwera:
+    {"query", "took_ms", "results"}.
+    """
+    start = time.perf_counter()
+    results = index.search(fragment, limit)
+    return {
+        "query": fragment,
+        "took_ms": round((time.perf_counter() - start) * 1000, 3),
+        "results": results,
+    }
+
+
+def serve_lookup(bank_path, host=DEFAULT_LOOKUP_HOST, port=DEFAULT_LOOKUP_PORT):
+    """
+    Uruchamia serwer HTTP z indeksem w pamięci:
+    GET /lookup?q=<fragment>&limit=<n> -> JSON z lookup_response.
+    Działa do przerwania (Ctrl+C).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlsplit
+
+    reloading_index = ReloadingQuestionIndex(bank_path)
+
+    class LookupHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path != "/lookup":
+                self._send_json(404, {"error": "Nieznana ścieżka - użyj /lookup?q=..."})
+                return
+            params = parse_qs(url.query)
+            fragment = params.get("q", [""])[0]
+            try:
+                limit = int(params.get("limit", [DEFAULT_LOOKUP_LIMIT])[0])
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            try:
+                index = reloading_index.current()
+            except Exception as e:
+                self._send_json(500, {"error": str(e)})
+                return
+            self._send_json(200, lookup_response(index, fragment, limit))
+
+        def _send_json(self, status, data):
+            body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Bez logu każdego zapytania - serwer odpowiada na każde wklejenie
+            pass
+
+    server = ThreadingHTTPServer((host, port), LookupHandler)
+    print(f"Serwer wyszukiwania: http://{host}:{port}/lookup?q=... (Ctrl+C kończy)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,140 @@
+"""
+Wykrywanie prawie-duplikatów pytań (MinHash + LSH).
+
+Dokładna deduplikacja po clean_text_for_deduplication nie łączy pytań,
+które różnią się jednym słowem, literówką albo artefaktem HTML.
+Porównywanie każdej pary to O(n^2), więc zamiast tego:
+  1. każdy tekst zamieniamy na zbiór n-gramów znakowych (shingle),
+  2. liczymy sygnaturę MinHash (przybliża podobieństwo Jaccarda),
+  3. dzielimy sygnatury na pasma (LSH) - kandydatami są tylko teksty,
+     które trafiły do tego samego kubełka w co najmniej jednym paśmie,
+  4. kandydatów weryfikujemy dokładnym podobieństwem Jaccarda.
+Koszt jest w praktyce liniowy względem liczby pytań.
+"""
+
+import hashlib
+import random
+from collections import defaultdict
+
+SHINGLE_SIZE = 4  # Długość n-gramu znakowego
+DEFAULT_NUM_PERM = 128  # Liczba funkcji haszujących w sygnaturze MinHash
+DEFAULT_THRESHOLD = 0.85  # Minimalne podobieństwo Jaccarda prawie-duplikatów
+
+_SEED = 1  # Stałe ziarno - sygnatury są powtarzalne między uruchomieniami
+
+
+def text_shingles(text, size=SHINGLE_SIZE):
+    """
+    Zwraca zbiór n-gramów znakowych tekstu. Tekst krótszy niż size
+    jest traktowany jako pojedynczy n-gram.
+    """
+    if len(text) <= size:
+        return {text}
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+def _hash_masks(num_perm):
+    """
+    Zwraca losowe 64-bitowe maski - każda wyznacza jedną funkcję haszującą
+    h XOR maska. To kilka razy szybsze w czystym Pythonie niż (a*h + b) mod p.
+    """
+    rng = random.Random(_SEED)
+    return [rng.getrandbits(64) for _ in range(num_perm)]
+
+
+def _shingle_hash(shingle):
+    digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def minhash_signature(shingles, masks):
+    """
+    Liczy sygnaturę MinHash zbioru n-gramów - po jednym minimum na maskę.
+    """
+    hashes = [_shingle_hash(shingle) for shingle in shingles]
+    return tuple(min([h ^ mask for h in hashes]) for mask in masks)
+
+
+def choose_lsh_bands(num_perm, threshold):
+    """
+    Dobiera liczbę pasm i wierszy (bands * rows = num_perm) tak, aby próg LSH
+    (1/bands)^(1/rows) był jak najbliżej progu podobieństwa, ale nie powyżej -
+    wolimy więcej kandydatów (odsianych potem dokładnie) niż przeoczone pary.
+    """
+    best = (num_perm, 1)
+    best_distance = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        lsh_threshold = (1 / bands) ** (1 / rows)
+        if lsh_threshold > threshold:
+            continue
+        distance = threshold - lsh_threshold
+        if best_distance is None or distance < best_distance:
+            best, best_distance = (bands, rows), distance
+    return best
+
+
+def jaccard_similarity(first, second):
+    """
+    Dokładne podobieństwo Jaccarda dwóch zbiorów.
+    """
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def find_near_duplicate_clusters(
+    texts, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM
+):
+    """
+    Grupuje teksty o podobieństwie Jaccarda (na n-gramach) >= threshold.
+    Zwraca listę klastrów - list indeksów z texts, posortowanych rosnąco -
+    tylko dla klastrów z co najmniej dwoma elementami. Teksty powinny być
+    już znormalizowane (np. clean_text_for_deduplication).
+    """
+    masks = _hash_masks(num_perm)
+    bands, rows = choose_lsh_bands(num_perm, threshold)
+
+    shingle_sets = [text_shingles(text) for text in texts]
+    buckets = defaultdict(list)
+    for index, shingles in enumerate(shingle_sets):
+        signature = minhash_signature(shingles, masks)
+        for band in range(bands):
+            band_key = (band, signature[band * rows : (band + 1) * rows])
+            buckets[band_key].append(index)
+
+    # Union-find na parach zweryfikowanych dokładnym podobieństwem
+    parent = list(range(len(texts)))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    checked_pairs = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for position, first in enumerate(members):
+            for second in members[position + 1 :]:
+                if (first, second) in checked_pairs:
+                    continue
+                checked_pairs.add((first, second))
+                if find(first) == find(second):
+                    continue
+                if (
+                    jaccard_similarity(shingle_sets[first], shingle_sets[second])
+                    >= threshold
+                ):
+                    parent[find(second)] = find(first)
+
+    clusters = defaultdict(list)
+    for index in range(len(texts)):
+        clusters[find(index)].append(index)
+    return sorted(
+        (members for members in clusters.values() if len(members) > 1),
+        key=lambda members: members[0],
+    )
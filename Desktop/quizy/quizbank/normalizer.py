@@ -0,0 +1,137 @@
+"""
+Normalizacja i deduplikacja pytań - wspólna dla pdf_from_json.py i merger.py.
+
+Pytania są porównywane po clean_text_for_deduplication (bez interpunkcji,
+małe litery, znormalizowane białe znaki), a prawie-duplikaty łączy
+collapse_near_duplicates (MinHash + LSH, near_duplicates.py).
+"""
+
+import re
+
+from .near_duplicates import find_near_duplicate_clusters
+
+
+def clean_text_for_deduplication(text):
+    """
+    Czyści tekst pytania do celów deduplikacji:
+    usuwa znaki interpunkcyjne, zamienia na małe litery, usuwa białe znaki.
+    """
+    if not isinstance(text, str):
+        return ""
+    # \w obejmuje litery Unicode, więc polskie znaki zostają
+    text = re.sub(r"[^\w\s]", "", text)  # Usuń znaki interpunkcyjne
+    text = text.lower()  # Małe litery
+    text = re.sub(r"\s+", " ", text).strip()  # Znormalizuj białe znaki
+    return text
+
+
+def has_correct_answer(q_data):
+    """
+    Sprawdza, czy pytanie ma zidentyfikowaną poprawną odpowiedź. Pytania
+    odczytane z PDF (pdf_text.py) mają flagę has_identified_correct_answer,
+    a w pytaniach z JSON wynika ona z obecności poprawnych odpowiedzi.
+    """
+    if "has_identified_correct_answer" in q_data:
+        return q_data["has_identified_correct_answer"]
+    return bool(q_data.get("correct_answers"))
+
+
+def deduplicate_questions(questions):
+    """
+    Deduplikuje pytania z dowolnego iterowalnego źródła (także generatora).
+    Zwraca (mapa_unikalnych_pytań, liczba_wczytanych_pytań).
+    Klucz mapy: wyczyszczony tekst pytania,
+    wartość: {"data": pełne dane pytania, "has_correct_answer_flag": ...}.
+    """
+    unique_questions_map = {}
+    loaded_count = 0
+
+    for q_data in questions:
+        loaded_count += 1
+        cleaned_question_text = clean_text_for_deduplication(
+            q_data.get("question_text", "")
+        )
+
+        # Pomiń puste pytania
+        if not cleaned_question_text:
+            continue
+
+        has_identified_correct_answer = has_correct_answer(q_data)
+
+        # Jeśli pytanie nie ma jeszcze w mapie, dodaj je
+        if cleaned_question_text not in unique_questions_map:
+            unique_questions_map[cleaned_question_text] = {
+                "data": q_data,
+                "has_correct_answer_flag": has_identified_correct_answer,  # Flaga do śledzenia
+            }
+        else:
+            # Jeśli pytanie już jest, ale nowa wersja ma poprawną odpowiedź,
+            # a stara nie miała, zastępujemy je nową wersją
+            current_entry = unique_questions_map[cleaned_question_text]
+            if (
+                has_identified_correct_answer
+                and not current_entry["has_correct_answer_flag"]
+            ):
+                unique_questions_map[cleaned_question_text] = {
+                    "data": q_data,
+                    "has_correct_answer_flag": has_identified_correct_answer,
+                }
+
+    return unique_questions_map, loaded_count
+
+
+def collapse_near_duplicates(unique_questions_map, threshold):
+    """
+    Łączy prawie-duplikaty (pytania różniące się np. jednym słowem lub literówką)
+    w mapie zwróconej przez deduplicate_questions - patrz near_duplicates.py.
+    Z każdej grupy zostaje pierwszy wariant z zidentyfikowaną odpowiedzią
+    (lub po prostu pierwszy), a połączone warianty są wypisywane w raporcie.
+    """
+    keys = list(unique_questions_map)
+    clusters = find_near_duplicate_clusters(keys, threshold)
+
+    for cluster in clusters:
+        cluster_keys = [keys[index] for index in cluster]
+        kept_key = next(
+            (
+                key
+                for key in cluster_keys
+                if unique_questions_map[key]["has_correct_answer_flag"]
+            ),
+            cluster_keys[0],
+        )
+        print(f"Połączono {len(cluster_keys)} podobne warianty pytania:")
+        print(f"  zachowano: {unique_questions_map[kept_key]['data']['question_text']}")
+        for key in cluster_keys:
+            if key != kept_key:
+                removed_entry = unique_questions_map.pop(key)
+                print(f"  pominięto: {removed_entry['data']['question_text']}")
+
+    if clusters:
+        print(f"Połączono {len(clusters)} grup prawie-duplikatów (próg {threshold}).")
+    return unique_questions_map
+
+
+def split_by_correct_answer(unique_questions_map):
+    """
+    Dzieli mapę unikalnych pytań na dwie listy (w kolejności mapy):
+    pytania z zidentyfikowaną odpowiedzią i pytania bez niej.
+    """
+    identified_questions = []
+    unidentified_questions = []
+    for entry in unique_questions_map.values():
+        if entry["has_correct_answer_flag"]:
+            identified_questions.append(entry["data"])
+        else:
+            unidentified_questions.append(entry["data"])
+    return identified_questions, unidentified_questions
+
+
+def sort_questions(questions):
+    """
+    Sortuje pytania po wyczyszczonym tekście (kolejność niezależna od źródeł).
+    """
+    questions.sort(
+        key=lambda q_data: clean_text_for_deduplication(q_data.get("question_text", ""))
+    )
+    return questions
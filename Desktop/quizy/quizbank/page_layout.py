@@ -0,0 +1,49 @@
+"""
+Układ pytań na stronach PDF.
+
+- "page": każde pytanie zaczyna się na nowej stronie (dotychczasowy układ),
+- "compact": pytania płyną jedno pod drugim na zmniejszonych marginesach,
+  a każde pytanie jest blokiem KeepTogether - jeśli nie mieści się w reszcie
+  strony, całe przechodzi na następną (dzielone jest tylko pytanie dłuższe
+  niż cała strona). Zbiorcze PDF-y mają wtedy kilka razy mniej stron.
+"""
+
+PAGE_LAYOUTS = ("page", "compact")
+DEFAULT_PAGE_LAYOUT = "page"
+# Domyślny układ zbiorczych PDF-ów (merger.py, pdf_from_json.py)
+MERGED_PAGE_LAYOUT = "compact"
+
+# Marginesy strony: domyślne SimpleDocTemplate (1 cal) i zmniejszone w compact
+PAGE_MARGINS = {"page": 72, "compact": 36}
+
+
+def page_margins(layout):
+    """
+    Zwraca marginesy strony dla układu jako argumenty SimpleDocTemplate.
+    """
+    margin = PAGE_MARGINS[layout]
+    return {
+        "leftMargin": margin,
+        "rightMargin": margin,
+        "topMargin": margin,
+        "bottomMargin": margin,
+    }
+
+
+def question_separator(layout):
+    """
+    Zwraca elementy wstawiane między kolejnymi pytaniami: podział strony
+    w układzie "page", nic w układzie "compact" (odstęp daje Spacer na końcu pytania).
+    """
+    from reportlab.platypus import PageBreak
+
+    return [PageBreak()] if layout == "page" else []
+
+
+def question_block(flowables, layout):
+    """
+    Zwraca elementy pytania - w układzie "compact" zamknięte w KeepTogether.
+    """
+    from reportlab.platypus import KeepTogether
+
+    return [KeepTogether(flowables)] if layout == "compact" else list(flowables)
@@ -0,0 +1,87 @@
+"""
+Równoległe renderowanie PDF-ów z pytaniami.
+
+doc.build() w ReportLab działa na jednym rdzeniu, a przy tysiącach pytań
+trwa minuty. Każde pytanie zaczyna się na nowej stronie, więc listę pytań
+można podzielić na fragmenty, wyrenderować je niezależnie w puli procesów
+i skleić gotowe PDF-y (pypdf) w kolejności - wynik ma te same strony,
+co dokument zbudowany w jednym przebiegu. W układzie "compact" (page_layout.py)
+każdy fragment zaczyna się na nowej stronie, więc na granicy fragmentów
+ostatnia strona może być niepełna.
+"""
+
+from io import BytesIO
+
+RENDER_CHUNK_SIZE = 200  # Liczba pytań w jednym fragmencie renderowanym w procesie
+
+
+def _render_chunk_task(task):
+    """
+    Renderuje jeden fragment - uruchamiane w procesie roboczym.
+    """
+    render_chunk, questions_chunk, first_index = task
+    return render_chunk(questions_chunk, first_index)
+
+
+def concatenate_pdfs(pdf_bytes_list):
+    """
+    Skleja kolejne PDF-y (bajty) w jeden dokument i zwraca jego bajty.
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    writer = PdfWriter()
+    for pdf_bytes in pdf_bytes_list:
+        writer.append(PdfReader(BytesIO(pdf_bytes)))
+    output = BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def render_pdf_in_chunks(
+    render_chunk, questions_list, jobs=1, chunk_size=RENDER_CHUNK_SIZE, executor=None
+):
+    """
+    Renderuje questions_list funkcją render_chunk(pytania, first_index), która
+    zwraca (bajty PDF, wyrenderowane pytania); first_index to pozycja pierwszego
+    pytania fragmentu na pełnej liście - dzięki niej numeracja pytań jest ciągła
+    między fragmentami. render_chunk musi być funkcją modułu (lub functools.partial
+    takiej funkcji), aby dało się ją przekazać do procesu roboczego.
+    Przy jobs <= 1 lub liście mieszczącej się w jednym fragmencie dokument
+    powstaje w jednym przebiegu, bez puli procesów. Podany executor (wspólna
+    pula) jest używany zawsze - także dla jednego fragmentu, aby PDF-y kilku
+    kursów renderowały się równolegle.
+    Zwraca (bajty PDF, wyrenderowane pytania w kolejności).
+    """
+    if executor is None and (jobs <= 1 or len(questions_list) <= chunk_size):
+        return render_chunk(questions_list, 0)
+
+    tasks = [
+        (
+            render_chunk,
+            questions_list[first_index : first_index + chunk_size],
+            first_index,
+        )
+        for first_index in range(0, len(questions_list), chunk_size)
+    ]
+    if executor is not None:
+        if len(tasks) <= 1:
+            return executor.submit(render_chunk, questions_list, 0).result()
+        return _render_tasks(tasks, executor)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return _render_tasks(tasks, executor)
+
+
+def _render_tasks(tasks, executor):
+    pdf_parts = []
+    rendered_questions = []
+    # executor.map zachowuje kolejność fragmentów
+    for pdf_bytes, rendered_chunk in executor.map(_render_chunk_task, tasks):
+        # Fragment z samymi pustymi pytaniami dałby tylko pustą stronę
+        if not rendered_chunk:
+            continue
+        pdf_parts.append(pdf_bytes)
+        rendered_questions.extend(rendered_chunk)
+    return concatenate_pdfs(pdf_parts), rendered_questions
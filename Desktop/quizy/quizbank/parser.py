@@ -0,0 +1,833 @@
+"""
+Parser przeglądów quizów Moodle (HTML) - wspólny dla wszystkich skryptów.
+
+Dwie implementacje dające identyczny wynik (build_question_record):
+- parse_moodle_quiz_review - drzewo BeautifulSoup zawierające tylko bloki
+  pytań (div.que), z wybieralnym backendem (lxml / html.parser),
+- iter_moodle_quiz_review - parser strumieniowy (HTMLParser) bez budowania
+  drzewa DOM; pamięć nie zależy od rozmiaru pliku.
+parse_html_files parsuje wiele plików, opcjonalnie w puli procesów.
+"""
+
+import importlib.util
+import os
+import re
+from collections import deque
+from html.parser import HTMLParser
+
+from .archives import (
+    archive_html_files,
+    cached_member_bytes,
+    is_archive,
+    is_html_file_name,
+    is_quiz_directory,
+    open_html_source,
+)
+
+# bs4 i pula procesów są importowane w funkcjach, które ich używają -
+# parser strumieniowy ich nie ładuje
+
+# Wersja logiki parsowania. Zwiększ ją przy każdej zmianie, która wpływa na
+# wyodrębniane pytania - unieważnia to wpisy w manifeście (cache) wyników.
+PARSER_VERSION = 1
+
+# --- Backend parsera HTML ---
+# "lxml" to parser napisany w C, kilkukrotnie szybszy od wbudowanego "html.parser".
+# "auto" wybiera lxml, jeśli jest zainstalowany, a w przeciwnym razie html.parser.
+HTML_PARSER_BACKENDS = ("auto", "lxml", "html.parser")
+HTML_PARSER_BACKEND = "auto"
+
+
+def _is_question_block_class(class_value):
+    """
+    Sprawdza, czy atrybut class oznacza blok pytania (div.que).
+    Wartość może przyjść jako napis lub lista, zależnie od wersji bs4.
+    """
+    if not class_value:
+        return False
+    if isinstance(class_value, str):
+        class_value = class_value.split()
+    return "que" in class_value
+
+
+def resolve_html_backend(backend=None):
+    """
+    Zamienia nazwę backendu (w tym "auto") na nazwę parsera dla BeautifulSoup.
+    """
+    backend = backend or HTML_PARSER_BACKEND
+    if backend not in HTML_PARSER_BACKENDS:
+        raise ValueError(f"Nieznany backend parsera HTML: {backend}")
+    if backend == "auto":
+        return "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+    return backend
+
+
+def make_question_soup(html_content, backend=None):
+    """
+    Buduje drzewo BeautifulSoup zawierające wyłącznie bloki pytań (div.que).
+    Nawigacja, skrypty i reszta strony są pomijane już na etapie parsowania.
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    only_question_blocks = SoupStrainer("div", class_=_is_question_block_class)
+    return BeautifulSoup(
+        html_content, resolve_html_backend(backend), parse_only=only_question_blocks
+    )
+
+
+def get_text_without(element, skipped_element=None):
+    """
+    Odpowiednik element.get_text(separator=" ", strip=True), który pomija
+    tekst z poddrzewa skipped_element. Nie modyfikuje drzewa i nie wymaga
+    ponownego parsowania fragmentu HTML.
+    """
+    skipped_ids = (
+        {id(node) for node in skipped_element.descendants}
+        if skipped_element is not None
+        else set()
+    )
+    parts = []
+    for string in element.strings:
+        if id(string) in skipped_ids:
+            continue
+        string = string.strip()
+        if string:
+            parts.append(string)
+    return " ".join(parts)
+
+
+def clean_answer_text(option_text):
+    """
+    Usuwa z tekstu odpowiedzi frazy, które Moodle dodaje w widoku przeglądu,
+    i normalizuje białe znaki.
+    """
+    # Używamy re.sub dla większej elastyczności, ignorując wielkość liter.
+    option_text = re.sub(
+        r"Twoja odpowiedź jest poprawna\.", "", option_text, flags=re.IGNORECASE
+    )
+    option_text = re.sub(r"Wybrano\.", "", option_text, flags=re.IGNORECASE)
+    option_text = re.sub(
+        r"Oznaczone\.", "", option_text, flags=re.IGNORECASE
+    )  # Dodatkowy tekst Moodle
+    option_text = re.sub(
+        r"Częściowo poprawna\.", "", option_text, flags=re.IGNORECASE
+    )  # Dla częściowo poprawnych
+    option_text = re.sub(
+        r"Błędna\.", "", option_text, flags=re.IGNORECASE
+    )  # Dla błędnych odpowiedzi
+    option_text = re.sub(
+        r"Prawidłowa odpowiedź\.", "", option_text, flags=re.IGNORECASE
+    )  # Inna fraza Moodle
+    option_text = re.sub(
+        r"Prawidłowe odpowiedzi\.", "", option_text, flags=re.IGNORECASE
+    )  # Inna fraza Moodle (mnoga)
+
+    # Usuń podwójne spacje i ponownie obetnij
+    option_text = re.sub(r"\s+", " ", option_text).strip()
+
+    return option_text
+
+
+def extract_answer_text(option_container):
+    """
+    Wyodrębnia czysty tekst odpowiedzi z kontenera opcji,
+    usuwając numerację (a., b., ...) i zbędne frazy.
+    """
+    answer_label_div = option_container.find("div", class_="d-flex")
+    if not answer_label_div:
+        return ""
+
+    # Wyciągnij tekst, łącząc go spacjami i pomijając span z numerem odpowiedzi
+    # (a., b., ...). Oryginalne drzewo pozostaje nienaruszone.
+    answernumber_span = answer_label_div.find("span", class_="answernumber")
+    option_text = get_text_without(answer_label_div, answernumber_span)
+
+    # Usuń frazy, które Moodle dodaje do tekstu odpowiedzi w widoku przeglądu
+    return clean_answer_text(option_text)
+
+
+def is_option_feedback_correct(feedback_text):
+    """
+    Sprawdza, czy feedback wewnątrz opcji oznacza ją jako poprawną.
+    """
+    return (
+        "Twoja odpowiedź jest poprawna." in feedback_text
+        or "Prawidłowa odpowiedź." in feedback_text
+    )
+
+
+def build_question_record(
+    question_text,
+    options,
+    outcome_span_text=None,
+    outcome_feedback_raw=None,
+    outcome_feedback_text=None,
+):
+    """
+    Składa słownik pytania z tekstów wyciągniętych z bloku div.que.
+    Wspólne dla parsera DOM (parse_moodle_quiz_review) i parsera strumieniowego
+    (iter_moodle_quiz_review), dzięki czemu oba dają identyczny wynik.
+
+    options to lista krotek (tekst_odpowiedzi, czy_poprawna).
+    outcome_span_text to tekst span.correct z bloku 'outcome' (None, gdy brak),
+    outcome_feedback_raw / outcome_feedback_text to tekst div.feedback z bloku
+    'outcome' odpowiednio bez i z łączeniem spacjami (None, gdy brak).
+    """
+    all_answers = []
+    correct_answers = []  # Lista, bo może być wiele poprawnych odpowiedzi
+
+    question_text = re.sub(r"\s+", " ", question_text).strip()  # Znormalizuj spacje
+
+    for option_text, is_this_option_correct in options:
+        if option_text and option_text not in all_answers:
+            all_answers.append(option_text)
+
+        if is_this_option_correct and option_text not in correct_answers:
+            correct_answers.append(option_text)
+
+    # Dodatkowe sprawdzenie dla poprawnych odpowiedzi w bloku 'outcome'
+    # To jest ważne, gdy np. użytkownik odpowiedział błędnie, a Moodle na dole pytania
+    # wskazuje "Poprawna odpowiedź to: [treść]".
+    if outcome_span_text is not None:
+        feedback_text_from_span = outcome_span_text
+
+        # Jeśli tekst zawiera "Poprawna odpowiedź to:", wyodrębniamy ją
+        if "Poprawna odpowiedź to:" in feedback_text_from_span:
+            extracted_ans_raw = feedback_text_from_span.split(
+                "Poprawna odpowiedź to:", 1
+            )[1].strip()
+            # Usuń wszelkie "Błędna.", "Prawidłowa odpowiedź." itp. które mogły zostać
+            extracted_ans = re.sub(
+                r"(Twoja odpowiedź jest |Prawidłowa |Prawidłowe |Błędna\.|Wybrano\.)",
+                "",
+                extracted_ans_raw,
+                flags=re.IGNORECASE,
+            ).strip()
+            if extracted_ans.endswith("."):  # Usuń kropkę na końcu, jeśli jest
+                extracted_ans = extracted_ans[:-1].strip()
+
+            # Spróbuj dopasować do już zebranych odpowiedzi
+            found_match_in_all = False
+            for ans_option in all_answers:
+                # Dokładniejsze dopasowanie: pełna zgodność lub bardzo duża część
+                # Możesz tu dostosować próg dopasowania, jeśli potrzebujesz
+                if (
+                    extracted_ans.lower() == ans_option.lower()
+                    or (
+                        len(extracted_ans) > 10
+                        and extracted_ans.lower() in ans_option.lower()
+                    )
+                    or (
+                        len(ans_option) > 10
+                        and ans_option.lower() in extracted_ans.lower()
+                    )
+                ):
+                    if ans_option not in correct_answers:
+                        correct_answers.append(ans_option)
+                    found_match_in_all = True
+                    break
+            # Jeśli nie znaleziono dopasowania wśród opcji, dodajemy tekst bezpośrednio
+            if (
+                not found_match_in_all
+                and extracted_ans
+                and extracted_ans not in correct_answers
+            ):
+                correct_answers.append(extracted_ans)
+
+        # Obsługa, gdy sama zawartość correct_feedback_span to poprawna odpowiedź
+        elif (
+            feedback_text_from_span
+            and "Twoja odpowiedź jest poprawna" not in feedback_text_from_span
+            and feedback_text_from_span not in correct_answers
+            and not re.search(
+                r"oceniono|punktów", feedback_text_from_span, re.IGNORECASE
+            )  # Ignoruj teksty o punktach
+        ):
+            # Sprawdź, czy tekst jest sensowną odpowiedzią, a nie tylko oceną
+            if (
+                len(feedback_text_from_span.split()) > 2
+            ):  # Prosta heurystyka, że to nie jest tylko "Poprawna."
+                correct_answers.append(feedback_text_from_span)
+
+    # W rzadkich przypadkach feedback może być w div.feedback bez span.correct
+    if (
+        outcome_feedback_raw is not None
+        and "Poprawna odpowiedź to:" in outcome_feedback_raw
+    ):
+        extracted_ans_raw = outcome_feedback_text.split("Poprawna odpowiedź to:", 1)[
+            1
+        ].strip()
+        extracted_ans = re.sub(
+            r"(Twoja odpowiedź jest |Prawidłowa |Prawidłowe |Błędna\.|Wybrano\.)",
+            "",
+            extracted_ans_raw,
+            flags=re.IGNORECASE,
+        ).strip()
+
+        if extracted_ans.endswith("."):
+            extracted_ans = extracted_ans[:-1].strip()
+        if extracted_ans and extracted_ans not in correct_answers:
+            found_match_in_all = False
+            for ans_option in all_answers:
+                if (
+                    extracted_ans.lower() == ans_option.lower()
+                    or (
+                        len(extracted_ans) > 10
+                        and extracted_ans.lower() in ans_option.lower()
+                    )
+                    or (
+                        len(ans_option) > 10
+                        and ans_option.lower() in extracted_ans.lower()
+                    )
+                ):
+                    if ans_option not in correct_answers:
+                        correct_answers.append(ans_option)
+                    found_match_in_all = True
+                    break
+            if (
+                not found_match_in_all
+                and extracted_ans
+                and extracted_ans not in correct_answers
+            ):
+                correct_answers.append(extracted_ans)
+
+    # Upewnij się, że nie ma duplikatów i są unikalne odpowiedzi
+    correct_answers = list(dict.fromkeys(correct_answers))  # Zachowuje kolejność
+    all_answers = list(dict.fromkeys(all_answers))  # Zachowuje kolejność unikalnych
+
+    return {
+        "question_text": question_text,
+        "all_answers": all_answers,
+        "correct_answers": correct_answers,
+    }
+
+
+def parse_moodle_quiz_review(
+    html_file_path, backend=None, html_bytes=None, raise_read_errors=False
+):
+    """
+    Parsuje pojedynczy plik HTML z przeglądu quizu Moodle
+    i wyodrębnia pytania wraz z odpowiedziami.
+    backend wybiera parser HTML (patrz HTML_PARSER_BACKENDS).
+    html_bytes to zawartość pliku, jeśli została już przeczytana.
+    Błąd odczytu daje pustą listę, a przy raise_read_errors=True wyjątek -
+    wtedy nieczytelny plik można odróżnić od pliku bez pytań.
+    """
+    questions_data = []
+    try:
+        with open_html_source(html_file_path, html_bytes) as f:
+            html_content = f.read()
+    except FileNotFoundError:
+        if raise_read_errors:
+            raise
+        print(f"Błąd: Plik nie znaleziony pod ścieżką: {html_file_path}")
+        return []
+    except Exception as e:
+        if raise_read_errors:
+            raise
+        print(f"Wystąpił błąd podczas odczytu pliku {html_file_path}: {e}")
+        return []
+
+    soup = make_question_soup(html_content, backend)
+
+    question_blocks = soup.find_all("div", class_="que")
+
+    if not question_blocks:
+        print(f"Brak bloków pytań (div class='que') w pliku: {html_file_path}")
+        return []
+
+    for q_block in question_blocks:
+        question_text = ""
+        options = []
+        outcome_span_text = None
+        outcome_feedback_raw = None
+        outcome_feedback_text = None
+
+        # 1. Znajdź treść pytania
+        qtext_div = q_block.find("div", class_="qtext")
+        if qtext_div:
+            # Usuń flagi i inne zbędne elementy z pytania
+            for flag_div in qtext_div.find_all("div", class_="questionflag"):
+                flag_div.decompose()
+            # Usuń paragrafy z oceną
+            for grade_p in qtext_div.find_all("p", class_="grade"):
+                grade_p.decompose()
+            question_text = qtext_div.get_text(separator=" ", strip=True)
+
+        # 2. Znajdź blok odpowiedzi i opcje
+        answer_div = q_block.find("div", class_="answer")
+        if answer_div:
+            # Kontenery opcji to div z klasami 'r0' lub 'r1'
+            # Dodatkowo, sprawdź 'r' ogólnie, jeśli klasa jest bardziej ogólna
+            option_containers = answer_div.find_all(
+                ["div"], class_=re.compile(r"r[01]")
+            )
+
+            for option_container in option_containers:
+                option_text = extract_answer_text(option_container)
+
+                # 3. Sprawdź, czy odpowiedź jest poprawna
+                is_this_option_correct = False
+
+                # Poprawna odpowiedź ma klasę 'correct'
+                if "correct" in option_container.get("class", []):
+                    is_this_option_correct = True
+
+                # Ikona zielonego checkmarka (Moodle często jej używa)
+                if option_container.find("i", class_="fa-check"):
+                    is_this_option_correct = True
+
+                # Czasem jest wewnątrz feedbacku
+                feedback_div_inside_option = option_container.find(
+                    "div", class_="feedback"
+                )
+                if feedback_div_inside_option and is_option_feedback_correct(
+                    feedback_div_inside_option.get_text()
+                ):
+                    is_this_option_correct = True
+
+                options.append((option_text, is_this_option_correct))
+
+        # 4. Blok 'outcome' - szukamy span z klasą 'correct' lub ogólnego tekstu feedbacku
+        outcome_div = q_block.find("div", class_="outcome")
+        if outcome_div:
+            correct_feedback_span = outcome_div.find("span", class_="correct")
+            if correct_feedback_span:
+                outcome_span_text = correct_feedback_span.get_text(
+                    separator=" ", strip=True
+                )
+            general_feedback_div = outcome_div.find("div", class_="feedback")
+            if general_feedback_div:
+                outcome_feedback_raw = general_feedback_div.get_text()
+                outcome_feedback_text = general_feedback_div.get_text(
+                    separator=" ", strip=True
+                )
+
+        questions_data.append(
+            build_question_record(
+                question_text,
+                options,
+                outcome_span_text,
+                outcome_feedback_raw,
+                outcome_feedback_text,
+            )
+        )
+    return questions_data
+
+
+# --- Parser strumieniowy (bez budowania drzewa DOM) ---
+# Rozmiar porcji odczytywanej z pliku przy parsowaniu strumieniowym
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAMING_BACKEND = "stream"
+
+# Elementy HTML bez znacznika zamykającego - nie trafiają na stos otwartych elementów
+VOID_ELEMENTS = frozenset(
+    {
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    }
+)
+# Tekst wewnątrz tych elementów nie wchodzi do get_text() w BeautifulSoup
+NON_TEXT_ELEMENTS = frozenset({"script", "style", "template"})
+OPTION_CLASS_PATTERN = re.compile(r"r[01]")
+
+
+class _TextCollector:
+    """
+    Zbiera węzły tekstowe poddrzewa, tak jak get_text() w BeautifulSoup.
+    skip_depth > 0 oznacza, że jesteśmy w pomijanym elemencie (np. numer odpowiedzi).
+    """
+
+    def __init__(self):
+        self.strings = []
+        self.skip_depth = 0
+
+    def raw_text(self):
+        """Odpowiednik get_text()."""
+        return "".join(self.strings)
+
+    def text(self):
+        """Odpowiednik get_text(separator=" ", strip=True)."""
+        return " ".join(s.strip() for s in self.strings if s.strip())
+
+
+class _StreamingQuizReviewParser(HTMLParser):
+    """
+    Parser zdarzeniowy (w stylu SAX) dla strony przeglądu quizu Moodle.
+    Śledzi stan bloków que / qtext / answer / outcome na stosie otwartych
+    elementów i po zamknięciu każdego div.que odkłada gotowe pytanie
+    do kolejki completed. Nie buduje drzewa DOM.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.completed = deque()
+        self._stack = []  # [(tag, [funkcje wywoływane przy zamknięciu])]
+        self._pending_text = []
+        self._active_collectors = []
+        self._non_text_depth = 0
+        self._question = None
+        self._option = None
+
+    # --- Obsługa tekstu ---
+
+    def handle_data(self, data):
+        # Jeden węzeł tekstowy może przyjść w kilku kawałkach (granica porcji),
+        # więc sklejamy go przed przekazaniem dalej.
+        self._pending_text.append(data)
+
+    def _flush_text(self):
+        if not self._pending_text:
+            return
+        text = "".join(self._pending_text)
+        self._pending_text = []
+        if self._non_text_depth:
+            return
+        for collector in self._active_collectors:
+            if not collector.skip_depth:
+                collector.strings.append(text)
+
+    def handle_comment(self, data):
+        self._flush_text()
+
+    def handle_decl(self, decl):
+        self._flush_text()
+
+    def handle_pi(self, data):
+        self._flush_text()
+
+    def _start_collector(self):
+        """
+        Zaczyna zbieranie tekstu dla otwieranego elementu. Zwraca kolektor
+        i funkcję, którą należy wywołać przy zamknięciu elementu.
+        """
+        collector = _TextCollector()
+        self._active_collectors.append(collector)
+        return collector, lambda: self._active_collectors.remove(collector)
+
+    # --- Obsługa znaczników ---
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag in VOID_ELEMENTS:
+            return
+        classes = (dict(attrs).get("class") or "").split()
+        closers = []
+
+        if tag in NON_TEXT_ELEMENTS:
+            self._non_text_depth += 1
+            closers.append(self._end_non_text)
+
+        question = self._question
+        if question is None:
+            if tag == "div" and "que" in classes:
+                self._start_question()
+                closers.append(self._end_question)
+        else:
+            self._start_question_element(tag, classes, question, closers)
+
+        self._stack.append((tag, closers))
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag in VOID_ELEMENTS:
+            return
+        # Jak BeautifulSoup: zamykamy wszystko do najbliższego pasującego elementu,
+        # a niepasujące znaczniki zamykające ignorujemy.
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                break
+        else:
+            return
+        while len(self._stack) > index:
+            _, closers = self._stack.pop()
+            for close in reversed(closers):
+                close()
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        while self._stack:
+            _, closers = self._stack.pop()
+            for close in reversed(closers):
+                close()
+
+    def _end_non_text(self):
+        self._non_text_depth -= 1
+
+    # --- Stan pytania ---
+
+    def _start_question(self):
+        self._question = {
+            "qtext": None,
+            "in_answer": False,
+            "answer_seen": False,
+            "options": [],
+            "in_outcome": False,
+            "outcome_seen": False,
+            "outcome_span": None,
+            "outcome_feedback": None,
+        }
+
+    def _end_question(self):
+        question = self._question
+        self._question = None
+        outcome_span = question["outcome_span"]
+        outcome_feedback = question["outcome_feedback"]
+        self.completed.append(
+            build_question_record(
+                question["qtext"].text() if question["qtext"] else "",
+                question["options"],
+                outcome_span.text() if outcome_span else None,
+                outcome_feedback.raw_text() if outcome_feedback else None,
+                outcome_feedback.text() if outcome_feedback else None,
+            )
+        )
+
+    def _start_question_element(self, tag, classes, question, closers):
+        """
+        Aktualizuje stan bieżącego pytania przy otwarciu elementu wewnątrz div.que.
+        Tak jak find() w wersji DOM, bierzemy pod uwagę tylko pierwsze
+        wystąpienie qtext, answer, outcome, d-flex itd.
+        """
+        qtext = question["qtext"]
+        option = self._option
+
+        if tag == "div" and "qtext" in classes and qtext is None:
+            collector, close = self._start_collector()
+            question["qtext"] = collector
+            closers.append(close)
+        elif (
+            qtext is not None
+            and qtext in self._active_collectors
+            and (
+                (tag == "div" and "questionflag" in classes)
+                or (tag == "p" and "grade" in classes)
+            )
+        ):
+            # Flagi i paragrafy z oceną nie wchodzą do treści pytania
+            qtext.skip_depth += 1
+            closers.append(lambda: setattr(qtext, "skip_depth", qtext.skip_depth - 1))
+
+        if tag == "div" and "answer" in classes and not question["answer_seen"]:
+            question["answer_seen"] = True
+            question["in_answer"] = True
+            closers.append(lambda: question.__setitem__("in_answer", False))
+        elif (
+            tag == "div"
+            and question["in_answer"]
+            and option is None
+            and any(OPTION_CLASS_PATTERN.search(c) for c in classes)
+        ):
+            self._option = {
+                "classes": classes,
+                "label": None,
+                "answernumber_seen": False,
+                "fa_check": False,
+                "feedback": None,
+            }
+            closers.append(self._end_option)
+        elif option is not None:
+            self._start_option_element(tag, classes, option, closers)
+
+        if tag == "div" and "outcome" in classes and not question["outcome_seen"]:
+            question["outcome_seen"] = True
+            question["in_outcome"] = True
+            closers.append(lambda: question.__setitem__("in_outcome", False))
+        elif question["in_outcome"]:
+            if (
+                tag == "span"
+                and "correct" in classes
+                and question["outcome_span"] is None
+            ):
+                question["outcome_span"], close = self._start_collector()
+                closers.append(close)
+            elif (
+                tag == "div"
+                and "feedback" in classes
+                and question["outcome_feedback"] is None
+            ):
+                question["outcome_feedback"], close = self._start_collector()
+                closers.append(close)
+
+    def _start_option_element(self, tag, classes, option, closers):
+        """
+        Aktualizuje stan bieżącej opcji odpowiedzi (div.r0 / div.r1).
+        """
+        label = option["label"]
+        if tag == "div" and "d-flex" in classes and label is None:
+            option["label"], close = self._start_collector()
+            closers.append(close)
+        elif (
+            tag == "span"
+            and "answernumber" in classes
+            and label is not None
+            and label in self._active_collectors
+            and not option["answernumber_seen"]
+        ):
+            # Numer odpowiedzi (a., b., ...) pomijamy w tekście
+            option["answernumber_seen"] = True
+            label.skip_depth += 1
+            closers.append(lambda: setattr(label, "skip_depth", label.skip_depth - 1))
+        elif tag == "i" and "fa-check" in classes:
+            option["fa_check"] = True
+        elif tag == "div" and "feedback" in classes and option["feedback"] is None:
+            option["feedback"], close = self._start_collector()
+            closers.append(close)
+
+    def _end_option(self):
+        option = self._option
+        self._option = None
+        label = option["label"]
+        option_text = clean_answer_text(label.text()) if label is not None else ""
+        is_this_option_correct = (
+            "correct" in option["classes"]
+            or option["fa_check"]
+            or (
+                option["feedback"] is not None
+                and is_option_feedback_correct(option["feedback"].raw_text())
+            )
+        )
+        self._question["options"].append((option_text, is_this_option_correct))
+
+
+def iter_moodle_quiz_review(
+    html_file_path,
+    chunk_size=STREAM_CHUNK_SIZE,
+    html_bytes=None,
+    raise_read_errors=False,
+):
+    """
+    Strumieniowa alternatywa dla parse_moodle_quiz_review: czyta plik porcjami
+    i zwraca (yield) każde pytanie zaraz po zamknięciu jego div.que.
+    Pamięć nie zależy od rozmiaru pliku, bo drzewo DOM nie jest budowane.
+    html_bytes i raise_read_errors jak w parse_moodle_quiz_review.
+    """
+    parser = _StreamingQuizReviewParser()
+    questions_found = 0
+    try:
+        with open_html_source(html_file_path, html_bytes) as f:
+            for chunk in iter(lambda: f.read(chunk_size), ""):
+                parser.feed(chunk)
+                while parser.completed:
+                    questions_found += 1
+                    yield parser.completed.popleft()
+    except FileNotFoundError:
+        if raise_read_errors:
+            raise
+        print(f"Błąd: Plik nie znaleziony pod ścieżką: {html_file_path}")
+        return
+    except Exception as e:
+        if raise_read_errors:
+            raise
+        print(f"Wystąpił błąd podczas odczytu pliku {html_file_path}: {e}")
+        return
+
+    parser.close()
+    while parser.completed:
+        questions_found += 1
+        yield parser.completed.popleft()
+
+    if not questions_found:
+        print(f"Brak bloków pytań (div class='que') w pliku: {html_file_path}")
+
+
+def collect_html_files(base_directory):
+    """
+    Zbiera ścieżki plików HTML z podkatalogów "quiz_X" oraz bezpośrednio
+    z katalogu bazowego. Kolejność jest posortowana, więc wynik nie zależy
+    od kolejności zwracanej przez system plików.
+    Archiwa (zip / tar / tar.gz / tar.zst) w katalogu bazowym - lub sam
+    base_directory będący archiwum - dają ścieżki "<archiwum>::<element>"
+    (quizbank/archives.py), bez rozpakowywania; elementy są wybierane
+    według tych samych reguł (is_review_member).
+    """
+    if is_archive(base_directory) and os.path.isfile(base_directory):
+        return archive_html_files(base_directory)
+
+    html_files = []
+    for item_name in sorted(os.listdir(base_directory)):
+        item_path = os.path.join(base_directory, item_name)
+
+        # Sprawdź, czy element jest katalogiem quizu (nazwa zaczyna się od "quiz",
+        # ale to nie katalog zasobów strony "<strona>_files")
+        if os.path.isdir(item_path) and is_quiz_directory(item_name):
+            for filename in sorted(os.listdir(item_path)):
+                if is_html_file_name(filename):
+                    html_files.append(os.path.join(item_path, filename))
+        elif os.path.isfile(item_path) and is_html_file_name(item_name):
+            # Jeśli pliki HTML są bezpośrednio w katalogu bazowym, również je przetwórz
+            html_files.append(item_path)
+        elif os.path.isfile(item_path) and is_archive(item_name):
+            html_files.extend(archive_html_files(item_path))
+    return html_files
+
+
+def _parse_file_isolated(html_file_path, backend=None, html_bytes=None):
+    """
+    Wywołuje parse_moodle_quiz_review (lub iter_moodle_quiz_review, gdy
+    backend to STREAMING_BACKEND) dla jednego pliku i przechwytuje wyjątki,
+    aby błąd w jednym pliku nie przerywał przetwarzania całej partii.
+    Zwraca krotkę (ścieżka, pytania, komunikat_błędu); błąd odczytu pliku
+    też trafia do komunikatu, a nie daje pustej listy pytań.
+    """
+    try:
+        if backend == STREAMING_BACKEND:
+            questions = list(
+                iter_moodle_quiz_review(
+                    html_file_path, html_bytes=html_bytes, raise_read_errors=True
+                )
+            )
+        else:
+            questions = parse_moodle_quiz_review(
+                html_file_path, backend, html_bytes, raise_read_errors=True
+            )
+        return html_file_path, questions, None
+    except Exception as e:
+        return html_file_path, [], str(e)
+
+
+def _map_parse(executor, html_files, backend):
+    # Elementy tar są już w pamięci tego procesu (collect_html_files), więc
+    # procesy puli dostają ich bajty zamiast rozpakowywać całe archiwum
+    html_bytes = [cached_member_bytes(path) for path in html_files]
+    return executor.map(
+        _parse_file_isolated, html_files, [backend] * len(html_files), html_bytes
+    )
+
+
+def parse_html_files(html_files, jobs=1, backend=None, executor=None):
+    """
+    Parsuje pliki HTML sekwencyjnie (jobs=1) lub w puli procesów (jobs>1).
+    Podany executor (wspólna pula, np. w trybie wsadowym) jest używany
+    zamiast tworzenia nowej puli, niezależnie od jobs.
+    Generator zwraca krotki (ścieżka, pytania, komunikat_błędu) zawsze
+    w kolejności listy wejściowej, więc wynik jest deterministyczny.
+    """
+    if executor is not None:
+        yield from _map_parse(executor, html_files, backend)
+        return
+
+    if jobs <= 1 or len(html_files) <= 1:
+        for html_file_path in html_files:
+            yield _parse_file_isolated(html_file_path, backend)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Parsowanie BeautifulSoup jest ograniczone przez CPU, więc używamy procesów,
+    # a nie wątków. executor.map zachowuje kolejność wejściową.
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from _map_parse(executor, html_files, backend)
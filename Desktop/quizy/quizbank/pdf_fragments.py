@@ -0,0 +1,134 @@
+"""
+Cache fragmentów PDF pojedynczych pytań (elementów ReportLab z gotowym łamaniem wierszy).
+
+Większość czasu renderowania to parsowanie znaczników akapitów i łamanie
+wierszy (pomiar szerokości każdego znaku przy wordWrap="CJK"). Wynik zależy
+tylko od treści pytania, stylów i szerokości ramki, więc akapity pytania po
+złamaniu wierszy są zapisywane (pickle) pod kluczem będącym skrótem tych danych.
+Przy kolejnym budowaniu niezmienione pytania trafiają do dokumentu gotowe,
+a układane od nowa są tylko nowe lub zmienione pytania. doc.build nadal
+rozmieszcza cały dokument na stronach i rysuje wszystkie strony, więc
+ciepły cache skraca renderowanie ok. 2-2.5 razy, a nie pomija go.
+
+Fragmenty nie zawierają numeru pytania ani tytułu - te zależą od pozycji
+na liście i są tworzone przy każdym budowaniu. Katalog cache można w każdej
+chwili usunąć; pliki są wczytywane przez pickle, więc nie należy
+umieszczać w nim plików z niezaufanych źródeł. Pickle zawiera obiekty
+ReportLab, dlatego klucz obejmuje wersję ReportLab i protokół pickle,
+a fragment, którego nie da się wczytać, jest traktowany jak brak w cache.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+import reportlab
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import Flowable, Paragraph
+
+# Wersja formatu fragmentów; zmiana sposobu renderowania wymaga jej podbicia
+FRAGMENT_CACHE_VERSION = 1
+# Domyślny wewnętrzny margines ramki (Frame) w SimpleDocTemplate
+FRAME_PADDING = 6
+
+
+class CachedLayoutParagraph(Paragraph):
+    """
+    Akapit, który pamięta wynik łamania wierszy i przy ponownym wrap()
+    z tą samą szerokością nie łamie ich od nowa.
+    """
+
+    def wrap(self, availWidth, availHeight):
+        if getattr(self, "_cached_wrap_width", None) == availWidth:
+            self.width = availWidth
+            return self._cached_wrap_size
+        size = Paragraph.wrap(self, availWidth, availHeight)
+        self._cached_wrap_width = availWidth
+        self._cached_wrap_size = size
+        return size
+
+
+def frame_width(doc):
+    """
+    Zwraca szerokość dostępną dla elementów w ramce strony dokumentu.
+    """
+    return doc.width - 2 * FRAME_PADDING
+
+
+def style_fingerprint(pdf_styles, *extra):
+    """
+    Zwraca skrót wszystkich atrybutów stylów akapitów (słownik {nazwa: styl})
+    oraz dodatkowych wartości wpływających na wygląd (czcionka, szerokość ramki).
+    Skrót obejmuje też wersję ReportLab i protokół pickle - po aktualizacji
+    biblioteki zapisane obiekty mogą mieć inny układ, więc są liczone od nowa.
+    """
+    described_styles = {}
+    for name, style in sorted(pdf_styles.items()):
+        attributes = (set(ParagraphStyle.defaults) | set(vars(style))) - {"parent"}
+        described_styles[name] = {
+            attribute: repr(getattr(style, attribute, None))
+            for attribute in sorted(attributes)
+        }
+    description = json.dumps(
+        [
+            FRAGMENT_CACHE_VERSION,
+            reportlab.Version,
+            pickle.HIGHEST_PROTOCOL,
+            described_styles,
+            [repr(value) for value in extra],
+        ],
+        sort_keys=True,
+    )
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+def fragment_key(style_digest, data):
+    """
+    Klucz fragmentu: skrót stylów i danych, z których fragment jest renderowany.
+    """
+    description = json.dumps([style_digest, data], ensure_ascii=False)
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+def layout_fragment(flowables, width):
+    """
+    Łamie wiersze wszystkich akapitów fragmentu dla podanej szerokości ramki
+    i zwraca fragment zserializowany do zapisania w cache.
+    """
+    for flowable in flowables:
+        flowable.wrap(width, 0x7FFFFFFF)
+    return pickle.dumps(flowables, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_fragment(cache_dir, key):
+    """
+    Zwraca listę elementów zapisanego fragmentu albo None, jeśli go nie ma
+    (lub nie da się go wczytać - wtedy zostanie wyrenderowany ponownie).
+    """
+    try:
+        with open(os.path.join(cache_dir, key + ".pickle"), "rb") as f:
+            fragment = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Nie udało się wczytać fragmentu {key} z cache: {e}")
+        return None
+    if not isinstance(fragment, list) or not all(
+        isinstance(flowable, Flowable) for flowable in fragment
+    ):
+        print(f"Fragment {key} z cache ma nieoczekiwany format - pomijam.")
+        return None
+    return fragment
+
+
+def store_fragment(cache_dir, key, fragment_bytes):
+    """
+    Zapisuje zserializowany fragment atomowo (plik tymczasowy + os.replace).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    fragment_path = os.path.join(cache_dir, key + ".pickle")
+    tmp_path = fragment_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(fragment_bytes)
+    os.replace(tmp_path, fragment_path)
@@ -0,0 +1,57 @@
+"""
+Dane pytań osadzone w generowanych plikach PDF.
+
+Każdy PDF generowany przez skrypty dostaje załącznik questions.json z dokładną
+listą pytań, które zawiera. merger.py odczytuje go bezpośrednio zamiast
+odtwarzać pytania z tekstu przez pdfminer i regex (wolno i ze stratami),
+a do ekstrakcji tekstu wraca tylko dla starszych PDF-ów bez załącznika.
+"""
+
+import json
+import zlib
+from io import BytesIO
+
+QUESTIONS_ATTACHMENT_NAME = "questions.json"
+PAYLOAD_VERSION = 1
+
+
+def write_pdf_with_questions(pdf_bytes, output_pdf_path, questions):
+    """
+    Zapisuje PDF (wygenerowany do pamięci) do output_pdf_path,
+    dołączając listę pytań jako osadzony plik questions.json.
+    """
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.generic import NameObject
+
+    writer = PdfWriter(clone_from=PdfReader(BytesIO(pdf_bytes)))
+    payload = {"version": PAYLOAD_VERSION, "questions": questions}
+    payload_bytes = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    attachment = writer.add_attachment(QUESTIONS_ATTACHMENT_NAME, payload_bytes)
+    # pypdf zapisuje załącznik bez kompresji, a JSON bywa większy niż same
+    # strony - kompresujemy go (FlateDecode, jak strumienie stron ReportLab)
+    file_stream = attachment.pdf_object["/EF"]["/F"].get_object()
+    file_stream.set_data(zlib.compress(payload_bytes))
+    file_stream[NameObject("/Filter")] = NameObject("/FlateDecode")
+    with open(output_pdf_path, "wb") as f:
+        writer.write(f)
+
+
+def read_embedded_questions(pdf_path):
+    """
+    Zwraca listę pytań osadzoną w PDF albo None, jeśli plik nie ma
+    (poprawnego) załącznika questions.json - np. PDF z wcześniejszej wersji skryptów.
+    """
+    from pypdf import PdfReader
+
+    try:
+        attachments = PdfReader(pdf_path).attachments
+        contents = attachments.get(QUESTIONS_ATTACHMENT_NAME)
+        if not contents:
+            return None
+        payload = json.loads(contents[0].decode("utf-8"))
+    except Exception as e:
+        print(f"Nie udało się odczytać danych pytań z {pdf_path}: {e}")
+        return None
+    if payload.get("version") != PAYLOAD_VERSION:
+        return None
+    return payload.get("questions")
@@ -0,0 +1,424 @@
+"""
+Odczyt pytań z plików PDF wygenerowanych przez nasze skrypty.
+
+Tekst stron jest wyciągany przez pypdf (szybko) albo pdfminer.six (analiza
+układu, metoda zapasowa), opcjonalnie w puli procesów, i parsowany
+jednoprzebiegową maszyną stanów po nagłówkach "Pytanie:", "Dostępne
+odpowiedzi:" i "Poprawna odpowiedź:". Wyniki są zapamiętywane w cache
+ekstrakcji (klucz: skrót zawartości PDF + parametry ekstrakcji).
+PDF-y z osadzonymi danymi pytań (pdf_payload.py) nie wymagają ekstrakcji.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from io import StringIO
+
+from .storage import file_sha256, write_json_atomically
+
+# pypdf i pdfminer są importowane w funkcjach, które ich używają
+
+# Liczba stron w jednym fragmencie przy równoległej ekstrakcji tekstu
+PAGES_PER_CHUNK = 8
+
+# Dostępne metody ekstrakcji tekstu z PDF. pypdf jest kilka razy szybszy,
+# a dla PDF-ów generowanych przez nasze skrypty (prosty układ) daje ten sam
+# wynik parsowania; pdfminer (analiza układu) zostaje jako zapasowy.
+PDF_TEXT_BACKENDS = ("pypdf", "pdfminer")
+PDF_TEXT_BACKEND = "pypdf"
+FALLBACK_PDF_TEXT_BACKEND = "pdfminer"
+
+# Parametry analizy układu pdfminer - są też częścią klucza cache ekstrakcji
+PDFMINER_LAPARAMS = {"line_margin": 0.6, "char_margin": 2.0}
+
+# Wersja formatu cache ekstrakcji; zmiana parsera tekstu wymaga jej podbicia
+EXTRACTION_CACHE_VERSION = 1
+
+
+def extract_text_with_pdfminer(pdf_path, page_numbers=None):
+    """
+    Ekstrahuje tekst z PDF z lepszym zachowaniem układu za pomocą pdfminer.six.
+    Dostosowane LAParams dla lepszej separacji linii.
+    page_numbers (zbiór numerów stron od 0) ogranicza ekstrakcję do tych stron.
+    """
+    # Importujemy z pdfminer.six
+    from pdfminer.high_level import extract_text_to_fp
+    from pdfminer.layout import LAParams
+
+    output_string = StringIO()
+    # Dostosowane LAParams - line_margin (domyślnie 0.5) i word_margin (domyślnie 0.1)
+    # Zwiększenie line_margin może pomóc w oddzielaniu linii, które są "blisko siebie" pionowo,
+    # ale powinny być traktowane jako osobne, np. różne odpowiedzi.
+    # Użycie domyślnych na początek, jeśli nie działa, można eksperymentować.
+    laparams = LAParams(**PDFMINER_LAPARAMS)  # Zwiększ marginesy
+    with open(pdf_path, "rb") as in_file:
+        extract_text_to_fp(
+            in_file,
+            output_string,
+            laparams=laparams,
+            output_type="text",
+            codec="utf-8",
+            page_numbers=page_numbers,
+        )
+    return output_string.getvalue()
+
+
+def extract_text_with_pypdf(pdf_path, page_numbers=None):
+    """
+    Szybka ekstrakcja tekstu przez pypdf - bez analizy układu strony.
+    Tekst każdej strony kończy się znakiem nowej linii, więc sklejenie
+    fragmentów (page_numbers) w kolejności stron daje tekst całego pliku.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    return "".join(
+        page.extract_text() + "\n"
+        for page_number, page in enumerate(reader.pages)
+        if page_numbers is None or page_number in page_numbers
+    )
+
+
+def extract_pdf_text(pdf_path, backend=PDF_TEXT_BACKEND, page_numbers=None):
+    """
+    Ekstrahuje tekst z PDF wybraną metodą (patrz PDF_TEXT_BACKENDS).
+    """
+    if backend == "pypdf":
+        return extract_text_with_pypdf(pdf_path, page_numbers)
+    if backend == "pdfminer":
+        return extract_text_with_pdfminer(pdf_path, page_numbers)
+    raise ValueError(
+        f"Nieznana metoda ekstrakcji tekstu '{backend}'. "
+        f"Dostępne: {', '.join(PDF_TEXT_BACKENDS)}."
+    )
+
+
+def count_pdf_pages(pdf_path):
+    """
+    Zwraca liczbę stron pliku PDF (bez analizy układu).
+    """
+    from pdfminer.pdfpage import PDFPage
+
+    with open(pdf_path, "rb") as in_file:
+        return sum(1 for _ in PDFPage.get_pages(in_file))
+
+
+def _extract_page_range(task):
+    """
+    Ekstrahuje tekst stron [first_page, last_page) - uruchamiane w procesie roboczym.
+    """
+    pdf_path, first_page, last_page, backend = task
+    return extract_pdf_text(
+        pdf_path, backend, set(range(first_page, last_page)) or None
+    )
+
+
+def extract_texts_parallel(
+    pdf_paths, jobs=1, pages_per_chunk=PAGES_PER_CHUNK, backend=PDF_TEXT_BACKEND
+):
+    """
+    Ekstrahuje tekst z wielu plików PDF, dzieląc pracę na fragmenty po
+    pages_per_chunk stron i rozdzielając je na jobs procesów.
+    Obie metody ekstrakcji przetwarzają każdą stronę niezależnie, więc sklejenie
+    fragmentów w kolejności stron daje dokładnie ten sam tekst, co ekstrakcja
+    całego pliku. Zwraca listę tekstów w kolejności pdf_paths.
+    """
+    if jobs <= 1:
+        return [extract_pdf_text(pdf_path, backend) for pdf_path in pdf_paths]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    tasks = []
+    for file_index, pdf_path in enumerate(pdf_paths):
+        page_count = count_pdf_pages(pdf_path)
+        for first_page in range(0, max(page_count, 1), pages_per_chunk):
+            last_page = min(first_page + pages_per_chunk, page_count)
+            tasks.append((file_index, (pdf_path, first_page, last_page, backend)))
+
+    text_parts = [[] for _ in pdf_paths]
+    # executor.map zachowuje kolejność zadań, więc fragmenty są już uporządkowane
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        page_texts = executor.map(_extract_page_range, [task for _, task in tasks])
+        for (file_index, _), page_text in zip(tasks, page_texts):
+            text_parts[file_index].append(page_text)
+    return ["".join(parts) for parts in text_parts]
+
+
+def extract_questions_from_pdfs(
+    pdf_paths, jobs=1, pages_per_chunk=PAGES_PER_CHUNK, backend=PDF_TEXT_BACKEND
+):
+    """
+    Ekstrahuje tekst z plików PDF wybraną metodą i parsuje z niego pytania.
+    Pliki, w których nie znaleziono żadnego bloku "Pytanie:", są ponownie
+    przetwarzane metodą zapasową (pdfminer) - np. PDF-y o nietypowym układzie,
+    z których pypdf wyciąga tekst w innej kolejności.
+    Zwraca słownik {ścieżka: lista pytań}.
+    """
+    texts = extract_texts_parallel(pdf_paths, jobs, pages_per_chunk, backend)
+    questions_by_path = {
+        pdf_path: parse_questions_from_text(text)
+        for pdf_path, text in zip(pdf_paths, texts)
+    }
+
+    if backend != FALLBACK_PDF_TEXT_BACKEND:
+        fallback_paths = [
+            pdf_path for pdf_path in pdf_paths if not questions_by_path[pdf_path]
+        ]
+        if fallback_paths:
+            print(
+                f"Brak pytań w {len(fallback_paths)} plikach po ekstrakcji {backend}, "
+                f"ponawiam przez {FALLBACK_PDF_TEXT_BACKEND}."
+            )
+            fallback_texts = extract_texts_parallel(
+                fallback_paths, jobs, pages_per_chunk, FALLBACK_PDF_TEXT_BACKEND
+            )
+            for pdf_path, text in zip(fallback_paths, fallback_texts):
+                questions_by_path[pdf_path] = parse_questions_from_text(text)
+    return questions_by_path
+
+
+def extraction_cache_key(content_sha256, backend=PDF_TEXT_BACKEND):
+    """
+    Klucz wpisu w cache ekstrakcji: skrót zawartości PDF oraz parametry
+    ekstrakcji (metoda, LAParams). Zmiana któregokolwiek z nich unieważnia wpis.
+    """
+    params = json.dumps(
+        {"backend": backend, "laparams": PDFMINER_LAPARAMS}, sort_keys=True
+    )
+    params_digest = hashlib.sha256(params.encode("utf-8")).hexdigest()[:16]
+    return f"{content_sha256}:{params_digest}"
+
+
+def load_extraction_cache(cache_path):
+    """
+    Wczytuje cache sparsowanych pytań z wcześniejszych uruchomień.
+    Zwraca słownik {klucz: wpis}; cache z inną wersją lub uszkodzony jest ignorowany.
+    """
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except Exception as e:
+        print(f"Nie udało się wczytać cache ekstrakcji {cache_path}: {e}")
+        return {}
+    if cache.get("version") != EXTRACTION_CACHE_VERSION:
+        print("Cache ekstrakcji pochodzi z innej wersji - zostanie przebudowany.")
+        return {}
+    return cache.get("entries", {})
+
+
+def evict_extraction_cache(cache_entries, max_bytes):
+    """
+    Usuwa najdawniej używane wpisy, dopóki łączny rozmiar wpisów
+    (w bajtach JSON) przekracza max_bytes. Zwraca liczbę usuniętych wpisów.
+    """
+    sizes = {
+        key: len(json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+        for key, entry in cache_entries.items()
+    }
+    total_size = sum(sizes.values())
+    evicted = 0
+    for key in sorted(cache_entries, key=lambda key: cache_entries[key]["last_used"]):
+        if total_size <= max_bytes:
+            break
+        total_size -= sizes[key]
+        del cache_entries[key]
+        evicted += 1
+    return evicted
+
+
+def save_extraction_cache(cache_path, cache_entries, max_bytes):
+    """
+    Ogranicza rozmiar cache (evict_extraction_cache) i zapisuje go atomowo
+    (plik tymczasowy + os.replace).
+    """
+    evicted = evict_extraction_cache(cache_entries, max_bytes)
+    if evicted:
+        print(f"Usunięto z cache ekstrakcji {evicted} najdawniej używanych wpisów.")
+    write_json_atomically(
+        cache_path, {"version": EXTRACTION_CACHE_VERSION, "entries": cache_entries}
+    )
+
+
+def extract_questions_cached(
+    pdf_paths,
+    cache_entries,
+    jobs=1,
+    pages_per_chunk=PAGES_PER_CHUNK,
+    backend=PDF_TEXT_BACKEND,
+):
+    """
+    Jak extract_questions_from_pdfs, ale pliki, których zawartość i parametry
+    ekstrakcji są już w cache_entries, nie są ponownie przetwarzane.
+    Nowe wyniki trafiają do cache_entries; używane wpisy dostają nowy znacznik czasu.
+    """
+    now = time.time()
+    questions_by_path = {}
+    keys = {}
+    missing_paths = []
+    for pdf_path in pdf_paths:
+        keys[pdf_path] = extraction_cache_key(file_sha256(pdf_path), backend)
+        entry = cache_entries.get(keys[pdf_path])
+        if entry is not None:
+            entry["last_used"] = now
+            questions_by_path[pdf_path] = entry["questions"]
+        else:
+            missing_paths.append(pdf_path)
+
+    print(
+        f"PDF-y z cache ekstrakcji: {len(questions_by_path)}, "
+        f"do ekstrakcji: {len(missing_paths)}."
+    )
+    if missing_paths:
+        extracted = extract_questions_from_pdfs(
+            missing_paths, jobs, pages_per_chunk, backend
+        )
+        for pdf_path, questions in extracted.items():
+            cache_entries[keys[pdf_path]] = {"questions": questions, "last_used": now}
+            questions_by_path[pdf_path] = questions
+    return questions_by_path
+
+
+def parse_pdf_for_questions(pdf_path, backend=PDF_TEXT_BACKEND):
+    """
+    Parsuje tekst z pojedynczego pliku PDF i wyodrębnia pytania,
+    dostępne odpowiedzi i zidentyfikowane poprawne odpowiedzi
+    (z automatycznym powrotem do pdfminer, jeśli szybka ekstrakcja nic nie da).
+    """
+    return extract_questions_from_pdfs([pdf_path], backend=backend)[pdf_path]
+
+
+# Nagłówki sekcji w PDF-ach generowanych przez script.py
+QUESTION_HEADER = "Pytanie:"
+ANSWERS_HEADER = "Dostępne odpowiedzi:"
+CORRECT_HEADER = "Poprawna odpowiedź:"
+NO_CORRECT_ANSWER_MARKER = "(nie udało się zidentyfikować lub brak)"
+PAGE_MARKER_PATTERN = re.compile(r"--- PAGE \d+ ---")
+
+
+def _split_dash_items(lines):
+    """
+    Dzieli linie sekcji odpowiedzi na pozycje listy. Nowa pozycja zaczyna się
+    od linii rozpoczynającej się od '-', kolejne linie (zawinięty tekst)
+    są do niej doklejane. Tekst przed pierwszą pozycją jest pomijany.
+    """
+    items = []
+    current = None
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("-"):
+            if current is not None:
+                items.append("\n".join(current).strip())
+            current = [stripped[1:]]
+        elif current is not None:
+            current.append(line)
+    if current is not None:
+        items.append("\n".join(current).strip())
+    return [item for item in items if item]
+
+
+def _build_parsed_question(question_lines, answer_lines, correct_lines):
+    """
+    Składa słownik pytania z linii trzech sekcji bloku "Pytanie:".
+    """
+    all_answers = _split_dash_items(answer_lines)
+    correct_answer_raw = "\n".join(correct_lines).strip()
+
+    correct_answers = []
+    has_identified_correct_answer = False
+
+    if NO_CORRECT_ANSWER_MARKER not in correct_answer_raw:
+        has_identified_correct_answer = True
+        correct_answers = _split_dash_items(correct_lines)
+
+        # Dodatkowa obsługa, jeśli poprawna odpowiedź nie ma formatu listy (-)
+        if (
+            not correct_answers
+            and correct_answer_raw
+            and not correct_answer_raw.startswith("(")
+        ):
+            correct_answers.append(correct_answer_raw)
+
+    return {
+        "question_text": "\n".join(question_lines).strip(),
+        "all_answers": all_answers,
+        "correct_answers": correct_answers,
+        "has_identified_correct_answer": has_identified_correct_answer,
+    }
+
+
+def parse_questions_from_text(full_text):
+    """
+    Wyodrębnia pytania z tekstu PDF (pypdf lub pdfminer.six).
+
+    Jednoprzebiegowa maszyna stanów po liniach: nagłówki "Pytanie:",
+    "Dostępne odpowiedzi:" i "Poprawna odpowiedź:" przełączają sekcję,
+    a znacznik "--- PAGE N ---" kończy sekcję poprawnych odpowiedzi.
+    Czas działania jest liniowy względem długości tekstu (bez regexu DOTALL
+    z leniwymi grupami, który przy dużych plikach wielokrotnie cofał się po tekście).
+    """
+    questions = []
+    section = None  # None, "question", "answers" lub "correct"
+    question_lines, answer_lines, correct_lines = [], [], []
+
+    for line in full_text.splitlines():
+        stripped = line.strip()
+
+        if stripped.startswith(QUESTION_HEADER):
+            if section == "correct":
+                questions.append(
+                    _build_parsed_question(question_lines, answer_lines, correct_lines)
+                )
+            # Niedokończony blok (bez sekcji odpowiedzi) jest porzucany
+            section = "question"
+            question_lines = [stripped[len(QUESTION_HEADER) :]]
+            answer_lines, correct_lines = [], []
+        elif section is None:
+            continue
+        elif PAGE_MARKER_PATTERN.fullmatch(stripped):
+            # Znacznik strony kończy blok pytania; w pozostałych sekcjach jest pomijany
+            if section == "correct":
+                questions.append(
+                    _build_parsed_question(question_lines, answer_lines, correct_lines)
+                )
+                section = None
+        elif section == "question" and stripped.startswith(ANSWERS_HEADER):
+            section = "answers"
+            answer_lines = [stripped[len(ANSWERS_HEADER) :]]
+        elif section == "answers" and stripped.startswith(CORRECT_HEADER):
+            section = "correct"
+            correct_lines = [stripped[len(CORRECT_HEADER) :]]
+        elif section == "question":
+            question_lines.append(line)
+        elif section == "answers":
+            answer_lines.append(line)
+        else:
+            correct_lines.append(line)
+
+    if section == "correct":
+        questions.append(
+            _build_parsed_question(question_lines, answer_lines, correct_lines)
+        )
+    return questions
+
+
+def questions_from_payload(questions):
+    """
+    Dostosowuje pytania osadzone w PDF (pdf_payload.py) do formatu zwracanego
+    przez parse_questions_from_text. PDF-y ze script.py nie mają flagi
+    has_identified_correct_answer - wynika ona z obecności poprawnych odpowiedzi.
+    """
+    return [
+        {
+            "question_text": question["question_text"],
+            "all_answers": list(question["all_answers"]),
+            "correct_answers": list(question["correct_answers"]),
+            "has_identified_correct_answer": question.get(
+                "has_identified_correct_answer", bool(question["correct_answers"])
+            ),
+        }
+        for question in questions
+    ]
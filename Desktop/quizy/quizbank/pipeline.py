@@ -0,0 +1,780 @@
+"""
+Etapy przetwarzania bazy pytań - wywoływane przez skrypty w katalogu głównym.
+
+- build_question_bank: pliki HTML przeglądów quizów -> baza SQLite (bank.py)
+  / JSON / JSON Lines (script_to_json.py), z manifestem wyników parsowania,
+- build_quiz_pdf: pliki HTML jednego quizu -> PDF (script.py),
+- build_merged_pdfs_from_bank: baza SQLite -> dwa zbiorcze PDF-y z uporządkowanych
+  zapytań (pdf_from_json.py),
+- build_merged_pdfs_from_json: JSON -> deduplikacja -> dwa zbiorcze PDF-y
+  (pdf_from_json.py dla plików JSON / JSON Lines),
+- build_merged_pdfs_from_pdfs: PDF-y quizów -> deduplikacja -> dwa zbiorcze
+  PDF-y (merger.py).
+"""
+
+import json
+import os
+import sqlite3
+
+from .archives import html_source_sha256, html_source_stat
+from .bank import (
+    open_bank,
+    open_bank_readonly,
+    query_questions,
+    refresh_near_duplicates,
+    sync_attempts,
+)
+from .canvas_renderer import DEFAULT_PDF_RENDERER
+from .near_duplicates import DEFAULT_THRESHOLD
+from .normalizer import (
+    collapse_near_duplicates,
+    deduplicate_questions,
+    has_correct_answer,
+    sort_questions,
+    split_by_correct_answer,
+)
+from .page_layout import DEFAULT_PAGE_LAYOUT, MERGED_PAGE_LAYOUT
+from .parallel_render import RENDER_CHUNK_SIZE
+from .parser import (
+    HTML_PARSER_BACKEND,
+    PARSER_VERSION,
+    STREAMING_BACKEND,
+    collect_html_files,
+    parse_html_files,
+    resolve_html_backend,
+)
+from .pdf_payload import read_embedded_questions
+from .pdf_text import (
+    PAGES_PER_CHUNK,
+    PDF_TEXT_BACKEND,
+    extract_questions_cached,
+    load_extraction_cache,
+    questions_from_payload,
+    save_extraction_cache,
+)
+from .renderer import generate_pdf
+from .storage import write_json_atomically
+
+# Domyślny limit rozmiaru cache ekstrakcji merger.py
+EXTRACTION_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Poprzedni plik JSON Lines odłożony na czas zapisu nowego (tryb jsonl)
+PREVIOUS_JSONL_SUFFIX = ".prev"
+
+# Tytuły zbiorczych PDF-ów z pliku JSON (pdf_from_json.py, quizbank build)
+IDENTIFIED_PDF_TITLE = "Quiz: Pytania z Poprawnymi Odpowiedziami"
+UNIDENTIFIED_PDF_TITLE = "Quiz: Pytania Bez Zidentyfikowanych Odpowiedzi"
+
+
+# --- HTML -> JSON ---
+
+
+def load_manifest(manifest_path, jsonl_path=None):
+    """
+    Wczytuje manifest z wynikami parsowania wcześniej przetworzonych plików.
+    Zwraca słownik {ścieżka: wpis}. Manifest z inną wersją parsera
+    (lub uszkodzony) jest ignorowany, więc wszystkie pliki zostaną sparsowane ponownie.
+
+    Wpis ma pytania ("questions") albo - gdy zapisał go tryb jsonl - tylko
+    zakres bajtów tych pytań w pliku JSON Lines ("jsonl_range"). Wpisy
+    z samym zakresem są zwracane tylko wtedy, gdy jsonl_path to ten sam,
+    niezmieniony plik JSON Lines, do którego zakres się odnosi (albo jego
+    kopia odłożona przez przerwane uruchomienie - previous_jsonl_source).
+    """
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except Exception as e:
+        print(f"Nie udało się wczytać manifestu {manifest_path}: {e}")
+        return {}
+    if manifest.get("parser_version") != PARSER_VERSION:
+        print("Manifest pochodzi z innej wersji parsera - zostanie przebudowany.")
+        return {}
+    manifest_files = manifest.get("files", {})
+    if jsonl_path is not None and manifest.get("jsonl_output") == _jsonl_fingerprint(
+        jsonl_path, previous_jsonl_source(jsonl_path)
+    ):
+        return manifest_files
+    return {
+        file_path: entry
+        for file_path, entry in manifest_files.items()
+        if "questions" in entry
+    }
+
+
+def save_manifest(manifest_path, manifest_files, jsonl_path=None):
+    """
+    Zapisuje manifest atomowo (plik tymczasowy + os.replace), aby przerwany
+    zapis nie zostawił uszkodzonego pliku. jsonl_path to plik JSON Lines,
+    do którego odnoszą się zakresy "jsonl_range" wpisów (tryb jsonl).
+    """
+    manifest = {"parser_version": PARSER_VERSION, "files": manifest_files}
+    if jsonl_path is not None:
+        manifest["jsonl_output"] = _jsonl_fingerprint(jsonl_path)
+    write_json_atomically(manifest_path, manifest)
+
+
+def previous_jsonl_source(jsonl_path):
+    """
+    Plik, z którego kopiowane są pytania plików bez zmian: poprzedni plik
+    JSON Lines odłożony obok (jsonl_path + PREVIOUS_JSONL_SUFFIX) przez
+    uruchomienie, które nie doszło do końca, a jeśli go nie ma - sam
+    jsonl_path.
+    """
+    previous_path = jsonl_path + PREVIOUS_JSONL_SUFFIX
+    return previous_path if os.path.exists(previous_path) else jsonl_path
+
+
+def _jsonl_fingerprint(jsonl_path, source_path=None):
+    # source_path: plik o tej samej zawartości (odłożony poprzedni plik)
+    try:
+        stat = os.stat(source_path or jsonl_path)
+    except FileNotFoundError:
+        return None
+    return {
+        "path": os.path.abspath(jsonl_path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+    }
+
+
+def lookup_manifest(manifest_files, html_file_path, entries_by_hash=None):
+    """
+    Sprawdza, czy plik można pominąć, bo jego wynik jest już w manifeście.
+    Najpierw porównuje rozmiar i czas modyfikacji (bez czytania pliku),
+    a dopiero przy różnicy liczy skrót zawartości.
+    Zwraca (wpis_lub_None, odcisk_pliku), gdzie odcisk to słownik
+    z kluczami size, mtime i sha256 gotowy do zapisania w manifeście.
+    """
+    size, mtime = html_source_stat(html_file_path)
+    fingerprint = {"size": size, "mtime": mtime}
+
+    entry = manifest_files.get(html_file_path)
+    if (
+        entry
+        and entry.get("size") == fingerprint["size"]
+        and entry.get("mtime") == fingerprint["mtime"]
+    ):
+        fingerprint["sha256"] = entry["sha256"]
+        return entry, fingerprint
+
+    fingerprint["sha256"] = html_source_sha256(html_file_path)
+    if entry and entry.get("sha256") == fingerprint["sha256"]:
+        return entry, fingerprint
+    # Ta sama zawartość mogła zostać zapisana pod inną ścieżką (kopia, zmiana nazwy)
+    if entries_by_hash and fingerprint["sha256"] in entries_by_hash:
+        return entries_by_hash[fingerprint["sha256"]], fingerprint
+    return None, fingerprint
+
+
+def merge_results_in_order(html_files, cached_questions, parsed_results):
+    """
+    Łączy wyniki z manifestu (cached_questions: {ścieżka: pytania}) z wynikami
+    parsowania pozostałych plików (parsed_results w kolejności tych plików).
+    Zwraca krotki (ścieżka, pytania, komunikat_błędu) w kolejności html_files,
+    gdy tylko są dostępne - bez czekania na koniec całej partii.
+    """
+    for file_path in html_files:
+        if file_path in cached_questions:
+            yield file_path, cached_questions[file_path], None
+        else:
+            yield next(parsed_results)
+
+
+def append_questions_jsonl(jsonl_file, questions):
+    """
+    Dopisuje pytania do pliku JSON Lines otwartego w trybie binarnym (jedno
+    pytanie w linii) i opróżnia bufor, więc przerwany proces zostawia
+    poprawny, częściowy plik. Zwraca zakres bajtów [początek, koniec]
+    dopisanych linii.
+    """
+    start = jsonl_file.tell()
+    for question in questions:
+        jsonl_file.write(
+            (json.dumps(question, ensure_ascii=False) + "\n").encode("utf-8")
+        )
+    jsonl_file.flush()
+    return [start, jsonl_file.tell()]
+
+
+def copy_jsonl_range(source_file, jsonl_file, jsonl_range):
+    """
+    Kopiuje linie z zakresu bajtów jsonl_range poprzedniego pliku JSON Lines
+    (source_file) do jsonl_file porcjami, bez dekodowania pytań.
+    Zwraca (nowy zakres bajtów, liczba skopiowanych pytań).
+    """
+    start, end = jsonl_range
+    new_start = jsonl_file.tell()
+    question_count = 0
+    source_file.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        block = source_file.read(min(remaining, 1 << 16))
+        if not block:
+            raise ValueError("Plik JSON Lines jest krótszy niż zakres z manifestu.")
+        jsonl_file.write(block)
+        question_count += block.count(b"\n")
+        remaining -= len(block)
+    jsonl_file.flush()
+    return [new_start, jsonl_file.tell()], question_count
+
+
+def build_question_bank(
+    base_directory,
+    output_json_file,
+    output_jsonl_file,
+    manifest_file,
+    jobs=1,
+    backend=HTML_PARSER_BACKEND,
+    output_format="json",
+    use_cache=True,
+    executor=None,
+    output_bank_file=None,
+    near_duplicate_threshold=DEFAULT_THRESHOLD,
+):
+    """
+    Parsuje pliki HTML z base_directory (collect_html_files) i zapisuje
+    wszystkie pytania do output_json_file (output_format="json"), na
+    bieżąco do output_jsonl_file ("jsonl") albo do bazy SQLite
+    output_bank_file ("sqlite", bank.py - dopisywane są tylko nowe próby,
+    a prawie-duplikaty są od razu oznaczane progiem near_duplicate_threshold).
+    Pliki niezmienione od ostatniego uruchomienia są brane z manifestu
+    (use_cache=False go ignoruje).
+    executor to opcjonalna wspólna pula procesów (parse_html_files).
+    Zwraca liczbę zapisanych pytań.
+    """
+    parser_name = (
+        backend if backend == STREAMING_BACKEND else resolve_html_backend(backend)
+    )
+    all_extracted_questions = []
+
+    if not os.path.exists(base_directory):
+        print(f"Błąd: Katalog '{base_directory}' nie istnieje.")
+        print("Upewnij się, że katalog główny dla quizów jest poprawny.")
+        return 0
+
+    html_files = collect_html_files(base_directory)
+    print(
+        f"Znaleziono {len(html_files)} plików HTML "
+        f"(procesy: {jobs}, parser: {parser_name})."
+    )
+
+    manifest_files = (
+        load_manifest(
+            manifest_file, output_jsonl_file if output_format == "jsonl" else None
+        )
+        if use_cache
+        else {}
+    )
+    entries_by_hash = {entry["sha256"]: entry for entry in manifest_files.values()}
+    new_manifest_files = {}
+    cached_questions = {}
+    cached_jsonl_ranges = {}
+    fingerprints = {}
+    files_to_parse = []
+
+    for file_path in html_files:
+        entry, fingerprint = lookup_manifest(manifest_files, file_path, entries_by_hash)
+        fingerprints[file_path] = fingerprint
+        if entry is not None:
+            if "questions" in entry:
+                new_manifest_files[file_path] = {
+                    **fingerprint,
+                    "questions": entry["questions"],
+                }
+            cached_questions[file_path] = entry.get("questions")
+            if "jsonl_range" in entry:
+                cached_jsonl_ranges[file_path] = entry["jsonl_range"]
+        else:
+            files_to_parse.append(file_path)
+
+    print(
+        f"Pliki bez zmian (z manifestu): {len(cached_questions)}, "
+        f"do sparsowania: {len(files_to_parse)}."
+    )
+
+    # W trybie jsonl pytania trafiają do pliku od razu po sparsowaniu pliku HTML,
+    # w kolejności listy plików. Manifest zapamiętuje wtedy tylko zakres bajtów
+    # pytań każdego pliku, a pytania plików bez zmian są kopiowane z poprzedniego
+    # pliku JSON Lines - pamięć nie rośnie z liczbą pytań. Poprzedni plik jest
+    # na czas uruchomienia odkładany obok (PREVIOUS_JSONL_SUFFIX), a nowy jest
+    # pisany od razu pod właściwą nazwą, więc przerwany proces zostawia poprawny,
+    # częściowy plik, a kolejne uruchomienie kopiuje pytania z odłożonego pliku.
+    jsonl_file = None
+    previous_jsonl_file = None
+    if output_format == "jsonl":
+        previous_jsonl_path = output_jsonl_file + PREVIOUS_JSONL_SUFFIX
+        if cached_jsonl_ranges:
+            if not os.path.exists(previous_jsonl_path):
+                os.replace(output_jsonl_file, previous_jsonl_path)
+            previous_jsonl_file = open(previous_jsonl_path, "rb")
+        jsonl_file = open(output_jsonl_file, "wb")
+    total_questions = 0
+    failed_files = []
+    # W trybie sqlite każdy plik HTML to jedna próba (ścieżka, skrót, pytania)
+    attempts = []
+    try:
+        for file_path, questions, error in merge_results_in_order(
+            html_files,
+            cached_questions,
+            parse_html_files(files_to_parse, jobs, backend, executor),
+        ):
+            if error:
+                print(f"  Błąd podczas parsowania pliku {file_path}: {error}")
+                failed_files.append(file_path)
+                continue
+            if file_path not in cached_questions:
+                print(f"  Przetworzono plik: {file_path} ({len(questions)} pytań)")
+                if not jsonl_file:
+                    new_manifest_files[file_path] = {
+                        **fingerprints[file_path],
+                        "questions": questions,
+                    }
+            if jsonl_file:
+                if questions is None:
+                    jsonl_range, question_count = copy_jsonl_range(
+                        previous_jsonl_file,
+                        jsonl_file,
+                        cached_jsonl_ranges[file_path],
+                    )
+                else:
+                    jsonl_range = append_questions_jsonl(jsonl_file, questions)
+                    question_count = len(questions)
+                new_manifest_files[file_path] = {
+                    **fingerprints[file_path],
+                    "jsonl_range": jsonl_range,
+                }
+                total_questions += question_count
+                continue
+            total_questions += len(questions)
+            if output_format == "sqlite":
+                attempts.append(
+                    (file_path, new_manifest_files[file_path]["sha256"], questions)
+                )
+            else:
+                all_extracted_questions.extend(questions)
+    finally:
+        if previous_jsonl_file:
+            previous_jsonl_file.close()
+        if jsonl_file:
+            jsonl_file.close()
+
+    try:
+        save_manifest(
+            manifest_file,
+            new_manifest_files,
+            output_jsonl_file if jsonl_file else None,
+        )
+        # Zakresy z nowego manifestu odnoszą się już do nowego pliku
+        if jsonl_file and os.path.exists(previous_jsonl_path):
+            os.remove(previous_jsonl_path)
+    except Exception as e:
+        print(f"Błąd podczas zapisu manifestu {manifest_file}: {e}")
+
+    if failed_files:
+        print(f"Nie udało się przetworzyć {len(failed_files)} plików.")
+
+    if output_format == "sqlite":
+        # Także bez żadnych pytań - bank musi zapomnieć próby usunięte z kursu
+        try:
+            conn = open_bank(output_bank_file)
+        except (ValueError, sqlite3.DatabaseError) as e:
+            print(f"Błąd otwarcia banku pytań: {e}")
+            return 0
+        try:
+            added = sync_attempts(conn, attempts, failed_files)
+            # Odczyt z tym samym progiem (pdf_from_json.py) nie zmienia już banku
+            refresh_near_duplicates(conn, near_duplicate_threshold)
+            unique_count = conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+        finally:
+            conn.close()
+
+    if not total_questions:
+        print(
+            "Nie znaleziono żadnych pytań do przetworzenia. Sprawdź, czy pliki HTML są poprawne i mają oczekiwaną strukturę Moodle."
+        )
+        return 0
+
+    print(f"\nZnaleziono łącznie {total_questions} pytań ze wszystkich quizów.")
+    if jsonl_file:
+        print(f"Wszystkie pytania zostały zapisane do pliku: {output_jsonl_file}")
+        return total_questions
+    if output_format == "sqlite":
+        print(
+            f"Bank pytań {output_bank_file}: nowe próby: {added}, "
+            f"unikalne pytania: {unique_count}."
+        )
+        return total_questions
+
+    # Zapisz do JSON
+    try:
+        with open(output_json_file, "w", encoding="utf-8") as f:
+            json.dump(all_extracted_questions, f, ensure_ascii=False, indent=4)
+        print(f"Wszystkie pytania zostały zapisane do pliku: {output_json_file}")
+    except Exception as e:
+        print(f"Błąd podczas zapisu do pliku JSON: {e}")
+    return total_questions
+
+
+# --- HTML -> PDF jednego quizu ---
+
+
+def build_quiz_pdf(
+    html_files_directory,
+    output_pdf_name,
+    jobs=1,
+    chunk_size=RENDER_CHUNK_SIZE,
+    renderer=DEFAULT_PDF_RENDERER,
+    layout=DEFAULT_PAGE_LAYOUT,
+    backend=HTML_PARSER_BACKEND,
+):
+    """
+    Parsuje pliki HTML z html_files_directory i generuje z pytań jeden PDF
+    (pytania bez numerów, style "quiz" - patrz renderer.py).
+    """
+    if not os.path.exists(html_files_directory):
+        print(f"Błąd: Katalog '{html_files_directory}' nie istnieje.")
+        print("Utwórz katalog i umieść w nim pliki HTML z przeglądami quizów.")
+        return
+
+    html_files = [
+        os.path.join(html_files_directory, filename)
+        for filename in sorted(os.listdir(html_files_directory))
+        if filename.endswith(".html")
+    ]
+    all_questions = []
+    for file_path, questions, error in parse_html_files(html_files, 1, backend):
+        print(f"Przetwarzam plik: {os.path.basename(file_path)}")
+        if error:
+            print(f"  Błąd podczas parsowania pliku {file_path}: {error}")
+        all_questions.extend(questions)
+
+    if not all_questions:
+        print(
+            "Nie znaleziono żadnych pytań do przetworzenia. Sprawdź, czy pliki HTML są poprawne i mają oczekiwaną strukturę Moodle."
+        )
+        return
+
+    print(f"Znaleziono łącznie {len(all_questions)} pytań.")
+    generate_pdf(
+        output_pdf_name,
+        all_questions,
+        jobs=jobs,
+        chunk_size=chunk_size,
+        renderer=renderer,
+        layout=layout,
+        numbered=False,
+        style_set="quiz",
+    )
+
+
+# --- Zbiorcze PDF-y ---
+
+
+def iter_questions_from_file(input_file):
+    """
+    Leniwie wczytuje pytania z pliku wygenerowanego przez script_to_json.py.
+    Plik .jsonl jest czytany linia po linii (pamięć nie rośnie z rozmiarem bazy),
+    a niepoprawne linie - np. ucięta ostatnia linia po przerwanym zapisie - są
+    pomijane z ostrzeżeniem. Plik .json (jedna tablica) jest wczytywany w całości.
+    """
+    with open(input_file, "r", encoding="utf-8") as f:
+        if not input_file.endswith(".jsonl"):
+            yield from json.load(f)
+            return
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Pomijam niepoprawną linię {line_number} w {input_file}: {e}")
+
+
+def load_deduplicated_questions(
+    input_json_file, near_duplicate_threshold=DEFAULT_THRESHOLD
+):
+    """
+    Wczytuje pytania z pliku JSON / JSON Lines i deduplikuje je (także
+    prawie-duplikaty, chyba że near_duplicate_threshold to None).
+    Zwraca (pytania_z_odpowiedziami, pytania_bez_odpowiedzi), obie listy
+    posortowane po wyczyszczonym tekście, albo None, gdy nie ma czego
+    przetwarzać (brak lub błąd pliku, brak pytań).
+    """
+    if not os.path.exists(input_json_file):
+        print(f"Błąd: Plik '{input_json_file}' nie istnieje.")
+        print("Najpierw uruchom 'script_to_json.py' aby wygenerować plik JSON.")
+        return None
+
+    # Pytania są deduplikowane w trakcie wczytywania, bez budowania pełnej listy
+    try:
+        unique_questions_map, loaded_count = deduplicate_questions(
+            iter_questions_from_file(input_json_file)
+        )
+        print(f"Wczytano {loaded_count} pytań z pliku {input_json_file}.")
+    except json.JSONDecodeError as e:
+        print(f"Błąd dekodowania JSON z pliku {input_json_file}: {e}")
+        print("Sprawdź, czy plik JSON jest poprawnie sformatowany.")
+        return None
+    except Exception as e:
+        print(f"Błąd podczas wczytywania pliku JSON {input_json_file}: {e}")
+        return None
+
+    if not loaded_count:
+        print("Plik JSON nie zawiera żadnych pytań do przetworzenia.")
+        return None
+
+    if near_duplicate_threshold is not None:
+        unique_questions_map = collapse_near_duplicates(
+            unique_questions_map, near_duplicate_threshold
+        )
+
+    # Segregacja na dwie listy: z odpowiedziami i bez (po deduplikacji),
+    # posortowane dla spójności
+    final_identified_questions, final_unidentified_questions = (
+        sort_questions(questions)
+        for questions in split_by_correct_answer(unique_questions_map)
+    )
+
+    print(
+        f"Zidentyfikowano unikalnych pytań z odpowiedziami: {len(final_identified_questions)}"
+    )
+    print(
+        f"Zidentyfikowano unikalnych pytań bez odpowiedzi: {len(final_unidentified_questions)}"
+    )
+    return final_identified_questions, final_unidentified_questions
+
+
+def build_merged_pdfs_from_json(
+    input_json_file,
+    output_pdf_identified,
+    output_pdf_unidentified,
+    near_duplicate_threshold=DEFAULT_THRESHOLD,
+    jobs=1,
+    chunk_size=RENDER_CHUNK_SIZE,
+    fragment_cache_dir=None,
+    renderer=DEFAULT_PDF_RENDERER,
+    layout=MERGED_PAGE_LAYOUT,
+):
+    """
+    Deduplikuje pytania z pliku JSON / JSON Lines (load_deduplicated_questions)
+    i generuje dwa zbiorcze PDF-y: pytania z poprawnymi odpowiedziami i bez nich.
+    """
+    deduplicated = load_deduplicated_questions(
+        input_json_file, near_duplicate_threshold
+    )
+    if deduplicated is None:
+        return
+    final_identified_questions, final_unidentified_questions = deduplicated
+
+    _generate_merged_pdfs(
+        [
+            (
+                output_pdf_identified,
+                final_identified_questions,
+                IDENTIFIED_PDF_TITLE,
+                "Brak pytań z zidentyfikowanymi odpowiedziami",
+            ),
+            (
+                output_pdf_unidentified,
+                final_unidentified_questions,
+                UNIDENTIFIED_PDF_TITLE,
+                "Brak pytań bez zidentyfikowanych odpowiedzi",
+            ),
+        ],
+        jobs=jobs,
+        chunk_size=chunk_size,
+        fragment_cache_dir=fragment_cache_dir,
+        renderer=renderer,
+        layout=layout,
+    )
+
+
+def build_merged_pdfs_from_bank(
+    input_bank_file,
+    output_pdf_identified,
+    output_pdf_unidentified,
+    near_duplicate_threshold=DEFAULT_THRESHOLD,
+    jobs=1,
+    chunk_size=RENDER_CHUNK_SIZE,
+    fragment_cache_dir=None,
+    renderer=DEFAULT_PDF_RENDERER,
+    layout=MERGED_PAGE_LAYOUT,
+):
+    """
+    Generuje dwa zbiorcze PDF-y z bazy SQLite (bank.py): pytania są już
+    zdeduplikowane w bazie, a obie listy to uporządkowane zapytania SQL
+    (query_questions) - bez deduplikacji i sortowania w pamięci.
+    """
+    if not os.path.exists(input_bank_file):
+        print(f"Błąd: Plik '{input_bank_file}' nie istnieje.")
+        print("Najpierw uruchom 'script_to_json.py' aby utworzyć bank pytań.")
+        return
+
+    try:
+        conn = open_bank_readonly(input_bank_file)
+        try:
+            final_identified_questions = query_questions(
+                conn, True, near_duplicate_threshold
+            )
+            final_unidentified_questions = query_questions(
+                conn, False, near_duplicate_threshold
+            )
+        finally:
+            conn.close()
+    except (ValueError, sqlite3.DatabaseError) as e:
+        print(f"Błąd odczytu banku pytań: {e}")
+        return
+    print(
+        f"Zidentyfikowano unikalnych pytań z odpowiedziami: {len(final_identified_questions)}"
+    )
+    print(
+        f"Zidentyfikowano unikalnych pytań bez odpowiedzi: {len(final_unidentified_questions)}"
+    )
+
+    _generate_merged_pdfs(
+        [
+            (
+                output_pdf_identified,
+                final_identified_questions,
+                IDENTIFIED_PDF_TITLE,
+                "Brak pytań z zidentyfikowanymi odpowiedziami",
+            ),
+            (
+                output_pdf_unidentified,
+                final_unidentified_questions,
+                UNIDENTIFIED_PDF_TITLE,
+                "Brak pytań bez zidentyfikowanych odpowiedzi",
+            ),
+        ],
+        jobs=jobs,
+        chunk_size=chunk_size,
+        fragment_cache_dir=fragment_cache_dir,
+        renderer=renderer,
+        layout=layout,
+    )
+
+
+def build_merged_pdfs_from_pdfs(
+    input_pdf_directory,
+    output_pdf_identified,
+    output_pdf_unidentified,
+    extraction_cache_file,
+    near_duplicate_threshold=DEFAULT_THRESHOLD,
+    extraction_cache_max_bytes=EXTRACTION_CACHE_MAX_BYTES,
+    use_cache=True,
+    jobs=1,
+    pages_per_chunk=PAGES_PER_CHUNK,
+    chunk_size=RENDER_CHUNK_SIZE,
+    extractor=PDF_TEXT_BACKEND,
+    renderer=DEFAULT_PDF_RENDERER,
+    layout=MERGED_PAGE_LAYOUT,
+):
+    """
+    Odczytuje pytania z PDF-ów w input_pdf_directory (osadzone dane pytań
+    albo ekstrakcja tekstu z cache - pdf_text.py) i generuje dwa zbiorcze
+    PDF-y. Pytania z poprawnymi odpowiedziami są deduplikowane, a pytania
+    bez odpowiedzi trafiają do drugiego pliku wszystkie, w kolejności plików.
+    """
+    if not os.path.exists(input_pdf_directory):
+        print(f"Błąd: Katalog '{input_pdf_directory}' nie istnieje.")
+        print("Utwórz go i umieść w nim pliki PDF wygenerowane przez pierwszy skrypt.")
+        return
+
+    pdf_paths = [
+        os.path.join(input_pdf_directory, filename)
+        for filename in os.listdir(input_pdf_directory)
+        if filename.endswith(".pdf")
+    ]
+    # PDF-y z osadzonymi danymi pytań nie wymagają ekstrakcji tekstu
+    embedded_questions = {}
+    legacy_pdf_paths = []
+    for file_path in pdf_paths:
+        questions_from_pdf = read_embedded_questions(file_path)
+        if questions_from_pdf is not None:
+            embedded_questions[file_path] = questions_from_pdf
+        else:
+            legacy_pdf_paths.append(file_path)
+    print(
+        f"PDF-y z osadzonymi danymi: {len(embedded_questions)}, "
+        f"do ekstrakcji tekstu: {len(legacy_pdf_paths)} "
+        f"(metoda: {extractor}, procesy: {jobs})."
+    )
+    cache_entries = load_extraction_cache(extraction_cache_file) if use_cache else {}
+    legacy_questions = extract_questions_cached(
+        legacy_pdf_paths, cache_entries, jobs, pages_per_chunk, extractor
+    )
+    try:
+        save_extraction_cache(
+            extraction_cache_file, cache_entries, extraction_cache_max_bytes
+        )
+    except Exception as e:
+        print(f"Błąd podczas zapisu cache ekstrakcji {extraction_cache_file}: {e}")
+
+    all_parsed_questions = []
+    for file_path in pdf_paths:
+        print(f"Parsuję PDF: {os.path.basename(file_path)}")
+        if file_path in embedded_questions:
+            questions_from_pdf = questions_from_payload(embedded_questions[file_path])
+        else:
+            questions_from_pdf = legacy_questions[file_path]
+        all_parsed_questions.extend(questions_from_pdf)
+
+    if not all_parsed_questions:
+        print("Nie znaleziono żadnych pytań do przetworzenia w plikach PDF.")
+        return
+
+    # Deduplikacja tylko pytań z odpowiedziami; pytania bez zidentyfikowanej
+    # odpowiedzi trafiają do osobnej listy bez deduplikacji
+    unique_questions_map, _ = deduplicate_questions(
+        q_data for q_data in all_parsed_questions if has_correct_answer(q_data)
+    )
+    unidentified_questions = [
+        q_data for q_data in all_parsed_questions if not has_correct_answer(q_data)
+    ]
+    if near_duplicate_threshold is not None:
+        unique_questions_map = collapse_near_duplicates(
+            unique_questions_map, near_duplicate_threshold
+        )
+    final_identified_questions, _ = split_by_correct_answer(unique_questions_map)
+
+    print(
+        f"Zidentyfikowano unikalnych pytań z odpowiedziami: {len(final_identified_questions)}"
+    )
+    print(f"Zidentyfikowano pytań bez odpowiedzi: {len(unidentified_questions)}")
+
+    _generate_merged_pdfs(
+        [
+            (
+                output_pdf_identified,
+                final_identified_questions,
+                None,
+                "Brak pytań z zidentyfikowanymi odpowiedziami",
+            ),
+            (
+                output_pdf_unidentified,
+                unidentified_questions,
+                None,
+                "Brak pytań bez zidentyfikowanych odpowiedzi",
+            ),
+        ],
+        jobs=jobs,
+        chunk_size=chunk_size,
+        renderer=renderer,
+        layout=layout,
+    )
+
+
+def _generate_merged_pdfs(outputs, **options):
+    """
+    Generuje zbiorcze PDF-y; outputs to krotki (ścieżka, pytania, tytuł,
+    komunikat przy braku pytań), options to argumenty generate_pdf.
+    """
+    for output_pdf_path, questions, title, empty_message in outputs:
+        if questions:
+            generate_pdf(output_pdf_path, questions, title, **options)
+        else:
+            print(f"{empty_message} do wygenerowania '{output_pdf_path}'.")
@@ -0,0 +1,533 @@
+"""
+Renderowanie pytań do PDF - wspólne dla script.py, pdf_from_json.py i merger.py.
+
+Każde pytanie to nagłówek ("Pytanie N:" albo "Pytanie:" bez numeru), treść,
+lista odpowiedzi (poprawne wyróżnione kolorem) i sekcja poprawnych odpowiedzi.
+Dostępne są dwa renderery o tym samym układzie stron: platypus
+(SimpleDocTemplate + Paragraph, także z cache fragmentów - pdf_fragments.py)
+i canvas (canvas_renderer.py), oraz dwa układy stron (page_layout.py).
+generate_pdf składa to razem: renderowanie równoległe we fragmentach
+(parallel_render.py) i zapis PDF z osadzonymi danymi pytań (pdf_payload.py).
+"""
+
+import copy
+import os
+import pickle
+from functools import partial
+from io import BytesIO
+
+from .canvas_renderer import DEFAULT_PDF_RENDERER, CanvasPageWriter
+from .font_registry import register_ttf_font
+from .normalizer import has_correct_answer
+from .page_layout import (
+    DEFAULT_PAGE_LAYOUT,
+    MERGED_PAGE_LAYOUT,
+    PAGE_MARGINS,
+    page_margins,
+    question_block,
+    question_separator,
+)
+from .parallel_render import RENDER_CHUNK_SIZE, render_pdf_in_chunks
+from .pdf_payload import write_pdf_with_questions
+
+# reportlab i cache fragmentów (pdf_fragments.py) są importowane w funkcjach,
+# które ich używają - import samego modułu (np. --help) ich nie ładuje
+
+# --- WAŻNE: Konfiguracja czcionki dla polskich znaków ---
+# Aby polskie znaki (ą, ć, ę, ł, ń, ó, ś, ź, ż) były poprawnie wyświetlane w PDF,
+# potrzebna jest czcionka TrueType (TTF), która je zawiera, np. DejaVuSans
+# (https://dejavu-fonts.github.io/). Pliki czcionek muszą leżeć w katalogu,
+# z którego uruchamiane są skrypty.
+FONT_NAME = "DejaVuSans"
+FONT_FILE = "DejaVuSans.ttf"
+FONT_BOLD_FILE = "DejaVuSans-Bold.ttf"  # Opcjonalnie dla pogrubienia
+
+# Ustawiane przez register_fonts()
+font_bold_registered = False
+_fonts_registered = False
+
+# Zestawy stylów: "merged" - zbiorcze PDF-y (łamanie długich słów, brak
+# odpowiedzi na czerwono), "quiz" - PDF-y pojedynczych quizów ze script.py
+PDF_STYLE_SETS = ("merged", "quiz")
+DEFAULT_PDF_STYLE_SET = "merged"
+
+NO_CORRECT_ANSWER_TEXT = "(nie udało się zidentyfikować lub brak)"
+
+
+def register_fonts():
+    """
+    Rejestruje czcionki w ReportLab przy pierwszym renderowaniu PDF (nie przy
+    imporcie), z cache metryk (font_registry.py). Kolejne wywołania nic nie robią.
+    """
+    global FONT_NAME, font_bold_registered, _fonts_registered
+    if _fonts_registered:
+        return
+    _fonts_registered = True
+    try:
+        # Weryfikacja, czy pliki czcionek istnieją
+        if not os.path.exists(FONT_FILE):
+            raise FileNotFoundError(
+                f"Brak pliku czcionki: {FONT_FILE}. Upewnij się, że znajduje się w tym samym katalogu co skrypt."
+            )
+        register_ttf_font(FONT_NAME, FONT_FILE)
+
+        if os.path.exists(FONT_BOLD_FILE):
+            register_ttf_font(FONT_NAME + "-Bold", FONT_BOLD_FILE)
+            font_bold_registered = True
+        else:
+            print(
+                f"Brak pliku {FONT_BOLD_FILE}. Pogrubienie będzie symulowane przez ReportLab."
+            )
+            font_bold_registered = False
+
+        print(
+            f"Czcionka '{FONT_NAME}' ({FONT_FILE}) zarejestrowana pomyślnie dla ReportLab."
+        )
+    except Exception as e:
+        print(f"!!! BŁĄD: Nie udało się zarejestrować czcionki '{FONT_NAME}': {e}")
+        print(
+            "Nowe pliki PDF zostaną wygenerowane z domyślnymi czcionkami (mogą brakować polskich znaków)."
+        )
+        print(
+            "Upewnij się, że pliki czcionek (.ttf) znajdują się w tym samym katalogu co skrypt."
+        )
+        FONT_NAME = "Helvetica"  # Fallback
+        font_bold_registered = False  # Ustaw na False, nawet jeśli Helvetica-Bold jest dostępna, aby logika stylów była spójna
+
+
+def build_pdf_styles(style_set=DEFAULT_PDF_STYLE_SET):
+    """
+    Tworzy style akapitów PDF z uwzględnieniem zarejestrowanej czcionki.
+    Zwraca słownik {nazwa: styl}; klucz "title" to styl tytułu dokumentu.
+    style_set wybiera zestaw stylów (PDF_STYLE_SETS). Przy pierwszym
+    wywołaniu rejestruje czcionki.
+    """
+    from reportlab.lib.colors import black, green, red
+    from reportlab.lib.enums import TA_LEFT
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    if style_set not in PDF_STYLE_SETS:
+        raise ValueError(
+            f"Nieznany zestaw stylów '{style_set}'. "
+            f"Dostępne: {', '.join(PDF_STYLE_SETS)}."
+        )
+    register_fonts()
+    styles = getSampleStyleSheet()
+    # Łamanie długich słów (np. adresów URL) tylko w zbiorczych PDF-ach
+    wrap_long_words = style_set == "merged"
+
+    # Zdefiniuj style z uwzględnieniem zarejestrowanej czcionki
+    question_style = styles["Normal"]
+    question_style.fontName = (
+        FONT_NAME + "-Bold"
+        if FONT_NAME != "Helvetica" and font_bold_registered
+        else "Helvetica-Bold"
+    )
+    question_style.fontSize = 12
+    question_style.leading = 14
+    question_style.alignment = TA_LEFT
+    question_style.spaceAfter = 6
+    question_style.textColor = black
+
+    answer_style = styles["Normal"]
+    answer_style.fontName = FONT_NAME
+    answer_style.fontSize = 10
+    answer_style.leading = 12
+    answer_style.leftIndent = 20
+    answer_style.spaceAfter = 3
+    answer_style.textColor = black
+
+    correct_answer_style = styles["Normal"]
+    correct_answer_style.fontName = FONT_NAME
+    correct_answer_style.fontSize = 10
+    correct_answer_style.leading = 12
+    correct_answer_style.leftIndent = 20
+    correct_answer_style.textColor = green
+    correct_answer_style.spaceAfter = 3
+
+    # W PDF-ach pojedynczych quizów brak odpowiedzi nie jest wyróżniany
+    no_correct_answer_style = answer_style
+    if style_set == "merged":
+        no_correct_answer_style = styles["Normal"]
+        no_correct_answer_style.fontName = FONT_NAME
+        no_correct_answer_style.fontSize = 10
+        no_correct_answer_style.leading = 12
+        no_correct_answer_style.leftIndent = 20
+        # Zaznacz na czerwono, że brak odpowiedzi
+        no_correct_answer_style.textColor = red
+        no_correct_answer_style.spaceAfter = 3
+
+    pdf_styles = {
+        "title": styles["h1"],
+        "question": question_style,
+        "answer": answer_style,
+        "correct_answer": correct_answer_style,
+        "no_correct_answer": no_correct_answer_style,
+    }
+    if wrap_long_words:
+        for name in ("question", "answer", "correct_answer", "no_correct_answer"):
+            pdf_styles[name].allowBreakWords = True  # Pozwól na łamanie słów
+            pdf_styles[name].splitLongWords = True  # Rozdzielaj długie słowa
+            pdf_styles[name].wordWrap = "CJK"  # Ułatwia łamanie wierszy
+    return pdf_styles
+
+
+def question_header(number):
+    """
+    Zwraca nagłówek pytania: "Pytanie N:" albo "Pytanie:" (number=None).
+    """
+    return f"Pytanie {number}:" if number is not None else "Pytanie:"
+
+
+def question_flowables(q_data, number, pdf_styles):
+    """
+    Zwraca elementy (flowables) jednego pytania razem z nagłówkiem
+    (question_header).
+    """
+    from reportlab.platypus import Paragraph
+
+    return [
+        Paragraph(f"<b>{question_header(number)}</b>", pdf_styles["question"])
+    ] + question_body_flowables(q_data, pdf_styles)
+
+
+def question_body_flowables(q_data, pdf_styles, paragraph_class=None):
+    """
+    Zwraca elementy jednego pytania bez nagłówka z numerem - treść pytania
+    i odpowiedzi. Ta część jest zapisywana w cache fragmentów (pdf_fragments.py).
+    paragraph_class to klasa akapitów (domyślnie Paragraph).
+    """
+    from reportlab.platypus import Paragraph, Spacer
+
+    paragraph_class = paragraph_class or Paragraph
+    question_style = pdf_styles["question"]
+    answer_style = pdf_styles["answer"]
+    correct_answer_style = pdf_styles["correct_answer"]
+    no_correct_answer_style = pdf_styles["no_correct_answer"]
+    flowables = []
+
+    flowables.append(paragraph_class(q_data["question_text"], question_style))
+    flowables.append(Spacer(1, 6))
+
+    if q_data["all_answers"]:
+        flowables.append(paragraph_class("<b>Dostępne odpowiedzi:</b>", answer_style))
+        for ans in q_data["all_answers"]:
+            # Sprawdź, czy dana odpowiedź jest poprawna i pokoloruj ją
+            if ans in q_data["correct_answers"]:
+                flowables.append(paragraph_class(f"- {ans}", correct_answer_style))
+            else:
+                flowables.append(paragraph_class(f"- {ans}", answer_style))
+        flowables.append(Spacer(1, 6))
+
+    if has_correct_answer(q_data):
+        flowables.append(
+            paragraph_class("<b>Poprawna odpowiedź:</b>", correct_answer_style)
+        )
+        for corr_ans in q_data["correct_answers"]:
+            flowables.append(paragraph_class(f"- {corr_ans}", correct_answer_style))
+    else:
+        flowables.append(
+            paragraph_class(
+                f"<b>Poprawna odpowiedź:</b> {NO_CORRECT_ANSWER_TEXT}",
+                no_correct_answer_style,
+            )
+        )
+
+    flowables.append(Spacer(1, 12))  # Dodatkowy odstęp między pytaniami
+    return flowables
+
+
+def title_flowables(title, pdf_styles):
+    """
+    Zwraca elementy tytułu umieszczanego na pierwszej stronie dokumentu.
+    """
+    from reportlab.platypus import Paragraph, Spacer
+
+    return [
+        Paragraph(f'<h1 align="center">{title}</h1>', pdf_styles["title"]),
+        Spacer(1, 24),
+    ]
+
+
+def render_questions_pdf(
+    questions_list,
+    first_index=0,
+    title=None,
+    layout=DEFAULT_PAGE_LAYOUT,
+    numbered=True,
+    style_set=DEFAULT_PDF_STYLE_SET,
+):
+    """
+    Renderuje listę pytań do PDF w pamięci. Numeracja pytań (numbered=True)
+    zaczyna się od first_index + 1, a tytuł (jeśli podany) trafia tylko na
+    początek całego dokumentu (first_index == 0) - patrz renderowanie
+    równoległe we fragmentach. layout to układ stron z page_layout.py
+    ("page" lub "compact"), a style_set - zestaw stylów (PDF_STYLE_SETS).
+    Zwraca (bajty PDF, wyrenderowane pytania).
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
+
+    pdf_buffer = BytesIO()
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=A4, **page_margins(layout))
+    rendered_questions = []
+    pdf_styles = build_pdf_styles(style_set)
+    story = []
+
+    # Dodaj tytuł na pierwszej stronie
+    if title and first_index == 0:
+        story.extend(title_flowables(title, pdf_styles))
+
+    for i, q_data in enumerate(questions_list):
+        if not q_data["question_text"].strip():  # Pomiń pytania bez tekstu
+            continue
+        # Dodaj separator (podział strony w układzie "page"), ale nie przed
+        # pierwszym wyrenderowanym pytaniem (także w każdym fragmencie
+        # przy renderowaniu równoległym)
+        if rendered_questions:
+            story.extend(question_separator(layout))
+        rendered_questions.append(q_data)
+        number = first_index + i + 1 if numbered else None
+        story.extend(
+            question_block(question_flowables(q_data, number, pdf_styles), layout)
+        )
+
+    doc.build(story)
+    return pdf_buffer.getvalue(), rendered_questions
+
+
+def render_questions_canvas(
+    questions_list,
+    first_index=0,
+    title=None,
+    layout=DEFAULT_PAGE_LAYOUT,
+    numbered=True,
+    style_set=DEFAULT_PDF_STYLE_SET,
+):
+    """
+    Odpowiednik render_questions_pdf rysujący bezpośrednio na canvas
+    (canvas_renderer.py) - ten sam układ i style, bez platypus.
+    Zwraca (bajty PDF, wyrenderowane pytania).
+    """
+    pdf_styles = build_pdf_styles(style_set)
+    question_style = pdf_styles["question"]
+    answer_style = pdf_styles["answer"]
+    correct_answer_style = pdf_styles["correct_answer"]
+    no_correct_answer_style = pdf_styles["no_correct_answer"]
+    writer = CanvasPageWriter(margin=PAGE_MARGINS[layout])
+    rendered_questions = []
+
+    # Dodaj tytuł na pierwszej stronie
+    if title and first_index == 0:
+        writer.paragraph(title, pdf_styles["title"])
+        writer.spacer(24)
+
+    for i, q_data in enumerate(questions_list):
+        if not q_data["question_text"].strip():  # Pomiń pytania bez tekstu
+            continue
+        if rendered_questions and layout == "page":
+            writer.page_break()
+        rendered_questions.append(q_data)
+        if layout == "compact":
+            writer.begin_block()
+
+        number = first_index + i + 1 if numbered else None
+        writer.paragraph(question_header(number), question_style, bold=True)
+        writer.paragraph(q_data["question_text"], question_style)
+        writer.spacer(6)
+
+        if q_data["all_answers"]:
+            writer.paragraph("Dostępne odpowiedzi:", answer_style, bold=True)
+            for ans in q_data["all_answers"]:
+                if ans in q_data["correct_answers"]:
+                    writer.paragraph(f"- {ans}", correct_answer_style)
+                else:
+                    writer.paragraph(f"- {ans}", answer_style)
+            writer.spacer(6)
+
+        if has_correct_answer(q_data):
+            writer.paragraph("Poprawna odpowiedź:", correct_answer_style, bold=True)
+            for corr_ans in q_data["correct_answers"]:
+                writer.paragraph(f"- {corr_ans}", correct_answer_style)
+        else:
+            writer.paragraph(
+                NO_CORRECT_ANSWER_TEXT,
+                no_correct_answer_style,
+                bold_prefix="Poprawna odpowiedź:",
+            )
+
+        writer.spacer(12)
+        if layout == "compact":
+            writer.end_block()
+
+    return writer.getvalue(), rendered_questions
+
+
+def _layout_question_fragment(task):
+    """
+    Tworzy elementy pytania (bez numeru) z gotowym łamaniem wierszy
+    i zwraca je zserializowane - uruchamiane także w procesie roboczym.
+    """
+    from .pdf_fragments import CachedLayoutParagraph, layout_fragment
+
+    q_data, width, style_set = task
+    flowables = question_body_flowables(
+        q_data, build_pdf_styles(style_set), CachedLayoutParagraph
+    )
+    return layout_fragment(flowables, width)
+
+
+def render_questions_with_fragment_cache(
+    questions_list,
+    cache_dir,
+    title=None,
+    jobs=1,
+    layout=DEFAULT_PAGE_LAYOUT,
+    numbered=True,
+    style_set=DEFAULT_PDF_STYLE_SET,
+    executor=None,
+):
+    """
+    Renderuje PDF jak render_questions_pdf, ale elementy pytań z gotowym
+    łamaniem wierszy bierze z cache_dir (pdf_fragments.py). Układane są tylko
+    pytania, których jeszcze tam nie ma - przy jobs > 1 w puli procesów
+    (lub we wspólnej puli executor, jeśli jest podana).
+    Zwraca (bajty PDF, wyrenderowane pytania).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+    from .pdf_fragments import (
+        fragment_key,
+        frame_width,
+        load_fragment,
+        store_fragment,
+        style_fingerprint,
+    )
+
+    pdf_buffer = BytesIO()
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=A4, **page_margins(layout))
+    width = frame_width(doc)
+    pdf_styles = build_pdf_styles(style_set)
+    style_digest = style_fingerprint(pdf_styles, FONT_NAME, font_bold_registered, width)
+
+    numbered_questions = [
+        (i + 1 if numbered else None, q_data)
+        for i, q_data in enumerate(questions_list)
+        if q_data["question_text"].strip()
+    ]
+    keys = [
+        fragment_key(
+            style_digest,
+            [
+                q_data["question_text"],
+                q_data["all_answers"],
+                q_data["correct_answers"],
+                has_correct_answer(q_data),
+            ],
+        )
+        for _, q_data in numbered_questions
+    ]
+
+    fragments = {}
+    missing = {}
+    for key, (_, q_data) in zip(keys, numbered_questions):
+        if key in fragments or key in missing:
+            continue
+        fragment = load_fragment(cache_dir, key)
+        if fragment is None:
+            missing[key] = q_data
+        else:
+            fragments[key] = fragment
+    print(f"Fragmenty PDF z cache: {len(fragments)}, do ułożenia: {len(missing)}.")
+
+    tasks = [(q_data, width, style_set) for q_data in missing.values()]
+    if executor is not None:
+        laid_out = list(executor.map(_layout_question_fragment, tasks))
+    elif jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            laid_out = list(executor.map(_layout_question_fragment, tasks))
+    else:
+        laid_out = [_layout_question_fragment(task) for task in tasks]
+    for key, fragment_bytes in zip(missing, laid_out):
+        store_fragment(cache_dir, key, fragment_bytes)
+        fragments[key] = pickle.loads(fragment_bytes)
+
+    # Dodaj tytuł na pierwszej stronie
+    story = title_flowables(title, pdf_styles) if title else []
+    for position, (key, (number, _)) in enumerate(zip(keys, numbered_questions)):
+        if position > 0:
+            story.extend(question_separator(layout))
+        # To samo pytanie może wystąpić kilka razy - każde wystąpienie dostaje kopię
+        flowables = [
+            Paragraph(f"<b>{question_header(number)}</b>", pdf_styles["question"])
+        ] + [copy.copy(flowable) for flowable in fragments[key]]
+        story.extend(question_block(flowables, layout))
+
+    doc.build(story)
+    return pdf_buffer.getvalue(), [q_data for _, q_data in numbered_questions]
+
+
+def generate_pdf(
+    output_pdf_path,
+    questions_list,
+    title=None,
+    jobs=1,
+    chunk_size=RENDER_CHUNK_SIZE,
+    fragment_cache_dir=None,
+    renderer=DEFAULT_PDF_RENDERER,
+    layout=MERGED_PAGE_LAYOUT,
+    numbered=True,
+    style_set=DEFAULT_PDF_STYLE_SET,
+    executor=None,
+):
+    """
+    Generuje pojedynczy plik PDF z listą pytań. Przy jobs > 1 fragmenty po
+    chunk_size pytań są renderowane równolegle (parallel_render.py).
+    Z fragment_cache_dir elementy pytań z gotowym łamaniem wierszy są brane
+    z tego katalogu, a układane od nowa są tylko nowe lub zmienione pytania
+    (tylko renderer platypus). renderer="canvas" rysuje strony bezpośrednio
+    na canvas (canvas_renderer.py). layout="compact" (domyślnie) układa wiele
+    pytań na stronie (page_layout.py). executor to opcjonalna wspólna pula
+    procesów używana zamiast tworzenia nowej. Zwraca True, jeśli plik powstał.
+    """
+    render_chunk = (
+        render_questions_canvas if renderer == "canvas" else render_questions_pdf
+    )
+    # Rejestrujemy czcionki przed startem procesów roboczych, które je dziedziczą
+    register_fonts()
+    try:
+        # PDF powstaje w pamięci, a przy zapisie dołączamy do niego dane pytań (questions.json)
+        if fragment_cache_dir is not None and renderer == "platypus":
+            pdf_bytes, rendered_questions = render_questions_with_fragment_cache(
+                questions_list,
+                fragment_cache_dir,
+                title,
+                jobs,
+                layout,
+                numbered,
+                style_set,
+                executor,
+            )
+        else:
+            pdf_bytes, rendered_questions = render_pdf_in_chunks(
+                partial(
+                    render_chunk,
+                    title=title,
+                    layout=layout,
+                    numbered=numbered,
+                    style_set=style_set,
+                ),
+                questions_list,
+                jobs,
+                chunk_size,
+                executor,
+            )
+        write_pdf_with_questions(pdf_bytes, output_pdf_path, rendered_questions)
+        print(f"Pomyślnie wygenerowano plik PDF: {output_pdf_path}")
+        return True
+    except Exception as e:
+        print(f"Wystąpił błąd podczas generowania pliku PDF {output_pdf_path}: {e}")
+        return False
@@ -0,0 +1,30 @@
+"""
+Pomocnicze funkcje plików cache i manifestów: skrót zawartości pliku
+i atomowy zapis JSON.
+"""
+
+import hashlib
+import json
+import os
+
+
+def file_sha256(file_path):
+    """
+    Liczy skrót SHA-256 zawartości pliku, czytając go w blokach.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_json_atomically(file_path, data):
+    """
+    Zapisuje data jako JSON atomowo (plik tymczasowy + os.replace), aby
+    przerwany zapis nie zostawił uszkodzonego pliku.
+    """
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, file_path)
@@ -0,0 +1,126 @@
+"""
+Pomiar czasu startu skryptów.
+
+Każdy pomiar to osobny proces Pythona (jak przy uruchomieniu z wiersza poleceń),
+a wynikiem jest mediana z kilku uruchomień:
+- "--help" każdego skryptu - import modułu i argparse, bez ciężkich bibliotek,
+- rejestracja czcionek bez cache metryk i z cache (quizbank/font_registry.py), mierzona
+  wewnątrz procesu po imporcie reportlab - na kopii plików czcionek
+  w katalogu tymczasowym, bez ruszania cache skryptów,
+- pierwsze renderowanie PDF z jednym pytaniem (import reportlab + czcionki).
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS = ("script_to_json.py", "script.py", "pdf_from_json.py", "merger.py")
+FONT_FILES = ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf")
+
+# Program uruchamiany w osobnym procesie: rejestracja czcionek z katalogu argv[1];
+# wypisuje czas samej rejestracji (bez importu reportlab)
+REGISTER_FONTS_PROGRAM = """
+import os, sys, time
+import reportlab.pdfbase.ttfonts
+from quizbank.font_registry import register_ttf_font
+start = time.perf_counter()
+for font_file in sys.argv[2:]:
+    register_ttf_font(os.path.splitext(font_file)[0], os.path.join(sys.argv[1], font_file))
+print(time.perf_counter() - start)
+"""
+
+# Program uruchamiany w osobnym procesie: PDF z jednym pytaniem
+FIRST_RENDER_PROGRAM = """
+from quizbank.renderer import render_questions_pdf
+question = {"question_text": "Pytanie?", "all_answers": ["Tak", "Nie"],
+            "correct_answers": ["Tak"]}
+render_questions_pdf([question])
+"""
+
+
+def run_python(args, cwd, reported=False):
+    """
+    Uruchamia interpreter Pythona z argumentami args i zwraca czas całego
+    procesu w sekundach - albo, przy reported=True, czas wypisany przez
+    program w ostatniej linii wyjścia.
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    return float(result.stdout.split()[-1]) if reported else elapsed
+
+
+def median_time(args, cwd, repeat, before_each=None, reported=False):
+    """
+    Zwraca medianę czasu z repeat uruchomień run_python(args, cwd, reported);
+    before_each() jest wywoływane przed każdym uruchomieniem.
+    """
+    times = []
+    for _ in range(repeat):
+        if before_each:
+            before_each()
+        times.append(run_python(args, cwd, reported))
+    return statistics.median(times)
+
+
+def print_time(label, seconds):
+    print(f"{label:<45} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    # --- Konfiguracja ---
+    repeat_count = 5
+    # --- Konfiguracja End ---
+
+    arg_parser = argparse.ArgumentParser(description="Mierzy czas startu skryptów.")
+    arg_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=repeat_count,
+        help="Liczba uruchomień każdego pomiaru (wynik to mediana).",
+    )
+    args = arg_parser.parse_args()
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    print_time("python -c pass", median_time(["-c", "pass"], script_dir, args.repeat))
+    for script_name in SCRIPTS:
+        print_time(
+            f"{script_name} --help",
+            median_time([script_name, "--help"], script_dir, args.repeat),
+        )
+
+    with tempfile.TemporaryDirectory() as font_dir:
+        for font_file in FONT_FILES:
+            shutil.copy(os.path.join(script_dir, font_file), font_dir)
+        cache_dir = os.path.join(font_dir, "font_metrics_cache")
+        register_args = ["-c", REGISTER_FONTS_PROGRAM, font_dir, *FONT_FILES]
+
+        def remove_cache():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        print_time(
+            "rejestracja czcionek (bez cache metryk)",
+            median_time(
+                register_args, script_dir, args.repeat, remove_cache, reported=True
+            ),
+        )
+        print_time(
+            "rejestracja czcionek (z cache metryk)",
+            median_time(register_args, script_dir, args.repeat, reported=True),
+        )
+
+    print_time(
+        "pierwszy PDF (1 pytanie)",
+        median_time(["-c", FIRST_RENDER_PROGRAM], script_dir, args.repeat),
+    )
@@ -0,0 +1,112 @@
+"""
+Przeglądy quizów czytane z archiwów (quizbank/archives.py).
+"""
+
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from quizbank.archives import cached_member_bytes, read_html_source
+from quizbank.parser import _parse_file_isolated, collect_html_files
+
+COURSE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wdrazanie_uslugi"
+)
+
+
+def _review_files():
+    return [
+        path
+        for path in collect_html_files(COURSE_DIR)
+        if os.path.dirname(path) != COURSE_DIR
+    ][:3]
+
+
+def test_tar_members_are_passed_as_bytes(tmp_path):
+    archive_path = str(tmp_path / "kurs.tar.gz")
+    with tarfile.open(archive_path, "w:gz") as archive:
+        for path in _review_files():
+            archive.add(path, os.path.relpath(path, COURSE_DIR))
+
+    members = collect_html_files(archive_path)
+    assert members
+    for member_path in members:
+        # Proces puli dostaje bajty z procesu głównego zamiast ścieżki do
+        # archiwum, którą musiałby rozpakować od nowa
+        html_bytes = cached_member_bytes(member_path)
+        assert html_bytes == read_html_source(member_path)
+        parsed = _parse_file_isolated(member_path, "html.parser", html_bytes)
+        assert parsed == _parse_file_isolated(member_path, "html.parser")
+        assert parsed[1]
+
+
+def test_zip_members_and_plain_files_are_read_in_workers(tmp_path):
+    archive_path = str(tmp_path / "kurs.zip")
+    review_files = _review_files()
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        for path in review_files:
+            archive.write(path, os.path.relpath(path, COURSE_DIR))
+
+    for member_path in collect_html_files(archive_path):
+        assert cached_member_bytes(member_path) is None
+    assert cached_member_bytes(review_files[0]) is None
+
+
+TREE_FILES = (
+    "strona.html",
+    "quiz_1/a.html",
+    "quiz_1/b.HTML",
+    "Quiz 2/c.html",
+    "quiz_1/podkatalog/d.html",
+    "inny/e.html",
+    "Quiz 1_ Przegląd_files/f.html",
+    "quiz_1/a_files/g.html",
+    "quiz_1/a_files/styl.css",
+)
+
+
+def _write_tree(base_dir):
+    for name in TREE_FILES:
+        path = os.path.join(base_dir, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("<html></html>")
+
+
+def _member_names(paths):
+    return [path.split("::", 1)[1] for path in paths]
+
+
+@pytest.mark.parametrize("wrapped", [False, True])
+@pytest.mark.parametrize("archive_format", ["zip", "tar.gz"])
+def test_archive_selects_same_pages_as_directory(tmp_path, archive_format, wrapped):
+    course_dir = tmp_path / "kurs"
+    _write_tree(str(course_dir))
+    expected = [
+        os.path.relpath(path, course_dir).replace(os.sep, "/")
+        for path in collect_html_files(str(course_dir))
+    ]
+    assert expected == [
+        "Quiz 2/c.html",
+        "quiz_1/a.html",
+        "quiz_1/b.HTML",
+        "strona.html",
+    ]
+
+    archive_path = str(tmp_path / f"kurs.{archive_format}")
+    names = sorted(TREE_FILES)
+    if archive_format == "zip":
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            for name in names:
+                # "./" w nazwie nie może zmienić klucza elementu
+                prefix = "kurs/" if wrapped else "./"
+                archive.write(course_dir / name, prefix + name)
+    else:
+        with tarfile.open(archive_path, "w:gz") as archive:
+            archive.add(course_dir, "kurs" if wrapped else ".")
+
+    members = _member_names(collect_html_files(archive_path))
+    prefix = "kurs/" if wrapped else ""
+    assert members == [prefix + name for name in expected]
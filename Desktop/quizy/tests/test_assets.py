@@ -0,0 +1,64 @@
+"""
+Magazyn zasobów stron (quizbank/assets.py).
+"""
+
+import errno
+import os
+import stat
+
+from quizbank.assets import (
+    ASSET_OBJECT_MODE,
+    archive_course_assets,
+    asset_object_path,
+)
+from quizbank.storage import file_sha256
+
+
+def _write_page(course_dir, page_name, asset_content):
+    quiz_dir = course_dir / "quiz_1"
+    quiz_dir.mkdir(exist_ok=True)
+    (quiz_dir / f"{page_name}.html").write_text("<html></html>", encoding="utf-8")
+    assets_dir = quiz_dir / f"{page_name}_files"
+    assets_dir.mkdir()
+    (assets_dir / "styles.css").write_text(asset_content, encoding="utf-8")
+    return assets_dir / "styles.css"
+
+
+def test_store_objects_are_read_only(tmp_path):
+    course_dir = tmp_path / "kurs"
+    course_dir.mkdir()
+    first = _write_page(course_dir, "proba_1", "body { color: red }")
+    second = _write_page(course_dir, "proba_2", "body { color: red }")
+
+    totals = archive_course_assets(str(course_dir))
+    assert (totals["new"], totals["linked"]) == (1, 1)
+
+    object_path = asset_object_path(
+        str(course_dir / "asset_store"), file_sha256(str(first))
+    )
+    assert stat.S_IMODE(os.stat(object_path).st_mode) == ASSET_OBJECT_MODE
+    assert os.path.samefile(first, object_path)
+    assert os.path.samefile(second, object_path)
+    assert first.read_text(encoding="utf-8") == "body { color: red }"
+
+    # Ponowne uruchomienie (także z rescan) działa na plikach tylko do odczytu
+    assert archive_course_assets(str(course_dir))["skipped_trees"] == 2
+    assert archive_course_assets(str(course_dir), rescan=True)["present"] == 2
+
+
+def test_store_on_other_filesystem_is_reported_as_copies(tmp_path, monkeypatch):
+    course_dir = tmp_path / "kurs"
+    course_dir.mkdir()
+    first = _write_page(course_dir, "proba_1", "body { color: red }")
+    _write_page(course_dir, "proba_2", "body { color: red }")
+
+    def cross_device_link(source, target):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", cross_device_link)
+    totals = archive_course_assets(str(course_dir))
+    assert (totals["new"], totals["linked"], totals["present"]) == (0, 0, 0)
+    assert (totals["copied"], totals["not_linked"]) == (1, 1)
+    assert totals["bytes_saved"] == 0
+    # Pliki stron zostają osobnymi, zapisywalnymi plikami
+    assert stat.S_IMODE(os.stat(first).st_mode) != ASSET_OBJECT_MODE
@@ -0,0 +1,190 @@
+"""
+Bank pytań w SQLite (quizbank/bank.py): odczyt niczego nie zmienia.
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from quizbank.bank import (
+    open_bank,
+    open_bank_readonly,
+    query_questions,
+    refresh_near_duplicates,
+    sync_attempts,
+)
+from quizbank.parser import collect_html_files, parse_moodle_quiz_review
+from quizbank.pipeline import build_question_bank
+
+COURSE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wdrazanie_uslugi"
+)
+
+QUESTIONS = [
+    {
+        "question_text": "Co to jest BPMN?",
+        "all_answers": ["notacja procesów", "język programowania"],
+        "correct_answers": ["notacja procesów"],
+        "has_identified_correct_answer": True,
+    },
+    {
+        "question_text": "Czym jest bramka?",
+        "all_answers": ["elementem decyzyjnym", "zdarzeniem"],
+        "correct_answers": [],
+        "has_identified_correct_answer": False,
+    },
+]
+
+
+def _sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _build_bank(bank_path, threshold=0.85):
+    conn = open_bank(bank_path)
+    try:
+        sync_attempts(conn, [("quiz_1/review.html", "abc", QUESTIONS)])
+        refresh_near_duplicates(conn, threshold)
+    finally:
+        conn.close()
+
+
+def test_foreign_database_is_not_modified(tmp_path):
+    db_path = str(tmp_path / "inna.sqlite")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE questions (x)")
+    conn.execute("INSERT INTO questions VALUES (1)")
+    conn.commit()
+    conn.close()
+    before = _sha256(db_path)
+
+    with pytest.raises(ValueError):
+        open_bank_readonly(db_path)
+    with pytest.raises(ValueError):
+        open_bank(db_path)
+    assert _sha256(db_path) == before
+
+
+def test_non_sqlite_file_is_rejected(tmp_path):
+    json_path = tmp_path / "all_quiz_questions.json"
+    json_path.write_text("[]", encoding="utf-8")
+    with pytest.raises(ValueError):
+        open_bank_readonly(str(json_path))
+    assert json_path.read_text(encoding="utf-8") == "[]"
+
+
+def test_query_does_not_write(tmp_path):
+    bank_path = str(tmp_path / "quiz_bank.sqlite")
+    _build_bank(bank_path)
+    before = _sha256(bank_path)
+
+    conn = open_bank_readonly(bank_path)
+    try:
+        identified = query_questions(conn, True, 0.85)
+        unidentified = query_questions(conn, False, 0.85)
+        # Inny próg - grupy prawie-duplikatów liczone w pamięci
+        query_questions(conn, True, 0.9)
+        query_questions(conn, False, None)
+    finally:
+        conn.close()
+    assert [q["question_text"] for q in identified] == ["Co to jest BPMN?"]
+    assert [q["question_text"] for q in unidentified] == ["Czym jest bramka?"]
+    assert _sha256(bank_path) == before
+
+
+def test_empty_attempt_list_clears_bank(tmp_path):
+    bank_path = str(tmp_path / "quiz_bank.sqlite")
+    _build_bank(bank_path)
+    conn = open_bank(bank_path)
+    try:
+        sync_attempts(conn, [])
+        assert conn.execute("SELECT COUNT(*) FROM attempts").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0] == 0
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("threshold", [None, 0.5, 0.85, 0.95])
+def test_other_threshold_matches_bank_marked_with_it(tmp_path, threshold):
+    attempts = [
+        (path, str(number), parse_moodle_quiz_review(path, "html.parser"))
+        for number, path in enumerate(collect_html_files(COURSE_DIR))
+    ]
+    results = []
+    for build_threshold in (0.85, threshold):
+        bank_path = str(tmp_path / f"bank_{len(results)}.sqlite")
+        conn = open_bank(bank_path)
+        try:
+            sync_attempts(conn, attempts)
+            refresh_near_duplicates(conn, build_threshold)
+        finally:
+            conn.close()
+        conn = open_bank_readonly(bank_path)
+        try:
+            results.append(
+                (
+                    query_questions(conn, True, threshold),
+                    query_questions(conn, False, threshold),
+                )
+            )
+        finally:
+            conn.close()
+    assert results[0] == results[1]
+
+
+def _build_course_bank(course_dir, bank_path):
+    build_question_bank(
+        str(course_dir),
+        str(course_dir / "all_quiz_questions.json"),
+        str(course_dir / "all_quiz_questions.jsonl"),
+        str(course_dir / "manifest.json"),
+        output_format="sqlite",
+        output_bank_file=bank_path,
+    )
+    conn = open_bank_readonly(bank_path)
+    try:
+        return (
+            conn.execute("SELECT COUNT(*) FROM attempts").fetchone()[0],
+            conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0],
+        )
+    finally:
+        conn.close()
+
+
+def _copy_course(tmp_path):
+    course_dir = tmp_path / "kurs"
+    quiz_dir = course_dir / "quiz_1"
+    quiz_dir.mkdir(parents=True)
+    for number, path in enumerate(collect_html_files(COURSE_DIR)[:2]):
+        shutil.copyfile(path, quiz_dir / f"proba_{number}.html")
+    return course_dir, sorted(quiz_dir.iterdir())
+
+
+def test_unreadable_file_keeps_its_attempt(tmp_path):
+    course_dir, (first, second) = _copy_course(tmp_path)
+    bank_path = str(tmp_path / "quiz_bank.sqlite")
+    attempts, questions = _build_course_bank(course_dir, bank_path)
+    assert attempts == 2
+
+    # Niepoprawny UTF-8 - błąd odczytu, a nie plik bez pytań
+    first.write_bytes(b"\xff\xfe<html>" + first.read_bytes())
+    assert _build_course_bank(course_dir, bank_path) == (2, questions)
+
+    # Zmiana innej próby wymagałaby budowania od nowa - bank zostaje bez zmian
+    second.write_bytes(second.read_bytes() + b"\n")
+    assert _build_course_bank(course_dir, bank_path) == (2, questions)
+
+
+def test_removed_file_drops_its_attempt(tmp_path):
+    course_dir, (first, second) = _copy_course(tmp_path)
+    bank_path = str(tmp_path / "quiz_bank.sqlite")
+    assert _build_course_bank(course_dir, bank_path)[0] == 2
+
+    first.unlink()
+    attempts, questions = _build_course_bank(course_dir, bank_path)
+    assert attempts == 1
+    assert questions == len(parse_moodle_quiz_review(str(second), "html.parser"))
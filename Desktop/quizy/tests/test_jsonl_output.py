@@ -0,0 +1,92 @@
+"""
+Tryb jsonl build_question_bank (quizbank/pipeline.py): plik zapisywany na
+bieżąco i przerwane uruchomienie.
+"""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from quizbank import pipeline
+from quizbank.parser import collect_html_files
+from quizbank.pipeline import PREVIOUS_JSONL_SUFFIX, build_question_bank
+
+COURSE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wdrazanie_uslugi"
+)
+
+
+def _copy_course(tmp_path, file_count=3):
+    course_dir = tmp_path / "kurs"
+    quiz_dir = course_dir / "quiz_1"
+    quiz_dir.mkdir(parents=True)
+    for number, path in enumerate(collect_html_files(COURSE_DIR)[:file_count]):
+        shutil.copyfile(path, quiz_dir / f"proba_{number}.html")
+    return course_dir, sorted(quiz_dir.iterdir())
+
+
+def _build(course_dir, output_format="jsonl"):
+    return build_question_bank(
+        str(course_dir),
+        str(course_dir / "all_quiz_questions.json"),
+        str(course_dir / "all_quiz_questions.jsonl"),
+        str(course_dir / f"manifest_{output_format}.json"),
+        backend="html.parser",
+        output_format=output_format,
+    )
+
+
+def _read_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_interrupted_run_leaves_partial_file_and_resumes(tmp_path, monkeypatch):
+    course_dir, html_files = _copy_course(tmp_path)
+    jsonl_path = str(course_dir / "all_quiz_questions.jsonl")
+    _build(course_dir)
+    complete = _read_jsonl(jsonl_path)
+
+    # Zmieniony ostatni plik; proces przerwany w trakcie jego parsowania
+    html_files[-1].write_bytes(html_files[-1].read_bytes() + b"\n")
+    parse_html_files = pipeline.parse_html_files
+
+    def interrupted(files, *args, **kwargs):
+        raise KeyboardInterrupt
+        yield from parse_html_files(files, *args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "parse_html_files", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        _build(course_dir)
+
+    # Poprawny, częściowy plik pod właściwą nazwą: pytania plików bez zmian
+    partial = _read_jsonl(jsonl_path)
+    assert partial and partial == complete[: len(partial)]
+    assert len(partial) < len(complete)
+    assert os.path.exists(jsonl_path + PREVIOUS_JSONL_SUFFIX)
+
+    # Kolejne uruchomienie parsuje tylko zmieniony plik i kończy zapis
+    parsed = []
+
+    def counted(files, *args, **kwargs):
+        parsed.extend(files)
+        yield from parse_html_files(files, *args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "parse_html_files", counted)
+    assert _build(course_dir) == len(complete)
+    assert parsed == [str(html_files[-1])]
+    assert _read_jsonl(jsonl_path) == complete
+    assert not os.path.exists(jsonl_path + PREVIOUS_JSONL_SUFFIX)
+
+
+def test_jsonl_matches_json_after_changes(tmp_path):
+    course_dir, html_files = _copy_course(tmp_path)
+    jsonl_path = str(course_dir / "all_quiz_questions.jsonl")
+    _build(course_dir)
+    html_files[0].unlink()
+    _build(course_dir)
+    _build(course_dir, "json")
+    with open(course_dir / "all_quiz_questions.json", "r", encoding="utf-8") as f:
+        assert _read_jsonl(jsonl_path) == json.load(f)
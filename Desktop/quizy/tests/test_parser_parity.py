@@ -0,0 +1,59 @@
+"""
+Parsery przeglądów quizów (backendy lxml i html.parser oraz parser
+strumieniowy) muszą dawać dokładnie ten sam wynik co pierwotny skrypt
+script_to_json.py, który budował pełne drzewo DOM przez html.parser.
+
+data/baseline_questions.json to wynik pierwotnego parse_moodle_quiz_review
+dla wszystkich zapisanych stron kursów, z kluczami będącymi ścieżkami
+względem katalogu projektu.
+"""
+
+import importlib.util
+import json
+import os
+
+import pytest
+
+from quizbank.parser import (
+    STREAMING_BACKEND,
+    iter_moodle_quiz_review,
+    parse_moodle_quiz_review,
+)
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "baseline_questions.json"
+)
+
+with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+    BASELINE = json.load(f)
+
+BACKENDS = [
+    pytest.param(
+        "lxml",
+        marks=pytest.mark.skipif(
+            importlib.util.find_spec("lxml") is None,
+            reason="lxml nie jest zainstalowany",
+        ),
+    ),
+    "html.parser",
+    STREAMING_BACKEND,
+]
+
+
+def _parse(html_file_path, backend):
+    if backend == STREAMING_BACKEND:
+        return list(iter_moodle_quiz_review(html_file_path))
+    return parse_moodle_quiz_review(html_file_path, backend)
+
+
+def test_baseline_covers_course_pages():
+    assert len(BASELINE) == 26
+    assert sum(len(questions) for questions in BASELINE.values()) == 174
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("relative_path", sorted(BASELINE))
+def test_backend_matches_baseline(relative_path, backend):
+    html_file_path = os.path.join(PROJECT_DIR, *relative_path.split("/"))
+    assert _parse(html_file_path, backend) == BASELINE[relative_path]
@@ -0,0 +1,30 @@
+"""
+Cache fragmentów PDF (quizbank/pdf_fragments.py).
+"""
+
+import pickle
+
+import reportlab
+from reportlab.lib.styles import getSampleStyleSheet
+
+from quizbank import pdf_fragments
+from quizbank.pdf_fragments import load_fragment, store_fragment, style_fingerprint
+
+
+def test_fingerprint_depends_on_reportlab_version(monkeypatch):
+    styles = {"Normal": getSampleStyleSheet()["Normal"]}
+    before = style_fingerprint(styles, "DejaVuSans", 500)
+    monkeypatch.setattr(reportlab, "Version", reportlab.Version + ".1")
+    assert style_fingerprint(styles, "DejaVuSans", 500) != before
+    monkeypatch.setattr(pdf_fragments.pickle, "HIGHEST_PROTOCOL", 2)
+    monkeypatch.setattr(reportlab, "Version", reportlab.Version[:-2])
+    assert style_fingerprint(styles, "DejaVuSans", 500) != before
+
+
+def test_unreadable_fragment_is_a_cache_miss(tmp_path):
+    cache_dir = str(tmp_path)
+    store_fragment(cache_dir, "uszkodzony", b"\x80\x05nie-pickle")
+    assert load_fragment(cache_dir, "uszkodzony") is None
+    store_fragment(cache_dir, "obcy", pickle.dumps({"nie": "lista"}))
+    assert load_fragment(cache_dir, "obcy") is None
+    assert load_fragment(cache_dir, "brak") is None
@@ -0,0 +1,114 @@
+"""
+Odczyt pytań z tekstu PDF (quizbank/pdf_text.py).
+"""
+
+import os
+import re
+
+import pytest
+
+from pdf_text_benchmark import parse_questions_from_text_regex, synthetic_pdf_text
+from quizbank import pdf_text
+from quizbank.pdf_text import parse_questions_from_text
+
+
+def test_state_machine_matches_regex_with_page_markers_inside_answers():
+    text = synthetic_pdf_text(300, seed=1)
+    # Tekst musi zawierać znaczniki stron w środku listy odpowiedzi
+    assert re.search(r"\n- [^\n]*\n--- PAGE \d+ ---\n- ", text)
+
+    questions = parse_questions_from_text(text)
+    assert len(questions) == 300
+    assert questions == parse_questions_from_text_regex(text)
+
+
+def test_page_marker_inside_answers_is_skipped():
+    text = (
+        "--- PAGE 1 ---\n"
+        "Pytanie: Co to jest BPMN?\n"
+        "Dostępne odpowiedzi:\n"
+        "- notacja procesów\n"
+        "--- PAGE 2 ---\n"
+        "- język programowania\n"
+        "Poprawna odpowiedź:\n"
+        "- notacja procesów\n"
+        "--- PAGE 3 ---\n"
+    )
+    assert parse_questions_from_text(text) == [
+        {
+            "question_text": "Co to jest BPMN?",
+            "all_answers": ["notacja procesów", "język programowania"],
+            "correct_answers": ["notacja procesów"],
+            "has_identified_correct_answer": True,
+        }
+    ]
+
+
+def test_hyphen_inside_answer_keeps_answer_whole():
+    # Dawny regex dzielił odpowiedź na każdym myślniku
+    text = (
+        "Pytanie: Etapy?\n"
+        "Dostępne odpowiedzi:\n"
+        "- Re-definiowanie, re-orientacja\n"
+        "- PIR - jej ocena\n"
+        "Poprawna odpowiedź:\n"
+        "(nie udało się zidentyfikować lub brak)\n"
+    )
+    assert parse_questions_from_text(text) == [
+        {
+            "question_text": "Etapy?",
+            "all_answers": ["Re-definiowanie, re-orientacja", "PIR - jej ocena"],
+            "correct_answers": [],
+            "has_identified_correct_answer": False,
+        }
+    ]
+
+
+RESULT_PDF = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "wdrazanie_uslugi",
+    "result_pdf",
+    "quiz1.pdf",
+)
+
+
+def _count_pdfminer_calls(monkeypatch):
+    calls = []
+    extract_text_with_pdfminer = pdf_text.extract_text_with_pdfminer
+
+    def counting_extract(pdf_path, page_numbers=None):
+        calls.append(pdf_path)
+        return extract_text_with_pdfminer(pdf_path, page_numbers)
+
+    monkeypatch.setattr(pdf_text, "extract_text_with_pdfminer", counting_extract)
+    return calls
+
+
+def test_pdfminer_fallback_when_pypdf_finds_no_questions(monkeypatch):
+    pytest.importorskip("pypdf")
+    pytest.importorskip("pdfminer")
+    expected = parse_questions_from_text(
+        pdf_text.extract_text_with_pdfminer(RESULT_PDF)
+    )
+    assert expected
+
+    calls = _count_pdfminer_calls(monkeypatch)
+    # Tekst bez bloków "Pytanie:" - np. PDF, z którego pypdf czyta tekst w innej kolejności
+    monkeypatch.setattr(
+        pdf_text, "extract_text_with_pypdf", lambda pdf_path, page_numbers=None: ""
+    )
+    questions_by_path = pdf_text.extract_questions_from_pdfs([RESULT_PDF])
+
+    assert calls == [RESULT_PDF]
+    assert questions_by_path == {RESULT_PDF: expected}
+
+
+def test_no_pdfminer_fallback_when_pypdf_finds_questions(monkeypatch):
+    pytest.importorskip("pypdf")
+    pytest.importorskip("pdfminer")
+    calls = _count_pdfminer_calls(monkeypatch)
+
+    questions_by_path = pdf_text.extract_questions_from_pdfs([RESULT_PDF])
+
+    assert calls == []
+    assert questions_by_path[RESULT_PDF]